@@ -1,40 +1,36 @@
-from typing import Type, cast
+from typing import Any
 
 from dotenv import load_dotenv
 
-from .agent import Agent, Playback
+from .agent import Agent, AsyncAgent, Playback
 from .recorder import Recorder
+from .registry import AGENT_MODULES, AgentRegistry, load_agent
 from .swarm import Swarm
-from .templates.langgraph_functional_agent import LangGraphFunc, LangGraphTextOnly
-from .templates.langgraph_random_agent import LangGraphRandom
-from .templates.langgraph_thinking import LangGraphThinking
-from .templates.llm_agents import LLM, FastLLM, GuidedLLM, ReasoningLLM
-from .templates.random_agent import Random
-from .templates.reasoning_agent import ReasoningAgent
-from .templates.api_agent import APIAgent
-from .templates.mcp_agent import MCPAgent
-from .templates.smolagents import SmolCodingAgent, SmolVisionAgent
 
 load_dotenv()
 
-AVAILABLE_AGENTS: dict[str, Type[Agent]] = {
-    cls.__name__.lower(): cast(Type[Agent], cls)
-    for cls in Agent.__subclasses__()
-    if cls.__name__ != "Playback"
+# templates pull in heavy optional dependencies (langgraph, openai, fastmcp, ...),
+# so they are only imported once an agent is looked up by name
+AVAILABLE_AGENTS = AgentRegistry(AGENT_MODULES)
+
+# template classes exported from this package, imported on first access
+_LAZY_EXPORTS: dict[str, str] = {
+    path.rpartition(":")[2]: path for path in AGENT_MODULES.values()
 }
 
-# add all the recording files as valid agent names
-for rec in Recorder.list():
-    AVAILABLE_AGENTS[rec] = Playback
 
-# update the agent dictionary to include subclasses of LLM class
-AVAILABLE_AGENTS["reasoningagent"] = ReasoningAgent
-AVAILABLE_AGENTS["apiagent"] = APIAgent
-AVAILABLE_AGENTS["mcpagent"] = MCPAgent
+def __getattr__(name: str) -> Any:
+    if name in _LAZY_EXPORTS:
+        agent = load_agent(_LAZY_EXPORTS[name])
+        globals()[name] = agent
+        return agent
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 __all__ = [
     "Swarm",
     "Random",
+    "AsyncRandom",
     "LangGraphFunc",
     "LangGraphTextOnly",
     "LangGraphThinking",
@@ -49,6 +45,7 @@ __all__ = [
     "SmolCodingAgent",
     "SmolVisionAgent",
     "Agent",
+    "AsyncAgent",
     "Recorder",
     "Playback",
     "AVAILABLE_AGENTS",
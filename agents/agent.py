@@ -1,18 +1,22 @@
-import json
+import asyncio
 import logging
 import os
 import time
 from abc import ABC, abstractmethod
 from copy import deepcopy
-from typing import Any, Optional
+from typing import Any, Optional, Sequence
 
+import httpx
 import requests
 import requests.cookies
 from pydantic import ValidationError
-from requests import Response
+from requests.adapters import HTTPAdapter
 from requests.cookies import RequestsCookieJar
 
+from .history import FrameHistory
+from .metrics import REGISTRY, Timings
 from .recorder import Recorder
+from .serialization import JSON_HEADERS, dumps, loads
 from .structs import FrameData, GameAction, GameState, Scorecard
 from .tracing import trace_agent_session
 
@@ -23,6 +27,9 @@ class Agent(ABC):
     """Interface for an agent that plays one ARC-AGI-3 game."""
 
     MAX_ACTIONS: int = 80  # to avoid looping forever if agent doesnt exit
+    FRAME_WINDOW: Optional[int] = None  # frames kept in memory, older ones spill to disk
+    SPILL_FRAMES: bool = True  # False drops frames that leave FRAME_WINDOW instead
+    TRUST_SERVER_FRAMES: bool = False  # skip per-cell validation of server frames
     ROOT_URL: str
 
     action_counter: int = 0
@@ -32,7 +39,8 @@ class Agent(ABC):
     card_id: str
     game_id: str
     guid: str
-    frames: list[FrameData]
+    frames: FrameHistory
+    timings: Timings
 
     recorder: Recorder
     headers: dict[str, str]
@@ -52,6 +60,7 @@ class Agent(ABC):
         record: bool,
         tags: Optional[list[str]] = None,
         cookies: requests.cookies.RequestsCookieJar = RequestsCookieJar(),
+        adapter: Optional[HTTPAdapter] = None,
     ) -> None:
         self.ROOT_URL = ROOT_URL
         self.card_id = card_id
@@ -60,7 +69,20 @@ class Agent(ABC):
         self.guid = ""
         self.agent_name = agent_name
         self.tags = tags or []
-        self.frames = [FrameData(score=0)]
+        # also exported live, labeled by game and agent, when the metrics endpoint runs
+        self.timings = Timings(
+            labels={"game": game_id, "agent": type(self).__name__.lower()}
+        )
+        self._active = False
+        window = os.getenv("FRAME_HISTORY_WINDOW")
+        self.frames = FrameHistory(
+            [FrameData(score=0)],
+            window=int(window) if window else self.FRAME_WINDOW,
+            spill=self.SPILL_FRAMES,
+        )
+        trust = os.getenv("TRUST_SERVER_FRAMES")
+        if trust is not None:
+            self.TRUST_SERVER_FRAMES = trust.lower() in ("1", "true", "yes")
         self._cleanup = True
         if record:
             self.start_recording()
@@ -72,28 +94,41 @@ class Agent(ABC):
         self._session = requests.Session()
         self._session.cookies = deepcopy(cookies)
         self._session.headers.update(self.headers)
+        # the session keeps this agent's cookies, connections come from the shared pool
+        self._shared_adapter = adapter is not None
+        if adapter is not None:
+            self._session.mount("https://", adapter)
+            self._session.mount("http://", adapter)
 
     @trace_agent_session
     def main(self) -> None:
         """The main agent loop. Play the game_id until finished, then exits."""
         self.timer = time.time()
+        self.set_active(True)
         while (
             not self.is_done(self.frames, self.frames[-1])
             and self.action_counter <= self.MAX_ACTIONS
         ):
-            action = self.choose_action(self.frames, self.frames[-1])
-            action_data = ''
-            if action.name == 'ACTION6':
-                action_data = f' ({action.action_data.x}, {action.action_data.y})'
-            if frame := self.take_action(action):
-                self.append_frame(frame)
-                logger.info(
-                    f"{self.game_id} - {action.name}{action_data}: count {self.action_counter}, score {frame.score}, avg fps {self.fps})"
-                )
+            with self.timings.span("action"):
+                with self.timings.span("choose_action"):
+                    action = self.choose_action(self.frames, self.frames[-1])
+                if frame := self.take_action(action):
+                    with self.timings.span("append_frame"):
+                        self.append_frame(frame)
+                    self.log_action(action, frame)
             self.action_counter += 1
+            REGISTRY.inc("arc_actions_total", **self.timings.labels)
 
         self.cleanup()
 
+    def log_action(self, action: GameAction, frame: FrameData) -> None:
+        action_data = ''
+        if action.name == 'ACTION6':
+            action_data = f' ({action.action_data.x}, {action.action_data.y})'
+        logger.info(
+            f"{self.game_id} - {action.name}{action_data}: count {self.action_counter}, score {frame.score}, avg fps {self.fps})"
+        )
+
     @property
     def state(self) -> GameState:
         return self.frames[-1].state
@@ -122,6 +157,22 @@ class Agent(ABC):
         n = self.__class__.__name__.lower()
         return f"{self.game_id}.{n}"
 
+    def summary(self) -> dict[str, Any]:
+        """Small picklable report of how this agent's game went."""
+        return {
+            "game_id": self.game_id,
+            "game_idx": self.game_idx,
+            "name": self.name,
+            "guid": self.guid,
+            "score": self.score,
+            "state": self.state.value,
+            "action_counter": self.action_counter,
+            "recording": self.recorder.filename
+            if hasattr(self, "recorder")
+            else None,
+            "timings": self.timings.to_dict(),
+        }
+
     def start_recording(self) -> None:
         filename = self.agent_name if self.is_playback else None
         self.recorder = Recorder(prefix=self.name, filename=filename)
@@ -134,9 +185,10 @@ class Agent(ABC):
         if frame.guid:
             self.guid = frame.guid
         if hasattr(self, "recorder") and not self.is_playback:
-            self.recorder.record(json.loads(frame.model_dump_json()))
+            self.recorder.record(frame.model_dump(mode="json"))
 
-    def do_action_request(self, action: GameAction) -> Response:
+    def build_action_payload(self, action: GameAction) -> dict[str, Any]:
+        """Build the JSON body sent to /api/cmd/{action} for this agent's game."""
         data = action.action_data.model_dump()
         if action == GameAction.RESET:
             data["card_id"] = self.card_id
@@ -146,20 +198,52 @@ class Agent(ABC):
             data["reasoning"] = action.reasoning
         if self.game_id:
             data["game_id"] = self.game_id
+        return data
+
+    def do_action_request(self, action: GameAction) -> dict[str, Any]:
+        """Post the action and return the parsed JSON response."""
+        with self.timings.span("request"):
+            r = self._session.post(
+                f"{self.ROOT_URL}/api/cmd/{action.name}",
+                data=dumps(self.build_action_payload(action)),
+                headers=JSON_HEADERS,
+            )
+        with self.timings.span("parse"):
+            response_data: dict[str, Any] = loads(r.content)
+        if REGISTRY.enabled:
+            self.count_response(r.status_code, response_data)
+        if "error" in response_data:
+            logger.warning(f"Exception during action request: {response_data}")
+        return response_data
 
-        json_str = json.dumps(data)
-        r = self._session.post(
-            f"{self.ROOT_URL}/api/cmd/{action.name}",
-            json=json.loads(json_str),
-            headers=self.headers,
-        )
-        if "error" in r.json():
-            logger.warning(f"Exception during action request: {r.json()}")
-        return r
+    def count_response(self, status: int, response_data: dict[str, Any]) -> None:
+        """Export HTTP errors of an action request."""
+        if status >= 400 or "error" in response_data:
+            REGISTRY.inc("arc_http_errors_total", status=status, **self.timings.labels)
+
+    def set_active(self, active: bool) -> None:
+        """Count this agent in the arc_active_agents gauge while it plays."""
+        if active != self._active:
+            self._active = active
+            REGISTRY.inc("arc_active_agents", 1 if active else -1, **self.timings.labels)
 
     def take_action(self, action: GameAction) -> Optional[FrameData]:
         """Submits the specific action and gets the next frame."""
-        frame_data = self.do_action_request(action).json()
+        frame_data = self.do_action_request(action)
+        with self.timings.span("validate"):
+            return self.parse_frame(frame_data)
+
+    def parse_frame(self, frame_data: dict[str, Any]) -> Optional[FrameData]:
+        """Turn a decoded frame response into FrameData, None if it is invalid.
+
+        With TRUST_SERVER_FRAMES the grid is taken as-is via `FrameData.from_server`,
+        anything that fast path rejects still goes through full validation.
+        """
+        if self.TRUST_SERVER_FRAMES:
+            try:
+                return FrameData.from_server(frame_data)
+            except (KeyError, TypeError, ValueError, AttributeError):
+                pass
         try:
             frame = FrameData.model_validate(frame_data)
         except ValidationError as e:
@@ -183,12 +267,16 @@ class Agent(ABC):
         """Called after main loop is finished."""
         if self._cleanup:
             self._cleanup = False  # only cleanup once per agent
+            self.set_active(False)
             if hasattr(self, "recorder") and not self.is_playback:
                 if scorecard:
                     self.recorder.record(scorecard.get(self.game_id))
                 else:
                     scorecard_obj = self.get_scorecard()
                     self.recorder.record(scorecard_obj.get(self.game_id))
+                if self.timings:
+                    self.recorder.record({"timings": self.timings.to_dict()})
+                self.recorder.close()
                 logger.info(
                     f"recording for {self.name} is available in {self.recorder.filename}"
                 )
@@ -200,17 +288,128 @@ class Agent(ABC):
                 logger.info(
                     f"Finishing: agent took {self.action_counter} actions, took {self.seconds} seconds ({self.fps} average fps)"
                 )
-            if hasattr(self, "_session"):
+            if self.timings:
+                logger.debug(f"{self.name} timings:\n{self.timings.report()}")
+            # a shared pool belongs to the Swarm and outlives this agent
+            if hasattr(self, "_session") and not self._shared_adapter:
                 self._session.close()
+            if isinstance(self.frames, FrameHistory):
+                self.frames.close()
 
     @abstractmethod
-    def is_done(self, frames: list[FrameData], latest_frame: FrameData) -> bool:
+    def is_done(self, frames: Sequence[FrameData], latest_frame: FrameData) -> bool:
         """Decide if the agent is done playing or not."""
         raise NotImplementedError
 
     @abstractmethod
     def choose_action(
-        self, frames: list[FrameData], latest_frame: FrameData
+        self, frames: Sequence[FrameData], latest_frame: FrameData
+    ) -> GameAction:
+        """Choose which action the Agent should take, fill in any arguments, and return it."""
+        raise NotImplementedError
+
+
+class AsyncAgent(Agent):
+    """Interface for an agent that plays one game as a task on an asyncio event loop.
+
+    `choose_action` and `take_action` are coroutines, and every request goes
+    through the agent's own `httpx.AsyncClient`, which holds its cookies. When
+    run from a Swarm all agents share one transport (connection pool) and one
+    event loop, so concurrent games don't cost a thread each.
+    """
+
+    client: Optional[httpx.AsyncClient]
+    transport: Optional[httpx.AsyncBaseTransport]
+
+    def __init__(
+        self,
+        *args: Any,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        **kwargs: Any,
+    ) -> None:
+        super().__init__(*args, **kwargs)
+        self.client = None
+        self.transport = transport
+
+    def main(self) -> None:
+        """Play the game_id on a private event loop, for use outside a Swarm."""
+        asyncio.run(self.main_async())
+
+    @trace_agent_session
+    async def main_async(self) -> None:
+        """The main agent loop. Play the game_id until finished, then exits."""
+        # no timeout, like the requests session of the sync path
+        self.client = httpx.AsyncClient(
+            headers=self.headers,
+            cookies=self._session.cookies,
+            transport=self.transport,
+            timeout=None,
+        )
+        try:
+            self.timer = time.time()
+            self.set_active(True)
+            while (
+                not self.is_done(self.frames, self.frames[-1])
+                and self.action_counter <= self.MAX_ACTIONS
+            ):
+                with self.timings.span("action"):
+                    with self.timings.span("choose_action"):
+                        action = await self.choose_action(self.frames, self.frames[-1])
+                    if frame := await self.take_action(action):
+                        with self.timings.span("append_frame"):
+                            self.append_frame(frame)
+                        self.log_action(action, frame)
+                self.action_counter += 1
+                REGISTRY.inc("arc_actions_total", **self.timings.labels)
+
+            scorecard = None
+            if hasattr(self, "recorder") and not self.is_playback:
+                scorecard = await self.get_scorecard_async()
+            self.cleanup(scorecard)
+        finally:
+            # closing the client closes its transport, which may be shared
+            if self.transport is None:
+                await self.client.aclose()
+            self.client = None
+
+    async def do_action_request(self, action: GameAction) -> dict[str, Any]:  # type: ignore[override]
+        """Post the action and return the parsed JSON response."""
+        assert self.client is not None
+        with self.timings.span("request"):
+            r = await self.client.post(
+                f"{self.ROOT_URL}/api/cmd/{action.name}",
+                content=dumps(self.build_action_payload(action)),
+                headers=JSON_HEADERS,
+            )
+        with self.timings.span("parse"):
+            response_data: dict[str, Any] = loads(r.content)
+        if REGISTRY.enabled:
+            self.count_response(r.status_code, response_data)
+        if "error" in response_data:
+            logger.warning(f"Exception during action request: {response_data}")
+        return response_data
+
+    async def take_action(self, action: GameAction) -> Optional[FrameData]:  # type: ignore[override]
+        """Submits the specific action and gets the next frame."""
+        frame_data = await self.do_action_request(action)
+        with self.timings.span("validate"):
+            return self.parse_frame(frame_data)
+
+    async def get_scorecard_async(self) -> Scorecard:
+        """Get the scorecard for this agent's game without blocking the event loop."""
+        assert self.client is not None
+        r = await self.client.get(
+            f"{self.ROOT_URL}/api/scorecard/{self.card_id}/{self.game_id}",
+            timeout=1,
+        )
+        response_data = r.json()
+        if "error" in response_data:
+            logger.warning(f"Exception during scorecard request: {response_data}")
+        return Scorecard.model_validate(response_data)
+
+    @abstractmethod
+    async def choose_action(  # type: ignore[override]
+        self, frames: Sequence[FrameData], latest_frame: FrameData
     ) -> GameAction:
         """Choose which action the Agent should take, fill in any arguments, and return it."""
         raise NotImplementedError
@@ -221,17 +420,26 @@ class Playback(Agent):
 
     MAX_ACTIONS = 1000000
     PLAYBACK_FPS = 5
+    # no pacing, replay as fast as the server answers (PLAYBACK_TURBO=1)
+    TURBO: bool = False
 
     recorded_actions: list[dict[str, Any]]
 
     def __init__(self, *args: Any, **kwargs: Any) -> None:
+        turbo = os.getenv("PLAYBACK_TURBO")
+        if turbo is not None:
+            self.TURBO = turbo.lower() in ("1", "true", "yes")
+        if self.TURBO:
+            # replayed frames come from the same server that recorded them
+            self.TRUST_SERVER_FRAMES = True
+            # playback never reads old frames, drop them rather than spill them
+            self.FRAME_WINDOW = self.FRAME_WINDOW or 64
+            self.SPILL_FRAMES = False
+        self._next_action_at = 0.0
         super().__init__(*args, **kwargs)
-        self.recorder = Recorder(
-            prefix=Recorder.get_prefix(self.agent_name),
-            guid=Recorder.get_guid(self.agent_name),
-        )
+        self.recorder = self.open_recording()
         self.recorded_actions = []
-        if self.agent_name in Recorder.list():
+        if os.path.isfile(self.recorder.filename):
             try:
                 self.recorded_actions = self.filter_actions()
                 logger.info(
@@ -245,21 +453,23 @@ class Playback(Agent):
                 f"Recording {self.agent_name} not found in available recordings"
             )
 
+    def open_recording(self) -> Recorder:
+        """The recording to play back, `agent_name` in RECORDINGS_DIR."""
+        return Recorder(
+            prefix=Recorder.get_prefix(self.agent_name),
+            filename=self.agent_name,
+        )
+
     def filter_actions(self) -> list[dict[str, Any]]:
-        return [
-            a
-            for a in self.recorder.get()
-            if "data" in a and "action_input" in a["data"]
-        ]
+        # only the actions are kept, not the frames recorded alongside them
+        return list(self.recorder.stream(fields=["action_input"]))
 
-    def is_done(self, frames: list[FrameData], latest_frame: FrameData) -> bool:
+    def is_done(self, frames: Sequence[FrameData], latest_frame: FrameData) -> bool:
         return bool(self.action_counter >= len(self.recorded_actions))
 
     def choose_action(
-        self, frames: list[FrameData], latest_frame: FrameData
+        self, frames: Sequence[FrameData], latest_frame: FrameData
     ) -> GameAction:
-        loop_start_time = time.time()
-
         if self.action_counter >= len(self.recorded_actions):
             logger.warning(
                 f"No more recorded actions available (counter: {self.action_counter}, total: {len(self.recorded_actions)})"
@@ -280,14 +490,31 @@ class Playback(Agent):
             f"Playback action {self.action_counter}: {action.name} with data {data}"
         )
 
-        target_frame_time = 1.0 / getattr(self, "PLAYBACK_FPS", 5)
-        elapsed_time = time.time() - loop_start_time
-        sleep_time = max(0, target_frame_time - elapsed_time)
-        if sleep_time > 0:
-            time.sleep(sleep_time)
+        if not self.TURBO and self.PLAYBACK_FPS > 0:
+            # pace against the previous action, so request time counts towards the frame
+            now = time.monotonic()
+            if self._next_action_at > now:
+                time.sleep(self._next_action_at - now)
+            self._next_action_at = max(now, self._next_action_at) + 1.0 / self.PLAYBACK_FPS
 
         return action
 
+    @property
+    def actions_per_second(self) -> float:
+        elapsed = time.time() - self.timer if self.timer else 0.0
+        return self.action_counter / elapsed if elapsed > 0 else 0.0
+
+    def summary(self) -> dict[str, Any]:
+        return {**super().summary(), "actions_per_second": self.actions_per_second}
+
+    def cleanup(self, scorecard: Optional[Scorecard] = None) -> None:
+        if self._cleanup:
+            logger.info(
+                f"Playback of {self.agent_name}: {self.action_counter} actions at "
+                f"{self.actions_per_second:.1f} actions/sec{' (turbo)' if self.TURBO else ''}"
+            )
+        super().cleanup(scorecard)
+
     def append_frame(self, frame: FrameData) -> None:
         # overwrite append_frame to not double record
         self.frames.append(frame)
@@ -0,0 +1,242 @@
+"""
+Text encodings of frames for LLM prompts.
+
+A frame is a list of grids of values 0-15. The default "list" encoding prints
+every row as a Python list, as the agents always have; the others trade some
+readability for far fewer prompt tokens:
+
+    list       [0, 0, 5, 5, ...] per row
+    hex        one hex digit per cell, one row per line
+    rle        runs of value*count per row
+    hex-dedup  hex rows, identical consecutive rows written once
+    rle-dedup  rle rows, identical consecutive rows written once
+    diff       only boxes around the cells changed since the previous frame,
+               with a full hex-dedup keyframe every KEYFRAME_INTERVAL frames
+
+Any encoding can be sent as deltas by wrapping it, `DiffEncoder(base=...)`,
+which LLM agents do with DELTA_FRAMES.
+
+`scripts/bench_grid_encoding.py` reports the token count of each encoding.
+"""
+
+from typing import Any, Callable, Optional, Sequence
+
+import numpy as np
+
+HEX_DIGITS = np.frombuffer(b"0123456789abcdef", dtype=np.uint8)
+
+
+class GridEncoder:
+    """Encodes frames as text, one "Grid i" block per grid."""
+
+    name = "list"
+    layout = "rows as lists"
+    keyframe = True  # the last frame encoded stands on its own
+
+    def encode(self, frame: Sequence[Sequence[Sequence[int]]]) -> str:
+        lines = []
+        for i, grid in enumerate(frame):
+            lines.extend(self.encode_grid(i, grid))
+            lines.append("")
+        return "\n".join(lines)
+
+    def encode_grid(self, i: int, grid: Sequence[Sequence[int]]) -> list[str]:
+        return [f"Grid {i}:"] + [f"  {row}" for row in grid]
+
+    def encode_rows(self, header: str, array: np.ndarray, y0: int) -> list[str]:
+        """Rows of part of a grid, numbered from `y0`, under `header`."""
+        return [f"{header}, y: row):"] + [
+            f"{y0 + y}: {row}" for y, row in enumerate(array.tolist())
+        ]
+
+    def reset(self) -> None:
+        """Forget any state kept between frames."""
+
+
+class RowEncoder(GridEncoder):
+    """Writes each row as a string, with runs of identical rows collapsed when `dedup`."""
+
+    name = "hex"
+    layout = "one hex digit per cell"
+
+    def __init__(self, dedup: bool = False) -> None:
+        self.dedup = dedup
+        if dedup:
+            self.name = f"{self.name}-dedup"
+
+    def encode_row(self, row: np.ndarray) -> str:
+        digits: bytes = HEX_DIGITS[row].tobytes()
+        return digits.decode("ascii")
+
+    def encode_grid(self, i: int, grid: Sequence[Sequence[int]]) -> list[str]:
+        array = np.asarray(grid, dtype=np.uint8)
+        height, width = array.shape
+        header = f"Grid {i} ({width}x{height}, {self.layout}"
+        return self.encode_rows(header, array, 0)
+
+    def encode_rows(self, header: str, array: np.ndarray, y0: int) -> list[str]:
+        rows = [self.encode_row(row) for row in array]
+        if not self.dedup:
+            return [f"{header}, rows top to bottom):"] + rows
+        lines = [f"{header}, y: row, a y range repeats the row):"]
+        start = 0
+        for y in range(1, len(rows) + 1):
+            if y == len(rows) or rows[y] != rows[start]:
+                span = (
+                    f"{y0 + start}" if y - 1 == start else f"{y0 + start}-{y0 + y - 1}"
+                )
+                lines.append(f"{span}: {rows[start]}")
+                start = y
+        return lines
+
+
+class RunLengthEncoder(RowEncoder):
+    name = "rle"
+    layout = "rows as runs of value*count, values in hex"
+
+    def encode_row(self, row: np.ndarray) -> str:
+        edges = np.flatnonzero(np.diff(row)) + 1
+        starts = np.concatenate(([0], edges))
+        counts = np.diff(np.concatenate((starts, [len(row)])))
+        digits = HEX_DIGITS[row[starts]].tobytes().decode("ascii")
+        return " ".join(
+            d if n == 1 else f"{d}*{n}" for d, n in zip(digits, counts.tolist())
+        )
+
+
+def changed_regions(
+    previous: np.ndarray, current: np.ndarray, gap: int = 2
+) -> list[tuple[int, int, int, int]]:
+    """
+    Bounding boxes (y0, x0, y1, x1), inclusive, of the cells that differ
+    between two grids of the same shape. Changes at most `gap` cells apart
+    share a box, so a moved object is one box rather than one per cell.
+    """
+    mask = previous != current
+    if not mask.any():
+        return []
+    # grow every change into a square so changes within `gap` overlap
+    grown = mask.copy()
+    for _ in range((gap + 1) // 2):
+        grown[1:] |= grown[:-1]
+        grown[:-1] |= grown[1:]
+        grown[:, 1:] |= grown[:, :-1]
+        grown[:, :-1] |= grown[:, 1:]
+    # label the blobs by spreading the smallest cell number through each one
+    background = grown.size
+    labels = np.where(grown, np.arange(grown.size).reshape(grown.shape), background)
+    while True:
+        spread = labels.copy()
+        np.minimum(spread[1:], labels[:-1], out=spread[1:])
+        np.minimum(spread[:-1], labels[1:], out=spread[:-1])
+        np.minimum(spread[:, 1:], labels[:, :-1], out=spread[:, 1:])
+        np.minimum(spread[:, :-1], labels[:, 1:], out=spread[:, :-1])
+        spread[~grown] = background
+        if np.array_equal(spread, labels):
+            break
+        labels = spread
+    regions = []
+    for label in np.unique(labels[mask]):
+        ys, xs = np.nonzero(mask & (labels == label))
+        regions.append((int(ys.min()), int(xs.min()), int(ys.max()), int(xs.max())))
+    return sorted(regions)
+
+
+class DiffEncoder(GridEncoder):
+    """
+    Encodes each grid against the one encoded before it, writing only the
+    boxes around the changed cells. Every KEYFRAME_INTERVAL frames the whole
+    grid is written instead, so a model that lost older frames from its
+    context can resynchronize; also whenever the size changes or the boxes
+    would cover more than MAX_CHANGED_SHARE of the grid.
+
+    Keyframes and boxes are written with `base` (hex-dedup by default), which
+    must be able to encode partial grids, see `encode_rows`. After `encode`,
+    `keyframe` tells whether the frame stands on its own.
+    """
+
+    name = "diff"
+    KEYFRAME_INTERVAL = 10
+    MAX_CHANGED_SHARE = 0.5
+
+    def __init__(
+        self,
+        keyframe_interval: Optional[int] = None,
+        base: Optional[GridEncoder] = None,
+    ) -> None:
+        self.keyframe_interval = keyframe_interval or self.KEYFRAME_INTERVAL
+        self.base = base or RowEncoder(dedup=True)
+        self.reset()
+
+    def reset(self) -> None:
+        """Write the next frame in full."""
+        self.previous: Optional[np.ndarray] = None
+        self.frames = 0
+        self.keyframe = False
+
+    def encode(self, frame: Sequence[Sequence[Sequence[int]]]) -> str:
+        scheduled = self.frames % self.keyframe_interval == 0
+        self.frames += 1
+        self.keyframe = False
+        lines = []
+        for i, grid in enumerate(frame):
+            array = np.asarray(grid, dtype=np.uint8)
+            previous, self.previous = self.previous, array
+            changes = None
+            if not (i == 0 and scheduled) and previous is not None:
+                changes = self.encode_changes(i, previous, array)
+            if changes is None:
+                changes = self.base.encode_grid(i, grid)
+                if i == 0:
+                    # the interval counts from the latest full frame
+                    self.keyframe = True
+                    self.frames = 1
+            lines.extend(changes)
+            lines.append("")
+        return "\n".join(lines)
+
+    def encode_changes(
+        self, i: int, previous: np.ndarray, array: np.ndarray
+    ) -> Optional[list[str]]:
+        """The changed boxes of grid `i`, None when it is better written in full."""
+        if previous.shape != array.shape:
+            return None
+        changed = np.count_nonzero(previous != array)
+        if not changed:
+            return [f"Grid {i}: unchanged."]
+        if changed > self.MAX_CHANGED_SHARE * array.size:
+            return None
+        regions = changed_regions(previous, array)
+        area = sum((y1 - y0 + 1) * (x1 - x0 + 1) for y0, x0, y1, x1 in regions)
+        if area > self.MAX_CHANGED_SHARE * array.size:
+            return None
+        lines = [
+            f"Grid {i}: {len(regions)} changed region(s), all other cells unchanged."
+        ]
+        for y0, x0, y1, x1 in regions:
+            header = f"Region x {x0}-{x1}, y {y0}-{y1} ({self.base.layout}"
+            lines.extend(
+                self.base.encode_rows(header, array[y0 : y1 + 1, x0 : x1 + 1], y0)
+            )
+        return lines
+
+
+# encoding name → factory, every agent gets its own encoder
+GRID_ENCODERS: dict[str, Callable[..., GridEncoder]] = {
+    "list": GridEncoder,
+    "hex": RowEncoder,
+    "rle": RunLengthEncoder,
+    "hex-dedup": lambda: RowEncoder(dedup=True),
+    "rle-dedup": lambda: RunLengthEncoder(dedup=True),
+    "diff": DiffEncoder,
+}
+
+
+def get_encoder(name: str, **kwargs: Any) -> GridEncoder:
+    try:
+        factory = GRID_ENCODERS[name]
+    except KeyError:
+        raise ValueError(
+            f"unknown grid encoding {name!r}, choose from {', '.join(GRID_ENCODERS)}"
+        ) from None
+    return factory(**kwargs)
@@ -0,0 +1,127 @@
+import json
+import tempfile
+from collections.abc import Iterable, Iterator, Sequence
+from typing import IO, Optional, SupportsIndex, Union, overload
+
+from .structs import FrameData
+
+
+class FrameHistory(Sequence[FrameData]):
+    """
+    An append-only sequence of frames that keeps only the newest `window` frames in memory.
+
+    Older frames are spilled as JSON to an anonymous temporary file and read back
+    on access, so long games don't hold every full grid in memory. Indexing,
+    slicing, iteration and len() cover the full history. A window of None
+    keeps everything in memory. With `spill` off, older frames are dropped
+    instead and the history only covers the newest `window` frames.
+    """
+
+    window: Optional[int]
+    spill: bool
+
+    def __init__(
+        self,
+        frames: Iterable[FrameData] = (),
+        window: Optional[int] = None,
+        spill: bool = True,
+    ) -> None:
+        if window is not None and window < 1:
+            raise ValueError("window must be at least 1")
+        self.window = window
+        self.spill = spill
+        self._recent: list[FrameData] = []
+        self._offsets: list[int] = []
+        self._store: Optional[IO[bytes]] = None
+        self.extend(frames)
+
+    @property
+    def spilled(self) -> int:
+        """Number of frames currently stored on disk."""
+        return len(self._offsets)
+
+    def append(self, frame: FrameData) -> None:
+        self._recent.append(frame)
+        if self.window is not None and len(self._recent) > self.window:
+            oldest = self._recent.pop(0)
+            if self.spill:
+                self._spill(oldest)
+
+    def extend(self, frames: Iterable[FrameData]) -> None:
+        for frame in frames:
+            self.append(frame)
+
+    def clear(self) -> None:
+        self._recent.clear()
+        self.close()
+        self._offsets = []
+
+    def close(self) -> None:
+        """Release the spill file, spilled frames are no longer readable afterwards."""
+        if self._store is not None:
+            self._store.close()
+            self._store = None
+
+    def _spill(self, frame: FrameData) -> None:
+        if self._store is None:
+            self._store = tempfile.TemporaryFile(prefix="frames-")
+        self._store.seek(0, 2)
+        self._offsets.append(self._store.tell())
+        self._store.write(frame.model_dump_json().encode("utf-8"))
+
+    def _load(self, idx: int) -> FrameData:
+        if self._store is None:
+            raise ValueError("FrameHistory is closed, spilled frames can't be read")
+        start = self._offsets[idx]
+        self._store.seek(0, 2)
+        end = (
+            self._offsets[idx + 1]
+            if idx + 1 < len(self._offsets)
+            else self._store.tell()
+        )
+        self._store.seek(start)
+        data = json.loads(self._store.read(end - start))
+        # available_actions are dumped as names, validating them would drop every one
+        available_actions = data.pop("available_actions")
+        frame = FrameData.model_validate(data)
+        frame.available_actions = available_actions
+        return frame
+
+    def __len__(self) -> int:
+        return self.spilled + len(self._recent)
+
+    def __bool__(self) -> bool:
+        return len(self) > 0
+
+    @overload
+    def __getitem__(self, idx: SupportsIndex) -> FrameData: ...
+
+    @overload
+    def __getitem__(self, idx: slice) -> list[FrameData]: ...
+
+    def __getitem__(
+        self, idx: Union[SupportsIndex, slice]
+    ) -> Union[FrameData, list[FrameData]]:
+        if isinstance(idx, slice):
+            return [self[i] for i in range(*idx.indices(len(self)))]
+        i = idx.__index__()
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("frame index out of range")
+        if i < self.spilled:
+            return self._load(i)
+        return self._recent[i - self.spilled]
+
+    def __iter__(self) -> Iterator[FrameData]:
+        for i in range(self.spilled):
+            yield self._load(i)
+        yield from self._recent
+
+    def __reversed__(self) -> Iterator[FrameData]:
+        yield from reversed(self._recent)
+        for i in reversed(range(self.spilled)):
+            yield self._load(i)
+
+    def __repr__(self) -> str:
+        return f"<FrameHistory frames={len(self)} in_memory={len(self._recent)} window={self.window}>"
@@ -0,0 +1,415 @@
+"""A local stand-in for the ARC-AGI-3 API, for benchmarks and tests without network.
+
+Implements /api/games, /api/scorecard/* and /api/cmd/* on the standard library's
+threading HTTP server. Games are either scripted or served from recordings, and
+every request can be delayed or failed on purpose:
+
+    python -m agents.local_server --games 8 --latency 0.02 --error-rate 0.01 --port 8001
+
+then run `main.py` with HOST=localhost PORT=8001.
+"""
+
+import argparse
+import functools
+import logging
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Optional, Protocol, Sequence
+
+from .recorder import Recorder
+from .serialization import dumps, loads
+from .structs import Card, GameAction, GameState, Scorecard
+
+logger = logging.getLogger("arc")
+
+
+class Game(Protocol):
+    """One play-through of a game: a fresh instance is created for every guid."""
+
+    game_id: str
+
+    def reset(self) -> dict[str, Any]: ...
+
+    def step(self, action: GameAction, data: dict[str, Any]) -> dict[str, Any]: ...
+
+
+class ScriptedGame:
+    """
+    A deterministic toy game: every action repaints a few cells, the score goes up
+    every `score_every` actions and the game is won after `win_after` actions.
+    ACTION6 paints the clicked cell.
+    """
+
+    def __init__(
+        self,
+        game_id: str,
+        size: int = 64,
+        win_after: int = 50,
+        score_every: int = 10,
+    ) -> None:
+        self.game_id = game_id
+        self.size = size
+        self.win_after = win_after
+        self.score_every = score_every
+        self.actions = 0
+        self.grid = [[0] * size for _ in range(size)]
+
+    def frame(self, action: GameAction, data: dict[str, Any]) -> dict[str, Any]:
+        won = self.actions >= self.win_after
+        return {
+            "game_id": self.game_id,
+            "frame": [[row[:] for row in self.grid]],
+            "state": (GameState.WIN if won else GameState.NOT_FINISHED).value,
+            "score": min(self.actions // self.score_every, 254),
+            "action_input": {"id": action.value, "data": data},
+            "available_actions": [1, 2, 3, 4, 5, 6],
+        }
+
+    def reset(self) -> dict[str, Any]:
+        self.actions = 0
+        self.grid = [[0] * self.size for _ in range(self.size)]
+        return self.frame(GameAction.RESET, {})
+
+    def step(self, action: GameAction, data: dict[str, Any]) -> dict[str, Any]:
+        self.actions += 1
+        if action is GameAction.ACTION6:
+            x = int(data.get("x", 0)) % self.size
+            y = int(data.get("y", 0)) % self.size
+            self.grid[y][x] = (self.grid[y][x] + 1) % 16
+        else:
+            row = (self.actions * 7 + action.value) % self.size
+            for col in range(action.value, self.size, 9):
+                self.grid[row][col] = (self.grid[row][col] + action.value) % 16
+        return self.frame(action, data)
+
+
+class RecordedGame:
+    """
+    Serves the frames of a recording in order, whatever actions are sent.
+
+    Load for benchmarks only: it ignores the actions, so replaying a recording
+    against it can't tell whether the recording is still valid.
+    """
+
+    def __init__(self, frames: Sequence[dict[str, Any]]) -> None:
+        if not frames:
+            raise ValueError("a recorded game needs at least one frame")
+        self.frames = frames
+        self.game_id = frames[0].get("game_id", "")
+        self.position = 0
+
+    @classmethod
+    def load(cls, path: str) -> Callable[[], "RecordedGame"]:
+        """A factory of games replaying the recording at `path`, read once."""
+        fields = (
+            "game_id",
+            "frame",
+            "state",
+            "score",
+            "action_input",
+            "available_actions",
+        )
+        frames = [
+            e["data"]
+            for e in Recorder.from_path(path).stream(fields=fields)
+            if "frame" in e["data"]
+        ]
+        game = cls(frames)  # validate eagerly
+        return lambda: cls(game.frames)
+
+    def reset(self) -> dict[str, Any]:
+        self.position = 0
+        return self.frames[0]
+
+    def step(self, action: GameAction, data: dict[str, Any]) -> dict[str, Any]:
+        self.position = min(self.position + 1, len(self.frames) - 1)
+        return self.frames[self.position]
+
+
+class LocalServer:
+    """
+    Serves `games` (game_id → factory of Game) on http://host:port, port 0 picks a
+    free one. Every request waits `latency` plus up to `jitter` seconds, and fails
+    with HTTP 500 with probability `error_rate`. Use as a context manager or call
+    start()/stop().
+    """
+
+    def __init__(
+        self,
+        games: dict[str, Callable[[], Game]],
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        seed: Optional[int] = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ) -> None:
+        self.games = games
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._sessions: dict[
+            str, tuple[str, str, Game]
+        ] = {}  # guid → (card_id, game_id, game)
+        self._scorecards: dict[str, Scorecard] = {}
+        self.requests = 0
+        self.actions = 0
+        self.errors = 0
+        self._actions_changed = threading.Condition(self._lock)
+        self._httpd = ThreadingHTTPServer((host, port), self._handler())
+        self._httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @classmethod
+    def scripted(cls, count: int = 1, **kwargs: Any) -> "LocalServer":
+        """A server with `count` scripted games named local-0000, local-0001, ..."""
+        win_after = kwargs.pop("win_after", 50)
+        games: dict[str, Callable[[], Game]] = {}
+        for i in range(count):
+            game_id = f"local-{i:04d}"
+            games[game_id] = functools.partial(
+                ScriptedGame, game_id, win_after=win_after
+            )
+        return cls(games, **kwargs)
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        if isinstance(host, bytes):
+            host = host.decode()
+        return f"http://{host}:{port}"
+
+    def start(self) -> "LocalServer":
+        self._thread = threading.Thread(
+            target=self._httpd.serve_forever, name="local-arc-server", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self) -> "LocalServer":
+        return self.start()
+
+    def __exit__(self, *args: Any) -> None:
+        self.stop()
+
+    def wait_for_actions(self, count: int, timeout: Optional[float] = None) -> bool:
+        """Block until at least `count` actions have been served."""
+        with self._actions_changed:
+            return self._actions_changed.wait_for(
+                lambda: self.actions >= count, timeout
+            )
+
+    # request handling
+
+    def _delay_and_fail(self) -> bool:
+        with self._lock:
+            self.requests += 1
+            delay = self.latency + (
+                self._random.uniform(0, self.jitter) if self.jitter else 0
+            )
+            fail = self.error_rate > 0 and self._random.random() < self.error_rate
+            if fail:
+                self.errors += 1
+        if delay > 0:
+            time.sleep(delay)
+        return fail
+
+    def handle(self, method: str, path: str, body: dict[str, Any]) -> tuple[int, Any]:
+        """Route one request, returns (status, JSON body)."""
+        if self._delay_and_fail():
+            return 500, {"error": "injected server error"}
+        parts = path.strip("/").split("/")
+        if method == "GET" and parts == ["api", "games"]:
+            return 200, [{"game_id": g, "title": g} for g in self.games]
+        if parts[:2] == ["api", "scorecard"] and len(parts) >= 3:
+            return self._scorecard(method, parts[2:], body)
+        if method == "POST" and parts[:2] == ["api", "cmd"] and len(parts) == 3:
+            return self._command(parts[2], body)
+        return 404, {"error": f"no route for {method} {path}"}
+
+    def _scorecard(
+        self, method: str, parts: list[str], body: dict[str, Any]
+    ) -> tuple[int, Any]:
+        with self._lock:
+            if method == "POST" and parts == ["open"]:
+                card_id = str(uuid.uuid4())
+                self._scorecards[card_id] = Scorecard(
+                    card_id=card_id, tags=body.get("tags")
+                )
+                return 200, {"card_id": card_id}
+            card_id = body.get("card_id", "") if parts == ["close"] else parts[0]
+            scorecard = self._scorecards.get(card_id)
+            if scorecard is None:
+                return 404, {"error": f"unknown card_id {card_id}"}
+            if method == "POST" and parts == ["close"]:
+                del self._scorecards[card_id]
+            elif len(parts) > 1:
+                return 200, scorecard.get_json_for(parts[1])
+            return 200, scorecard.model_dump(mode="json")
+
+    def _command(self, name: str, body: dict[str, Any]) -> tuple[int, Any]:
+        try:
+            action = GameAction.from_name(name)
+        except ValueError:
+            return 400, {"error": f"unknown action {name}"}
+        data = {k: v for k, v in body.items() if k in ("x", "y")}
+        with self._lock:
+            guid = body.get("guid") or ""
+            if action is GameAction.RESET:
+                game_id = body.get("game_id", "")
+                card_id = body.get("card_id", "")
+                if game_id not in self.games:
+                    return 404, {"error": f"unknown game_id {game_id}"}
+                # a RESET with a known guid restarts that play, otherwise a new play starts
+                new_play = guid not in self._sessions
+                if new_play:
+                    guid = str(uuid.uuid4())
+                    self._sessions[guid] = (card_id, game_id, self.games[game_id]())
+                card_id, game_id, game = self._sessions[guid]
+                frame = game.reset()
+                card = self._card(card_id, game_id)
+                if card is not None and new_play:
+                    card.total_plays += 1
+                    card.guids.append(guid)
+                    card.scores.append(0)
+                    card.states.append(GameState.NOT_FINISHED)
+                    card.actions.append(0)
+                    card.resets.append(0)
+                elif card is not None and guid in card.guids:
+                    card.resets[card.guids.index(guid)] += 1
+            else:
+                if guid not in self._sessions:
+                    return 400, {"error": f"unknown guid {guid}, send RESET first"}
+                card_id, game_id, game = self._sessions[guid]
+                frame = game.step(action, data)
+            card = self._card(card_id, game_id)
+            if card is not None and guid in card.guids:
+                # plays of one game on one card may run at the same time
+                play = card.guids.index(guid)
+                card.scores[play] = frame.get("score", 0)
+                card.states[play] = GameState(
+                    frame.get("state", GameState.NOT_FINISHED)
+                )
+                if action is not GameAction.RESET:
+                    card.actions[play] += 1
+            self.actions += 1
+            self._actions_changed.notify_all()
+        return 200, {**frame, "guid": guid}
+
+    def _card(self, card_id: str, game_id: str) -> Optional[Card]:
+        scorecard = self._scorecards.get(card_id)
+        if scorecard is None:
+            return None
+        return scorecard.cards.setdefault(game_id, Card(game_id=game_id))
+
+    def _handler(self) -> type[BaseHTTPRequestHandler]:
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive, like the real API
+            disable_nagle_algorithm = True  # headers and body go out as separate writes
+
+            def log_message(self, format: str, *args: Any) -> None:
+                logger.debug(f"local server: {format % args}")
+
+            def handle(self) -> None:
+                try:
+                    super().handle()
+                except ConnectionError:
+                    pass  # the client went away, e.g. a killed benchmark process
+
+            def respond(self) -> None:
+                length = int(self.headers.get("Content-Length") or 0)
+                raw = self.rfile.read(length) if length else b""
+                try:
+                    body = loads(raw) if raw else {}
+                except ValueError:
+                    status, payload = 400, {"error": "invalid JSON body"}
+                else:
+                    status, payload = server.handle(self.command, self.path, body)
+                data = dumps(payload)
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            do_GET = respond
+            do_POST = respond
+
+        return Handler
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument(
+        "--games", type=int, default=1, help="Number of scripted games."
+    )
+    parser.add_argument(
+        "--win-after",
+        type=int,
+        default=50,
+        help="Actions until a scripted game is won.",
+    )
+    parser.add_argument(
+        "--recording",
+        action="append",
+        default=[],
+        help="Also serve this recording as a game.",
+    )
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="Seconds added to every request."
+    )
+    parser.add_argument(
+        "--jitter",
+        type=float,
+        default=0.0,
+        help="Extra random delay, up to this many seconds.",
+    )
+    parser.add_argument(
+        "--error-rate",
+        type=float,
+        default=0.0,
+        help="Fraction of requests that fail with HTTP 500.",
+    )
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    server = LocalServer.scripted(
+        args.games,
+        win_after=args.win_after,
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        seed=args.seed,
+        host=args.host,
+        port=args.port,
+    )
+    for path in args.recording:
+        factory = RecordedGame.load(path)
+        server.games[factory().game_id] = factory
+    print(
+        f"Serving {len(server.games)} games on {server.url}: {', '.join(server.games)}"
+    )
+    with server:
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
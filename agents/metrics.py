@@ -0,0 +1,320 @@
+import bisect
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Iterator, Mapping, Optional
+
+logger = logging.getLogger("arc")
+
+# upper bounds of the histogram buckets in microseconds, 1 µs to 100 s
+BUCKETS_US: tuple[int, ...] = tuple(m * 10**e for e in range(9) for m in (1, 2, 5))[:-2]
+
+# the phases of one action in Agent.main, in order
+PHASES = (
+    "choose_action",
+    "llm",
+    "request",
+    "parse",
+    "validate",
+    "append_frame",
+    "action",
+)
+
+
+class Histogram:
+    """
+    Latency histogram over fixed 1-2-5 buckets (BUCKETS_US) plus one overflow
+    bucket. Histograms of different agents or processes merge by adding counts.
+    """
+
+    __slots__ = ("counts", "count", "total", "min", "max")
+
+    def __init__(self) -> None:
+        self.counts = [0] * (len(BUCKETS_US) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min = float("inf")
+        self.max = 0.0
+
+    def observe(self, seconds: float) -> None:
+        self.counts[bisect.bisect_left(BUCKETS_US, seconds * 1e6)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds < self.min:
+            self.min = seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def merge(self, other: "Histogram") -> None:
+        for i, n in enumerate(other.counts):
+            self.counts[i] += n
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def quantile(self, q: float) -> float:
+        """Upper bound in seconds of the bucket holding the q-th quantile."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if n and seen >= rank:
+                bound = BUCKETS_US[i] / 1e6 if i < len(BUCKETS_US) else self.max
+                return max(min(bound, self.max), self.min)
+        return self.max
+
+    def to_dict(self) -> dict[str, Any]:
+        """JSON-ready form, buckets keyed by their upper bound in µs ("inf" for overflow)."""
+        bounds = [str(b) for b in BUCKETS_US] + ["inf"]
+        return {
+            "count": self.count,
+            "total": self.total,
+            "min": self.min if self.count else 0.0,
+            "max": self.max,
+            "p50": self.quantile(0.5),
+            "p99": self.quantile(0.99),
+            "buckets": {bounds[i]: n for i, n in enumerate(self.counts) if n},
+        }
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> "Histogram":
+        histogram = cls()
+        bounds = [str(b) for b in BUCKETS_US] + ["inf"]
+        for bound, n in data.get("buckets", {}).items():
+            histogram.counts[bounds.index(bound)] += n
+        histogram.count = data.get("count", 0)
+        histogram.total = data.get("total", 0.0)
+        if histogram.count:
+            histogram.min = data.get("min", 0.0)
+        histogram.max = data.get("max", 0.0)
+        return histogram
+
+    def __repr__(self) -> str:
+        return f"<Histogram count={self.count} mean={self.mean * 1000:.3f}ms>"
+
+
+class Timings:
+    """
+    Named latency histograms, one per phase. Not thread-safe: each agent keeps
+    its own and a Swarm merges them once the agents are done.
+
+    With `labels`, every observation is also exported live as the
+    arc_{phase}_seconds histogram while the metrics endpoint is running.
+    """
+
+    def __init__(self, labels: Optional[Mapping[str, str]] = None) -> None:
+        self.histograms: dict[str, Histogram] = {}
+        self.labels = dict(labels or {})
+
+    def observe(self, phase: str, seconds: float) -> None:
+        histogram = self.histograms.get(phase)
+        if histogram is None:
+            histogram = self.histograms[phase] = Histogram()
+        histogram.observe(seconds)
+        if self.labels and REGISTRY.enabled:
+            REGISTRY.observe(f"arc_{phase}_seconds", seconds, **self.labels)
+
+    @contextmanager
+    def span(self, phase: str) -> Iterator[None]:
+        """Time the body of a with-block into `phase`, also when it raises."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(phase, time.perf_counter() - start)
+
+    def merge(self, other: "Timings | Mapping[str, Any]") -> None:
+        """Add another Timings, or its to_dict() form, into this one."""
+        if isinstance(other, Timings):
+            histograms = other.histograms
+        else:
+            histograms = {p: Histogram.from_dict(d) for p, d in other.items()}
+        for phase, histogram in histograms.items():
+            self.histograms.setdefault(phase, Histogram()).merge(histogram)
+
+    def to_dict(self) -> dict[str, dict[str, Any]]:
+        return {phase: h.to_dict() for phase, h in self.histograms.items()}
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> "Timings":
+        timings = cls()
+        timings.merge(data)
+        return timings
+
+    def report(self, total: Optional[str] = "action") -> str:
+        """
+        One line per phase with count, mean, p50, p99 and its share of the
+        `total` phase's time, known phases first.
+        """
+        whole = self.histograms[total].total if total in self.histograms else 0.0
+        order = [p for p in PHASES if p in self.histograms]
+        order += sorted(p for p in self.histograms if p not in PHASES)
+        lines = []
+        for phase in order:
+            h = self.histograms[phase]
+            share = f" {h.total / whole:6.1%}" if whole and phase != total else ""
+            lines.append(
+                f"{phase:<14} n={h.count:<7} mean {h.mean * 1000:9.3f} ms"
+                f"  p50 {h.quantile(0.5) * 1000:9.3f} ms  p99 {h.quantile(0.99) * 1000:9.3f} ms"
+                f"  total {h.total:8.3f} s{share}"
+            )
+        return "\n".join(lines)
+
+    def __bool__(self) -> bool:
+        return bool(self.histograms)
+
+    def __repr__(self) -> str:
+        return f"<Timings phases={list(self.histograms)}>"
+
+
+# name → (type, help) of the metrics exported by the agents
+METRICS: dict[str, tuple[str, str]] = {
+    "arc_actions_total": ("counter", "Actions taken."),
+    "arc_http_errors_total": ("counter", "Action requests answered with an error."),
+    "arc_llm_tokens_total": ("counter", "LLM tokens used."),
+    "arc_llm_prompt_tokens_total": ("counter", "LLM prompt tokens sent."),
+    "arc_llm_cached_tokens_total": (
+        "counter",
+        "LLM prompt tokens read from the provider's prompt cache.",
+    ),
+    "arc_active_agents": ("gauge", "Agents currently playing."),
+}
+
+
+def _label_key(labels: Mapping[str, Any]) -> tuple[tuple[str, str], ...]:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(key: tuple[tuple[str, str], ...], **extra: str) -> str:
+    pairs = list(key) + list(extra.items())
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+class MetricsRegistry:
+    """
+    Labeled counters, gauges and histograms of a running swarm, rendered in the
+    Prometheus text format. Updates are no-ops until the registry is enabled,
+    which `serve` does. Thread-safe.
+    """
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self._lock = threading.Lock()
+        self._values: dict[str, dict[tuple[tuple[str, str], ...], float]] = {}
+        self._histograms: dict[str, dict[tuple[tuple[str, str], ...], Histogram]] = {}
+
+    def inc(self, name: str, value: float = 1, /, **labels: Any) -> None:
+        """Add `value` to a counter or gauge."""
+        if not self.enabled:
+            return
+        key = _label_key(labels)
+        with self._lock:
+            values = self._values.setdefault(name, {})
+            values[key] = values.get(key, 0) + value
+
+    def observe(self, name: str, seconds: float, /, **labels: Any) -> None:
+        if not self.enabled:
+            return
+        key = _label_key(labels)
+        with self._lock:
+            histograms = self._histograms.setdefault(name, {})
+            histogram = histograms.get(key)
+            if histogram is None:
+                histogram = histograms[key] = Histogram()
+            histogram.observe(seconds)
+
+    def value(self, name: str, /, **labels: Any) -> float:
+        with self._lock:
+            return self._values.get(name, {}).get(_label_key(labels), 0)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+            self._histograms.clear()
+
+    def render(self) -> str:
+        lines: list[str] = []
+        bounds = [f"{b / 1e6:g}" for b in BUCKETS_US] + ["+Inf"]
+        with self._lock:
+            for name, values in sorted(self._values.items()):
+                kind, help = METRICS.get(name, ("untyped", name))
+                lines += [f"# HELP {name} {help}", f"# TYPE {name} {kind}"]
+                for key, value in sorted(values.items()):
+                    lines.append(f"{name}{_format_labels(key)} {value:g}")
+            for name, histograms in sorted(self._histograms.items()):
+                phase = name.removeprefix("arc_").removesuffix("_seconds")
+                lines += [
+                    f"# HELP {name} Seconds spent in {phase}.",
+                    f"# TYPE {name} histogram",
+                ]
+                for key, h in sorted(histograms.items()):
+                    cumulative = 0
+                    for le, n in zip(bounds, h.counts):
+                        cumulative += n
+                        lines.append(
+                            f"{name}_bucket{_format_labels(key, le=le)} {cumulative}"
+                        )
+                    lines.append(f"{name}_sum{_format_labels(key)} {h.total:g}")
+                    lines.append(f"{name}_count{_format_labels(key)} {h.count}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+
+def serve(
+    port: Optional[int] = None, host: Optional[str] = None
+) -> Optional[ThreadingHTTPServer]:
+    """
+    Enable REGISTRY and serve it at http://host:port/metrics from a daemon thread.
+    The port defaults to METRICS_PORT, nothing is served when neither is set.
+    Port 0 picks a free one, see `server.server_address`. The host defaults to
+    METRICS_HOST or 127.0.0.1, set it to 0.0.0.0 to be scraped from other hosts.
+
+    Agents in Swarm worker processes (--processes) update their own process's
+    registry, so only agents running in this process are exported.
+    """
+    if port is None:
+        if not os.getenv("METRICS_PORT"):
+            return None
+        port = int(os.environ["METRICS_PORT"])
+    if host is None:
+        host = os.getenv("METRICS_HOST", "127.0.0.1")
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, format: str, *args: Any) -> None:
+            pass
+
+        def do_GET(self) -> None:
+            if self.path.split("?")[0] not in ("/metrics", "/"):
+                self.send_error(404)
+                return
+            data = REGISTRY.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics", daemon=True).start()
+    REGISTRY.enabled = True
+    logger.info(f"Serving metrics on http://{host}:{server.server_address[1]}/metrics")
+    return server
@@ -1,10 +1,44 @@
-import json
+import atexit
+import gzip
+import logging
+import mmap
 import os
+import re
+import threading
+import time
 import uuid
+import weakref
+import zlib
 from datetime import datetime, timezone
-from typing import Any, Optional
+from typing import IO, Any, Callable, Iterable, Iterator, Optional, Sequence, cast
+
+import numpy as np
+import numpy.typing as npt
+from pydantic import BaseModel
+
+from .serialization import dumps, loads
+
+logger = logging.getLogger("arc")
 
 RECORDING_SUFFIX = "recording.jsonl"
+COMPRESSED_SUFFIX = f"{RECORDING_SUFFIX}.gz"
+READ_CHUNK_SIZE = 1 << 20
+# cheap prefilter for lines that may hold a frame, `_has_frame` decides
+_FRAME_KEY = re.compile(rb'"frame":\s*\[')
+# bumped when the meaning of the stored offsets or frames changes
+INDEX_VERSION = 2
+FSYNC_POLICIES = ("never", "close", "always")
+
+# recorders with buffered events, flushed by one background thread for the whole process
+_buffered: "weakref.WeakSet[Recorder]" = weakref.WeakSet()
+_open: "weakref.WeakSet[Recorder]" = weakref.WeakSet()
+_flusher: Optional[threading.Thread] = None
+_flusher_lock = threading.Lock()
+_wakeup = threading.Event()
+
+CATALOG_FILENAME = "catalog.json"
+# recordings dir → (dir mtime, recording filenames)
+_listings: dict[str, tuple[int, list[str]]] = {}
 
 
 def get_recordings_dir() -> str:
@@ -12,10 +46,93 @@ def get_recordings_dir() -> str:
     return os.environ.get("RECORDINGS_DIR", "")
 
 
+def flush_all() -> None:
+    """Flush every recorder in this process that still holds buffered events."""
+    for recorder in list(_open):
+        try:
+            recorder.flush()
+        except OSError as e:
+            logger.warning(f"Failed to flush {recorder}: {e}")
+
+
+def _flush_loop() -> None:
+    while True:
+        intervals = [r.flush_interval for r in list(_buffered)]
+        _wakeup.wait(min(intervals) if intervals else None)
+        _wakeup.clear()
+        flush_all()
+
+
+def _start_flusher() -> None:
+    global _flusher
+    with _flusher_lock:
+        if _flusher is None or not _flusher.is_alive():
+            _flusher = threading.Thread(
+                target=_flush_loop, name="recorder-flush", daemon=True
+            )
+            _flusher.start()
+    _wakeup.set()
+
+
+atexit.register(flush_all)
+
+
 class Recorder:
+    """
+    Appends JSONL events to one recording file through a single open handle.
+
+    By default every event is written through immediately. With a positive
+    `flush_interval` (seconds) events are buffered and written in batches by a
+    shared background thread, or as soon as `batch_size` events are pending.
+    `fsync` is one of "never", "close" or "always" (on every flush). Defaults
+    come from RECORDING_FLUSH_INTERVAL, RECORDING_BATCH_SIZE and RECORDING_FSYNC.
+
+    With `compress` (or RECORDING_COMPRESS=1) the recording is gzipped JSONL
+    (`.recording.jsonl.gz`) and each frame is stored as the list of changed
+    [layer, y, x, value] cells against the previous frame, with a full
+    keyframe every `keyframe_interval` frames. `get` decodes both formats.
+    """
+
     def __init__(
-        self, prefix: str, filename: Optional[str] = None, guid: Optional[str] = None
+        self,
+        prefix: str,
+        filename: Optional[str] = None,
+        guid: Optional[str] = None,
+        flush_interval: Optional[float] = None,
+        batch_size: Optional[int] = None,
+        fsync: Optional[str] = None,
+        compress: Optional[bool] = None,
+        keyframe_interval: Optional[int] = None,
     ) -> None:
+        self.flush_interval = (
+            flush_interval
+            if flush_interval is not None
+            else float(os.environ.get("RECORDING_FLUSH_INTERVAL", 0))
+        )
+        self.batch_size = batch_size or int(os.environ.get("RECORDING_BATCH_SIZE", 64))
+        self.fsync = fsync or os.environ.get("RECORDING_FSYNC", "never")
+        if self.fsync not in FSYNC_POLICIES:
+            raise ValueError(
+                f"fsync must be one of {FSYNC_POLICIES}, got {self.fsync!r}"
+            )
+        if filename:
+            self.compressed = filename.endswith(".gz")
+        elif compress is not None:
+            self.compressed = compress
+        else:
+            self.compressed = os.environ.get("RECORDING_COMPRESS", "").lower() in (
+                "1",
+                "true",
+                "yes",
+            )
+        self.keyframe_interval = keyframe_interval or int(
+            os.environ.get("RECORDING_KEYFRAME_INTERVAL", 100)
+        )
+        self._file: Optional[IO[bytes]] = None
+        self._pending: list[bytes] = []
+        self._lock = threading.Lock()
+        self._last_grid: Optional[npt.NDArray[Any]] = None
+        self._since_keyframe = 0
         self.guid = self.get_guid(filename) if filename else (guid or str(uuid.uuid4()))
         self.prefix: str = prefix
         recordings_dir = get_recordings_dir()
@@ -25,7 +142,7 @@ class Recorder:
             if filename
             else os.path.join(
                 recordings_dir,
-                f"{self.prefix}.{dt}.{RECORDING_SUFFIX}",
+                f"{self.prefix}.{dt}.{COMPRESSED_SUFFIX if self.compressed else RECORDING_SUFFIX}",
             )
         )
         # Create directory once during initialization
@@ -41,37 +158,389 @@ class Recorder:
         event["timestamp"] = datetime.now(timezone.utc).isoformat()
         event["data"] = data
 
-        with open(self.filename, "a", encoding="utf-8") as f:
-            json.dump(event, f)
-            f.write("\n")
+        with self._lock:
+            if self._file is None:
+                # opened on first use so a bad path fails here, not in the flush thread
+                self._file = (
+                    cast(IO[bytes], gzip.open(self.filename, "ab"))
+                    if self.compressed
+                    else open(self.filename, "ab")
+                )
+                _open.add(self)
+            if self.compressed:
+                event = self._encode(event)
+            self._pending.append(dumps(event) + b"\n")
+            if self.flush_interval <= 0 or len(self._pending) >= self.batch_size:
+                self._flush()
+                return
+        if self not in _buffered:
+            _buffered.add(self)
+            _start_flusher()
+
+    def _encode(self, event: dict[str, Any]) -> dict[str, Any]:
+        """Replace the frame in `event` with a delta against the last recorded frame."""
+        data = event["data"]
+        frame = data.get("frame") if isinstance(data, dict) else None
+        if not isinstance(frame, list) or not frame:
+            return event
+        try:
+            grid = np.asarray(frame)
+        except ValueError:  # ragged grid, store as-is
+            return event
+        if grid.ndim != 3 or grid.dtype.kind not in "iu":
+            return event
+        previous, self._last_grid = self._last_grid, grid
+        self._since_keyframe += 1
+        if (
+            previous is None
+            or previous.shape != grid.shape
+            or self._since_keyframe >= self.keyframe_interval
+        ):
+            self._since_keyframe = 0
+            return event
+        changed = np.argwhere(grid != previous)
+        delta = np.column_stack((changed, grid[tuple(changed.T)])).tolist()
+        return {
+            "timestamp": event["timestamp"],
+            "data": {k: v for k, v in data.items() if k != "frame"},
+            "delta": delta,
+        }
+
+    def flush(self) -> None:
+        """Write any buffered events to the recording file."""
+        with self._lock:
+            self._flush()
+
+    def _flush(self) -> None:
+        if self._file is None or not self._pending:
+            return
+        self._file.write(b"".join(self._pending))
+        self._pending.clear()
+        self._file.flush()
+        if self.fsync == "always":
+            os.fsync(self._file.fileno())
+
+    def close(self) -> None:
+        """Flush buffered events and release the file handle. Recording again reopens it."""
+        with self._lock:
+            if self._file is None:
+                return
+            try:
+                self._flush()
+                if self.fsync != "never":
+                    os.fsync(self._file.fileno())
+            finally:
+                self._file.close()
+                self._file = None
+                _buffered.discard(self)
+                _open.discard(self)
 
     def get(self) -> list[dict[str, Any]]:
         """
         Loads all recorded events and returns them as a list of dictionaries.
         """
-        if not os.path.isfile(self.filename):
-            return []
+        return list(self.iter())
 
-        events: list[dict[str, Any]] = []
-        with open(self.filename, "r", encoding="utf-8") as f:
+    def iter(self, start: int = 0) -> Iterator[dict[str, Any]]:
+        """
+        Yields recorded events one at a time, beginning with event number `start`.
+        Plain recordings seek straight to `start` through the offset index.
+        """
+        return self._events(start)
+
+    def stream(
+        self,
+        filter: Optional[Callable[[dict[str, Any]], bool]] = None,
+        fields: Optional[Sequence[str]] = None,
+        start: int = 0,
+    ) -> Iterator[dict[str, Any]]:
+        """
+        Yields events lazily, keeping only those for which `filter(event)` is true.
+
+        With `fields` the event data is projected down to those keys, and events
+        whose data has none of them are skipped, e.g. `fields=["action_input"]`
+        yields just the actions. Lines that cannot hold a wanted field are
+        skipped before they are parsed.
+        """
+        keys = tuple(fields or ())
+        pattern = (
+            re.compile(b"|".join(re.escape(dumps(key)) + rb"\s*:" for key in keys))
+            if keys
+            else None
+        )
+        for event in self._events(start, pattern):
+            if filter is not None and not filter(event):
+                continue
+            if keys:
+                data = event.get("data")
+                if not isinstance(data, dict):
+                    continue
+                projected = {key: data[key] for key in keys if key in data}
+                if not projected:
+                    continue
+                event = {**event, "data": projected}
+            yield event
+
+    def _events(
+        self, start: int = 0, pattern: Optional[re.Pattern[bytes]] = None
+    ) -> Iterator[dict[str, Any]]:
+        self.flush()
+        if not os.path.isfile(self.filename):
+            return
+        if self.compressed:
+            # every frame has to be decoded to rebuild the deltas that follow it
+            for i, event in enumerate(self._decode(self._read_lines())):
+                if i >= start:
+                    yield event
+            return
+        offset = 0
+        if start > 0:
+            offsets, _ = self._index()
+            if start >= len(offsets):
+                return
+            offset = int(offsets[start])
+        with open(self.filename, "rb") as f:
+            f.seek(offset)
             for line in f:
                 line = line.strip()
-                if line:
-                    events.append(json.loads(line))
-        return events
+                if line and (pattern is None or pattern.search(line)):
+                    yield loads(line)
+
+    def event(self, n: int) -> dict[str, Any]:
+        """
+        Returns event number `n` (negative counts from the end). Plain recordings
+        read only that line through the offset index and mmap, compressed ones
+        are decoded from the start.
+        """
+        self.flush()
+        if self.compressed:
+            events = self.get()
+            return events[n]
+        offsets, _ = self._index()
+        if not -len(offsets) <= n < len(offsets):
+            raise IndexError(f"event {n} out of range for {self.filename}")
+        n %= len(offsets)
+        with (
+            open(self.filename, "rb") as f,
+            mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm,
+        ):
+            start = int(offsets[n])
+            end = mm.find(b"\n", start)
+            event: dict[str, Any] = loads(mm[start : end if end != -1 else len(mm)])
+            return event
+
+    def frame(self, n: int) -> dict[str, Any]:
+        """Returns the `n`th event that holds a non-empty frame (negative counts from the end)."""
+        self.flush()
+        if self.compressed:
+            return [e for e in self.get() if _has_frame(e)][n]
+        _, frames = self._index()
+        if not -len(frames) <= n < len(frames):
+            raise IndexError(f"frame {n} out of range for {self.filename}")
+        return self.event(int(frames[n]))
+
+    def count(self) -> int:
+        """Number of recorded events."""
+        self.flush()
+        if not os.path.isfile(self.filename):
+            return 0
+        if self.compressed:
+            return sum(1 for _ in self._decode(self._read_lines()))
+        return len(self._index()[0])
+
+    @property
+    def index_filename(self) -> str:
+        # kept in a hidden directory so globs over the recordings never pick it up
+        directory, name = os.path.split(self.filename)
+        return os.path.join(directory, ".index", f"{name}.idx")
+
+    def _index(self) -> tuple[npt.NDArray[np.int64], npt.NDArray[np.int64]]:
+        """
+        Byte offset of every event and event number of every frame, kept in a
+        sidecar `.idx` file. Recordings are append-only, so only lines written
+        since the index was last saved get scanned.
+        """
+        size = os.path.getsize(self.filename) if os.path.isfile(self.filename) else 0
+        covered, offsets, frames = 0, np.empty(0, np.int64), np.empty(0, np.int64)
+        if os.path.isfile(self.index_filename):
+            try:
+                with open(self.index_filename, "rb") as f, np.load(f) as index:
+                    if int(index["version"]) == INDEX_VERSION:
+                        covered = int(index["size"])
+                        offsets, frames = index["offsets"], index["frames"]
+            except (OSError, ValueError, KeyError):
+                covered = 0
+            if covered > size:  # rewritten since, start over
+                covered, offsets, frames = 0, offsets[:0], frames[:0]
+        if covered == size:
+            return offsets, frames
+
+        new_offsets: list[int] = []
+        new_frames: list[int] = []
+        n = len(offsets)
+        with (
+            open(self.filename, "rb") as f,
+            mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm,
+        ):
+            pos = covered
+            while pos < size:
+                end = mm.find(b"\n", pos, size)
+                if end == -1:  # last line still being written
+                    break
+                line = mm[pos:end]
+                if line.strip():
+                    new_offsets.append(pos)
+                    if _FRAME_KEY.search(line) and _has_frame(loads(line)):
+                        new_frames.append(n)
+                    n += 1
+                pos = end + 1
+        offsets = np.concatenate((offsets, np.asarray(new_offsets, np.int64)))
+        frames = np.concatenate((frames, np.asarray(new_frames, np.int64)))
+        try:
+            os.makedirs(os.path.dirname(self.index_filename), exist_ok=True)
+            with open(self.index_filename, "wb") as out:
+                np.savez(
+                    out,
+                    version=INDEX_VERSION,
+                    size=pos,
+                    offsets=offsets,
+                    frames=frames,
+                )
+        except OSError as e:
+            logger.debug(f"Could not write recording index {self.index_filename}: {e}")
+        return offsets, frames
+
+    def _decode(self, lines: Iterable[bytes]) -> Iterator[dict[str, Any]]:
+        last_grid: Optional[npt.NDArray[Any]] = None
+        for line in lines:
+            line = line.strip()
+            if not line:
+                continue
+            event = loads(line)
+            if "delta" in event:
+                if last_grid is None:
+                    raise ValueError(
+                        f"delta frame without a keyframe in {self.filename}"
+                    )
+                last_grid = apply_delta(last_grid, event.pop("delta"))
+                event["data"]["frame"] = last_grid.tolist()
+            elif _has_frame(event):
+                grid = np.asarray(event["data"]["frame"])
+                last_grid = grid if grid.ndim == 3 else last_grid
+            yield event
+
+    def _read_lines(self) -> Iterator[bytes]:
+        # decompress in chunks, member by member; a member still being written
+        # has no trailer yet, so whatever it holds so far is returned
+        decompressor = zlib.decompressobj(wbits=31)
+        pending = b""
+        with open(self.filename, "rb") as f:
+            while chunk := f.read(READ_CHUNK_SIZE):
+                while chunk:
+                    pending += decompressor.decompress(chunk)
+                    if decompressor.eof:
+                        chunk = decompressor.unused_data
+                        decompressor = zlib.decompressobj(wbits=31)
+                    else:
+                        chunk = b""
+                *lines, pending = pending.split(b"\n")
+                yield from lines
+        if pending:
+            yield pending
+
+    @classmethod
+    def from_path(cls, path: str) -> "Recorder":
+        """A Recorder for an existing recording at `path`, outside RECORDINGS_DIR too."""
+        return cls(
+            prefix=cls.get_prefix(os.path.basename(path)),
+            filename=os.path.abspath(path),
+        )
 
     def __repr__(self) -> str:
         return f"<Recorder guid={self.guid} file={self.filename}>"
 
+    @classmethod
+    def catalog(cls) -> list["RecordingInfo"]:
+        """
+        Metadata of every recording in RECORDINGS_DIR, sorted by filename.
+
+        Kept in `.index/catalog.json` inside the recordings directory. Only
+        recordings added or changed since the catalog was saved are read again.
+        """
+        recordings_dir = get_recordings_dir()
+        names = cls.list()
+        if not names:
+            return []
+        path = os.path.join(recordings_dir, ".index", CATALOG_FILENAME)
+        cached: dict[str, RecordingInfo] = {}
+        try:
+            with open(path, "rb") as f:
+                for entry in loads(f.read()):
+                    recording = RecordingInfo.model_validate(entry)
+                    cached[recording.filename] = recording
+        except (OSError, ValueError) as e:
+            if not isinstance(e, FileNotFoundError):
+                logger.debug(f"Rebuilding recordings catalog {path}: {e}")
+
+        infos: list[RecordingInfo] = []
+        changed = len(cached) != len(names)
+        for name in sorted(names):
+            try:
+                stat = os.stat(os.path.join(recordings_dir, name))
+            except FileNotFoundError:
+                changed = True
+                continue
+            info = cached.get(name)
+            if info is None or (info.size, info.mtime_ns) != (
+                stat.st_size,
+                stat.st_mtime_ns,
+            ):
+                info = RecordingInfo.scan(
+                    os.path.join(recordings_dir, name), stat.st_size, stat.st_mtime_ns
+                )
+                changed = True
+            infos.append(info)
+
+        if changed:
+            try:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(path, "wb") as f:
+                    f.write(dumps([info.model_dump() for info in infos]))
+            except OSError as e:
+                logger.debug(f"Could not write recordings catalog {path}: {e}")
+        return infos
+
     @classmethod
     def list(cls) -> list[str]:
+        """
+        Recording filenames in RECORDINGS_DIR. The listing is cached per process
+        and only re-read when the directory's mtime changes.
+        """
         recordings_dir = get_recordings_dir()
-        if recordings_dir:
-            os.makedirs(recordings_dir, exist_ok=True)
-            filenames = os.listdir(recordings_dir)
-        else:
-            filenames = []
-        return [f for f in filenames if f.endswith(RECORDING_SUFFIX)]
+        if not recordings_dir:
+            return []
+        try:
+            mtime = os.stat(recordings_dir).st_mtime_ns
+        except FileNotFoundError:
+            return []
+        cached = _listings.get(recordings_dir)
+        # a directory touched within the mtime granularity may change again unnoticed
+        if (
+            cached is None
+            or cached[0] != mtime
+            or time.time_ns() - mtime < 2_000_000_000
+        ):
+            with os.scandir(recordings_dir) as entries:
+                names = [e.name for e in entries if cls.is_recording(e.name)]
+            cached = _listings[recordings_dir] = (mtime, names)
+        return cached[1][:]
+
+    @classmethod
+    def is_recording(cls, filename: str) -> bool:
+        """True for plain and compressed recording filenames."""
+        return filename.endswith(RECORDING_SUFFIX) or filename.endswith(
+            COMPRESSED_SUFFIX
+        )
 
     @classmethod
     def get_prefix(cls, filename: str) -> str:
@@ -79,6 +548,7 @@ class Recorder:
         Example filename: locksmith.random.50.81329339-1951-487c-8bed-e9d4780320f2.recording.jsonl
         Returns: locksmith.random.50
         """
+        filename = filename.removesuffix(".gz")
         if "." in filename:
             parts = filename.split(".")
             return ".".join(parts[:-3])
@@ -99,8 +569,66 @@ class Recorder:
         Example filename: locksmith.random.50.81329339-1951-487c-8bed-e9d4780320f2.recording.jsonl
         Returns: 81329339-1951-487c-8bed-e9d4780320f2
         """
-        parts = filename.split(".")
+        parts = filename.removesuffix(".gz").split(".")
         if len(parts) > 3:
             return parts[-3]
         else:
             return filename
+
+
+def _has_frame(event: dict[str, Any]) -> bool:
+    data = event.get("data")
+    return isinstance(data, dict) and bool(data.get("frame"))
+
+
+def apply_delta(grid: npt.NDArray[Any], delta: list[list[int]]) -> npt.NDArray[Any]:
+    """Return a copy of `grid` with each [layer, y, x, value] cell of `delta` applied."""
+    grid = grid.copy()
+    if delta:
+        cells = np.asarray(delta, dtype=np.intp)
+        grid[cells[:, 0], cells[:, 1], cells[:, 2]] = cells[:, 3]
+    return grid
+
+
+class RecordingInfo(BaseModel):
+    """Summary of one recording, as stored in the recordings catalog."""
+
+    filename: str
+    game_id: str
+    agent: str
+    guid: str
+    actions: int = 0
+    score: int = 0
+    state: Optional[str] = None
+    size: int
+    mtime_ns: int
+
+    @classmethod
+    def scan(cls, path: str, size: int, mtime_ns: int) -> "RecordingInfo":
+        filename = os.path.basename(path)
+        parts = filename.split(".")
+        info = cls(
+            filename=filename,
+            game_id=Recorder.get_prefix_one(filename),
+            agent=parts[1] if len(parts) > 1 else "",
+            guid=Recorder.get_guid(filename),
+            size=size,
+            mtime_ns=mtime_ns,
+        )
+        recorder = Recorder.from_path(path)
+        try:
+            for event in recorder.stream(
+                fields=["action_input", "score", "state", "guid"]
+            ):
+                data = event["data"]
+                if "action_input" in data:
+                    info.actions += 1
+                if isinstance(data.get("score"), int):
+                    info.score = data["score"]
+                if isinstance(data.get("state"), str):
+                    info.state = data["state"]
+                if data.get("guid"):
+                    info.guid = data["guid"]
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not read recording {filename}: {e}")
+        return info
@@ -0,0 +1,91 @@
+import importlib
+from typing import Iterator, Mapping, Type, cast
+
+from .agent import Agent, Playback
+from .recorder import Recorder
+
+# agent name → "module:Class", imported only when the agent is looked up
+AGENT_MODULES: dict[str, str] = {
+    "llm": "agents.templates.llm_agents:LLM",
+    "reasoningllm": "agents.templates.llm_agents:ReasoningLLM",
+    "fastllm": "agents.templates.llm_agents:FastLLM",
+    "guidedllm": "agents.templates.llm_agents:GuidedLLM",
+    "langgraphfunc": "agents.templates.langgraph_functional_agent:LangGraphFunc",
+    "langgraphtextonly": "agents.templates.langgraph_functional_agent:LangGraphTextOnly",
+    "langgraphrandom": "agents.templates.langgraph_random_agent:LangGraphRandom",
+    "langgraphthinking": "agents.templates.langgraph_thinking:LangGraphThinking",
+    "random": "agents.templates.random_agent:Random",
+    "asyncrandom": "agents.templates.random_agent:AsyncRandom",
+    "apiagent": "agents.templates.api_agent:APIAgent",
+    "smolcodingagent": "agents.templates.smolagents:SmolCodingAgent",
+    "smolvisionagent": "agents.templates.smolagents:SmolVisionAgent",
+    "reasoningagent": "agents.templates.reasoning_agent:ReasoningAgent",
+    "mcpagent": "agents.templates.mcp_agent:MCPAgent",
+}
+
+
+def load_agent(path: str) -> Type[Agent]:
+    """Import "module:Class" and return the class."""
+    module_name, _, class_name = path.partition(":")
+    agent: Type[Agent] = getattr(importlib.import_module(module_name), class_name)
+    return agent
+
+
+class AgentRegistry(Mapping[str, Type[Agent]]):
+    """
+    Agent name → Agent class, importing each template module on first lookup.
+
+    Names come from AGENT_MODULES, the recordings in RECORDINGS_DIR (played back
+    with Playback) and any other Agent subclass already defined in the process.
+    Listing and membership checks never import a template.
+    """
+
+    def __init__(self, modules: Mapping[str, str]) -> None:
+        self.modules = dict(modules)
+        self._loaded: dict[str, Type[Agent]] = {}
+
+    def register(self, name: str, agent: Type[Agent]) -> None:
+        self._loaded[name] = agent
+
+    def _defined(self) -> dict[str, Type[Agent]]:
+        return {
+            cls.__name__.lower(): cast(Type[Agent], cls)
+            for cls in Agent.__subclasses__()
+            if cls.__name__ not in ("Playback", "AsyncAgent")
+        }
+
+    def __getitem__(self, name: str) -> Type[Agent]:
+        if name in self._loaded:
+            return self._loaded[name]
+        if name in self.modules:
+            agent = self._loaded[name] = load_agent(self.modules[name])
+            return agent
+        if Recorder.is_recording(name) and name in Recorder.list():
+            return Playback
+        defined = self._defined()
+        if name in defined:
+            return defined[name]
+        raise KeyError(name)
+
+    def __contains__(self, name: object) -> bool:
+        if not isinstance(name, str):
+            return False
+        return (
+            name in self._loaded
+            or name in self.modules
+            or (Recorder.is_recording(name) and name in Recorder.list())
+            or name in self._defined()
+        )
+
+    def __iter__(self) -> Iterator[str]:
+        names = dict.fromkeys(self.modules)
+        names.update(dict.fromkeys(self._loaded))
+        names.update(dict.fromkeys(self._defined()))
+        names.update(dict.fromkeys(Recorder.list()))
+        return iter(names)
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        return f"<AgentRegistry agents={len(self)} loaded={sorted(self._loaded)}>"
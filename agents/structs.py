@@ -1,11 +1,22 @@
 import json
 from enum import Enum
-from typing import Any, Optional, Type, Union, override
+from typing import Any, Mapping, Optional, Self, Type, Union, override
 
-from pydantic import BaseModel, Field, computed_field, field_validator
+import numpy as np
+import numpy.typing as npt
+from pydantic import BaseModel, Field, PrivateAttr, computed_field, field_validator
 
 MAX_REASONING_BYTES = 16 * 1024  # 16KB Max
 
+# server action ids → names used in FrameData.available_actions, other ids are dropped
+AVAILABLE_ACTION_NAMES: dict[int, str] = {
+    1: "move_up",
+    2: "move_down",
+    3: "move_left",
+    4: "move_right",
+    6: "mouse_click",
+}
+
 
 class MyEnum(Enum):
     def __repr__(self):
@@ -184,10 +195,10 @@ class GameAction(Enum):
 
     @classmethod
     def from_id(cls, action_id: int) -> "GameAction":
-        for action in cls:
-            if action.value == action_id:
-                return action
-        raise ValueError(f"No GameAction with id {action_id}")
+        try:
+            return _ACTIONS_BY_ID[action_id]
+        except (KeyError, TypeError):
+            raise ValueError(f"No GameAction with id {action_id}") from None
 
     @classmethod
     def from_name(cls, name: str) -> "GameAction":
@@ -216,6 +227,9 @@ class GameAction(Enum):
         return [a for a in cls if a.is_complex()]
 
 
+_ACTIONS_BY_ID: dict[int, GameAction] = {action.value: action for action in GameAction}
+
+
 class ActionInput(BaseModel):
     id: GameAction = GameAction.RESET
     data: dict[str, Any] = {}
@@ -249,22 +263,113 @@ class FrameData(BaseModel):
     full_reset: bool = False
     available_actions: list[Any] = Field(default_factory=list)
 
+    # compact copy of `frame`, built on first use and dropped when `frame` is assigned
+    _grid: Optional[npt.NDArray[np.uint8]] = PrivateAttr(default=None)
+
     def is_empty(self) -> bool:
         return len(self.frame) == 0
 
+    @property
+    def grid(self) -> npt.NDArray[np.uint8]:
+        """`frame` as a contiguous read-only uint8 array of shape (layers, height, width).
+
+        Built once per frame, so diffing and rendering can work on one block of
+        memory instead of nested lists. `frame` must not be mutated in place
+        after this is first read.
+        """
+        if self._grid is None:
+            grid = np.asarray(self.frame, dtype=np.uint8)
+            if grid.ndim != 3:
+                grid = grid.reshape((0, 0, 0))
+            grid.flags.writeable = False
+            self._grid = grid
+        return self._grid
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        super().__setattr__(name, value)
+        if name == "frame":
+            self._grid = None
+
+    def model_copy(
+        self, *, update: Optional[Mapping[str, Any]] = None, deep: bool = False
+    ) -> Self:
+        copy = super().model_copy(update=update, deep=deep)
+        if update and "frame" in update:
+            copy._grid = None
+        return copy
+
+    @classmethod
+    def from_grid(cls, grid: npt.ArrayLike, **data: Any) -> "FrameData":
+        """Build a frame from a (layers, height, width) array of cell values.
+
+        The cells are checked in one vectorised pass instead of one int at a
+        time, and the list view in `frame` comes from a single `tolist()`.
+        """
+        array = np.ascontiguousarray(grid, dtype=np.uint8)
+        if array.ndim != 3:
+            raise ValueError(f"grid must have 3 dimensions, got shape {array.shape}")
+        if np.any(array > 15):
+            raise ValueError("grid values must be in the range 0..15")
+        frame = cls.model_validate({**data, "frame": []})
+        frame.frame = array.tolist()
+        array.flags.writeable = False
+        frame._grid = array
+        return frame
+
+    def changed_cells(self, previous: "FrameData") -> npt.NDArray[np.intp]:
+        """(layer, y, x) coordinates of every cell that differs from `previous`.
+
+        Returns an empty (0, 3) array when the two frames have different shapes.
+        """
+        if self.grid.shape != previous.grid.shape:
+            return np.empty((0, 3), dtype=np.intp)
+        return np.argwhere(self.grid != previous.grid)
+
+    def __eq__(self, other: object) -> bool:
+        # the cached grid is derived from `frame`, leave it out of comparisons
+        if not isinstance(other, BaseModel):
+            return NotImplemented
+        return type(self) is type(other) and self.__dict__ == other.__dict__
+
+    @classmethod
+    def from_server(cls, data: dict[str, Any]) -> "FrameData":
+        """Build a frame from a trusted server response without per-cell validation.
+
+        Only the top-level fields are converted, `frame` is taken as-is. Raises
+        KeyError, TypeError or ValueError on malformed data so callers can fall
+        back to `model_validate`.
+        """
+        frame = data.get("frame", [])
+        if type(frame) is not list:
+            raise TypeError("frame must be a list")
+        score = data.get("score", 0)
+        if type(score) is not int or not 0 <= score <= 254:
+            raise ValueError(f"score out of range: {score!r}")
+        action_input = data.get("action_input")
+        if action_input is None:
+            action = ActionInput()
+        else:
+            action = ActionInput.model_construct(
+                id=GameAction.from_id(action_input.get("id", 0)),
+                data=action_input.get("data") or {},
+                reasoning=action_input.get("reasoning"),
+            )
+        return cls.model_construct(
+            game_id=data.get("game_id", ""),
+            frame=frame,
+            state=GameState(data.get("state", GameState.NOT_PLAYED)),
+            score=score,
+            action_input=action,
+            guid=data.get("guid"),
+            full_reset=bool(data.get("full_reset", False)),
+            available_actions=list(data.get("available_actions") or ()),
+        )
+
     @override
     def model_post_init(self, context: Any, /) -> None:
-        new_available_actions = []
-        for action in self.available_actions:
-            if action == 1:
-                new_available_actions.append("move_up")
-            elif action == 2:
-                new_available_actions.append("move_down")
-            elif action == 3:
-                new_available_actions.append("move_left")
-            elif action == 4:
-                new_available_actions.append("move_right")
-            elif action == 6:
-                new_available_actions.append("mouse_click")
-        self.available_actions = new_available_actions
+        self.available_actions = [
+            AVAILABLE_ACTION_NAMES[action]
+            for action in self.available_actions
+            if action in AVAILABLE_ACTION_NAMES
+        ]
         return super().model_post_init(context)
@@ -1,17 +1,27 @@
 from __future__ import annotations
 
+import asyncio
 import json
 import logging
+import logging.handlers
+import multiprocessing
 import os
+import queue
+from concurrent.futures import ProcessPoolExecutor
 from threading import Thread
-from typing import TYPE_CHECKING, Optional, Type
+from typing import TYPE_CHECKING, Any, Optional, Type, cast
 
+import httpx
 import requests
+from requests.adapters import HTTPAdapter
+from requests.cookies import RequestsCookieJar
 
+from .metrics import Timings
+from .recorder import Recorder, flush_all
 from .structs import Scorecard
 
 if TYPE_CHECKING:
-    from .agent import Agent
+    from .agent import Agent, AsyncAgent
 
 logger = logging.getLogger('arc')
 
@@ -22,6 +32,9 @@ class Swarm:
     GAMES: list[str]
     ROOT_URL: str
     COUNT: int
+    ATTEMPTS: int
+    MAX_WORKERS: Optional[int]
+    PROCESSES: Optional[int]
     agent_name: str
     agent_class: Type[Agent]
     threads: list[Thread]
@@ -30,6 +43,11 @@ class Swarm:
     cleanup_threads: list[Thread]
     headers: dict[str, str]
     card_id: Optional[str]
+    jobs: queue.Queue[tuple[int, str, int]]
+    results: list[dict[str, Any]]
+    timings: Timings
+    adapter: HTTPAdapter
+    pool_maxsize: int
     _session: requests.Session
 
     def __init__(
@@ -38,11 +56,28 @@ class Swarm:
         ROOT_URL: str,
         games: list[str],
         tags: list[str] = [],
+        max_workers: Optional[int] = None,
+        attempts: int = 1,
+        processes: Optional[int] = None,
+        pool_connections: int = 10,
+        pool_maxsize: Optional[int] = None,
     ) -> None:
         from . import AVAILABLE_AGENTS
 
         self.GAMES = games
         self.ROOT_URL = ROOT_URL
+        # None means one worker per job, i.e. every game runs at once
+        if max_workers is None and os.getenv("SWARM_MAX_WORKERS"):
+            max_workers = int(os.environ["SWARM_MAX_WORKERS"])
+        self.MAX_WORKERS = max_workers
+        # None means every agent runs inside this process
+        if processes is None and os.getenv("SWARM_PROCESSES"):
+            processes = int(os.environ["SWARM_PROCESSES"])
+        self.PROCESSES = processes
+        self.ATTEMPTS = attempts
+        self.jobs = queue.Queue()
+        self.results = []
+        self.timings = Timings()
         self.agent_name = agent
         self.agent_class = AVAILABLE_AGENTS[agent]
         self.threads = []
@@ -52,17 +87,24 @@ class Swarm:
             "X-API-Key": os.getenv("ARC_API_KEY", ""),
             "Accept": "application/json",
         }
+        # one keep-alive connection pool for the swarm and all of its agents,
+        # by default large enough for every worker to hold a connection per host
+        if pool_maxsize is None and os.getenv("HTTP_POOL_MAXSIZE"):
+            pool_maxsize = int(os.environ["HTTP_POOL_MAXSIZE"])
+        self.pool_maxsize = pool_maxsize or self.worker_count
+        self.adapter = build_http_adapter(pool_connections, self.pool_maxsize)
         self._session = requests.Session()
         self._session.headers.update(self.headers)
+        self._session.mount("https://", self.adapter)
+        self._session.mount("http://", self.adapter)
         self.tags = tags.copy() if tags else []
 
         # Set up base tags for tracing
-        if self.agent_name.endswith(".recording.jsonl"):
+        if Recorder.is_recording(self.agent_name):
             # Extract GUID from playback filename
-            # Format: game.agent.count.guid.recording.jsonl
-            parts = self.agent_name.split(".")
-            guid = parts[-3] if len(parts) >= 4 else "unknown"
-            self.tags.extend(["playback", guid])
+            # Format: game.agent.count.guid.recording.jsonl[.gz]
+            guid = Recorder.get_guid(self.agent_name)
+            self.tags.extend(["playback", guid if guid != self.agent_name else "unknown"])
         else:
             self.tags.extend(["agent", self.agent_name])
 
@@ -73,34 +115,25 @@ class Swarm:
         self.card_id = self.open_scorecard()
         logger.info(f"Scorecard opened: {self.card_id}")
 
-        # create all the agents
-        for i in range(len(self.GAMES)):
-            g = self.GAMES[i]
-            a = self.agent_class(
-                card_id=self.card_id,
-                game_id=g,
-                game_idx=i,
-                agent_name=self.agent_name,
-                ROOT_URL=self.ROOT_URL,
-                record=True,
-                cookies=self._session.cookies,
-                tags=self.tags,
-            )
-            self.agents.append(a)
-
-        # create all the threads
-        for a in self.agents:
-            self.threads.append(Thread(target=a.main, daemon=True))
-
-        # start all the threads
-        for t in self.threads:
-            t.start()
+        # one job per (game, attempt), agents are created as workers pick them up
+        plays = [(g, attempt) for attempt in range(self.ATTEMPTS) for g in self.GAMES]
+        jobs = [(i, g, attempt) for i, (g, attempt) in enumerate(plays)]
 
-        # wait for all agent to finish
-        for t in self.threads:
-            t.join()
+        if self.PROCESSES:
+            self.main_process(jobs)
+        else:
+            logger.info(f"Scheduling {len(jobs)} jobs on {self.worker_count} workers")
+            for job in jobs:
+                self.jobs.put(job)
+            self.run_jobs()
+            self.results = self.collect_results()
 
         # all agents are now done
+        for result in self.results:
+            self.timings.merge(result.get("timings", {}))
+        if self.timings:
+            logger.info(f"--- TIMINGS ({len(self.results)} agents) ---\n{self.timings.report()}")
+
         card_id = self.card_id
         scorecard = self.close_scorecard(card_id)
         if scorecard:
@@ -116,12 +149,172 @@ class Swarm:
 
         return scorecard
 
-    def open_scorecard(self) -> str:
-        json_str = json.dumps({"tags": self.tags})
+    @property
+    def is_async(self) -> bool:
+        from .agent import AsyncAgent
 
+        return issubclass(self.agent_class, AsyncAgent)
+
+    @property
+    def worker_count(self) -> int:
+        """Number of agents allowed to play at the same time."""
+        total = len(self.GAMES) * self.ATTEMPTS
+        if self.MAX_WORKERS is None:
+            return max(total, 1)
+        return max(min(total, self.MAX_WORKERS), 1)
+
+    def create_agent(self, game_idx: int, game_id: str, **kwargs: Any) -> Agent:
+        assert self.card_id is not None, "open a scorecard before creating agents"
+        a = self.agent_class(
+            card_id=self.card_id,
+            game_id=game_id,
+            game_idx=game_idx,
+            agent_name=self.agent_name,
+            ROOT_URL=self.ROOT_URL,
+            record=True,
+            cookies=self._session.cookies,
+            tags=self.tags,
+            **kwargs,
+        )
+        self.agents.append(a)
+        return a
+
+    def release_agent(self, agent: Agent) -> None:
+        """Keep the summary of an agent that finished its game and let go of the agent.
+
+        Agents whose game failed stay in `agents` so `cleanup` can still close them.
+        """
+        self.results.append(agent.summary())
+        self.agents.remove(agent)
+
+    def collect_results(self) -> list[dict[str, Any]]:
+        """Summaries of every job played, ordered by game_idx."""
+        results = self.results + [a.summary() for a in self.agents]
+        return sorted(results, key=lambda r: r["game_idx"])
+
+    def run_jobs(self) -> None:
+        """Drain the job queue with worker threads, or tasks for AsyncAgents."""
+        if self.is_async:
+            # run every agent as a task on one event loop
+            asyncio.run(self.main_async())
+            return
+
+        # create all the worker threads
+        for _ in range(self.worker_count):
+            self.threads.append(Thread(target=self.worker, daemon=True))
+
+        # start all the threads
+        for t in self.threads:
+            t.start()
+
+        # wait for all agent to finish
+        for t in self.threads:
+            t.join()
+
+    def main_process(self, jobs: list[tuple[int, str, int]]) -> None:
+        """Spread the jobs over a pool of worker processes, each playing its own slice.
+
+        Use this for CPU-heavy agents (rendering, object detection, diffing) whose
+        work would otherwise be serialized by the GIL across worker threads.
+        """
+        processes = max(min(self.PROCESSES or 1, len(jobs)), 1)
+        slices = [jobs[i::processes] for i in range(processes)]
+        logger.info(f"Scheduling {len(jobs)} jobs on {processes} processes")
+        # spawn, not fork: a forked child inherits locks held by the parent's threads
+        context = multiprocessing.get_context("spawn")
+        # spawned workers start without handlers, their records are logged here
+        log_queue = context.Queue()
+        listener = logging.handlers.QueueListener(log_queue, ParentLogHandler())
+        listener.start()
+        try:
+            with ProcessPoolExecutor(
+                max_workers=processes,
+                mp_context=context,
+                initializer=init_worker_logging,
+                initargs=(log_queue, logger.getEffectiveLevel()),
+            ) as pool:
+                futures = [
+                    pool.submit(
+                        play_jobs,
+                        self.agent_name,
+                        self.ROOT_URL,
+                        self.card_id,
+                        job_slice,
+                        self.tags,
+                        self.MAX_WORKERS,
+                        self._session.cookies,
+                    )
+                    for job_slice in slices
+                    if job_slice
+                ]
+                for future in futures:
+                    try:
+                        self.results.extend(future.result())
+                    except Exception as e:
+                        logger.error(f"Swarm worker process failed: {e}", exc_info=True)
+        finally:
+            listener.stop()
+        self.results.sort(key=lambda r: r["game_idx"])
+        for r in self.results:
+            logger.info(
+                f"{r['game_id']} - score {r['score']}, state {r['state']}, {r['action_counter']} actions, recording {r['recording']}"
+            )
+
+    def worker(self) -> None:
+        """Play queued jobs one after another until the queue is empty."""
+        while True:
+            try:
+                game_idx, game_id, attempt = self.jobs.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                a = self.create_agent(game_idx, game_id, adapter=self.adapter)
+                a.main()
+                self.release_agent(a)
+            except Exception as e:
+                logger.error(
+                    f"Agent for {game_id} (attempt {attempt}) failed with exception: {e}",
+                    exc_info=True,
+                )
+            finally:
+                self.jobs.task_done()
+
+    async def main_async(self) -> None:
+        """Run queued jobs as AsyncAgents on the current event loop with one shared connection pool."""
+        async with httpx.AsyncHTTPTransport(
+            limits=httpx.Limits(
+                max_connections=self.pool_maxsize,
+                max_keepalive_connections=self.pool_maxsize,
+            ),
+        ) as transport:
+
+            async def worker() -> None:
+                while True:
+                    try:
+                        game_idx, game_id, attempt = self.jobs.get_nowait()
+                    except queue.Empty:
+                        return
+                    try:
+                        a = cast(
+                            "AsyncAgent",
+                            self.create_agent(game_idx, game_id, transport=transport),
+                        )
+                        await a.main_async()
+                        self.release_agent(a)
+                    except Exception as e:
+                        logger.error(
+                            f"Agent for {game_id} (attempt {attempt}) failed with exception: {e}",
+                            exc_info=True,
+                        )
+                    finally:
+                        self.jobs.task_done()
+
+            await asyncio.gather(*(worker() for _ in range(self.worker_count)))
+
+    def open_scorecard(self) -> str:
         r = self._session.post(
             f"{self.ROOT_URL}/api/scorecard/open",
-            json=json.loads(json_str),
+            json={"tags": self.tags},
             headers=self.headers,
         )
 
@@ -139,10 +332,9 @@ class Swarm:
 
     def close_scorecard(self, card_id: str) -> Optional[Scorecard]:
         self.card_id = None
-        json_str = json.dumps({"card_id": card_id})
         r = self._session.post(
             f"{self.ROOT_URL}/api/scorecard/close",
-            json=json.loads(json_str),
+            json={"card_id": card_id},
             headers=self.headers,
         )
         try:
@@ -163,3 +355,57 @@ class Swarm:
             a.cleanup(scorecard)
         if hasattr(self, "_session"):
             self._session.close()
+
+
+def build_http_adapter(pool_connections: int, pool_maxsize: int) -> HTTPAdapter:
+    """A thread-safe keep-alive pool: `pool_connections` hosts, `pool_maxsize` connections per host.
+
+    The pool blocks instead of opening extra throwaway connections when every
+    connection to a host is busy.
+    """
+    return HTTPAdapter(
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        pool_block=True,
+    )
+
+
+class ParentLogHandler(logging.Handler):
+    """Hands records forwarded from worker processes to this process's `arc` logger."""
+
+    def emit(self, record: logging.LogRecord) -> None:
+        logger.handle(record)
+
+
+def init_worker_logging(log_queue: Any, level: int) -> None:
+    """Send the `arc` records of a Swarm worker process to the parent's queue."""
+    logger.setLevel(level)
+    logger.handlers = [logging.handlers.QueueHandler(log_queue)]
+    logger.propagate = False
+
+
+def play_jobs(
+    agent_name: str,
+    ROOT_URL: str,
+    card_id: Optional[str],
+    jobs: list[tuple[int, str, int]],
+    tags: list[str],
+    max_workers: Optional[int],
+    cookies: RequestsCookieJar,
+) -> list[dict[str, Any]]:
+    """Entry point of a Swarm worker process: play a slice of jobs on an open scorecard."""
+    swarm = Swarm(
+        agent_name, ROOT_URL, games=[g for _, g, _ in jobs], max_workers=max_workers
+    )
+    swarm.tags = tags
+    swarm.card_id = card_id
+    swarm._session.cookies.update(cookies)
+    for job in jobs:
+        swarm.jobs.put(job)
+    try:
+        swarm.run_jobs()
+    finally:
+        swarm._session.close()
+        # the pool keeps this process alive, write the recordings out before returning
+        flush_all()
+    return swarm.collect_results()
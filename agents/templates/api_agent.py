@@ -6,7 +6,7 @@ import time
 import asyncio
 
 import uvicorn
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Sequence
 
 from pydantic import BaseModel, Field
 from fastapi import FastAPI
@@ -28,6 +28,7 @@ class APIAgent(Agent):
     """An agent that receives actions from a API client."""
 
     MAX_ACTIONS = 5000 # TODO: remove this
+    FRAME_WINDOW = 256
 
     def __init__(self, *args: Any, **kwargs: Any) -> None:
         super().__init__(*args, **kwargs)
@@ -164,12 +165,12 @@ class APIAgent(Agent):
                 "error": f"Error executing action: {e}"
             }
 
-    def is_done(self, frames: List[FrameData], latest_frame: FrameData) -> bool:
+    def is_done(self, frames: Sequence[FrameData], latest_frame: FrameData) -> bool:
         """Check if the game is done."""
         return latest_frame.state.value in ["WIN", "GAME_OVER"]
 
     def choose_action(
-        self, frames: List[FrameData], latest_frame: FrameData
+        self, frames: Sequence[FrameData], latest_frame: FrameData
     ) -> GameAction:
         """Required abstract method - Agent doesn't choose actions, they come from client."""
         # Return RESET as default fallback
@@ -4,28 +4,30 @@ import base64
 import io
 import json
 import logging
+import os
 import uuid
-from typing import Any, TypedDict, TypeVar, cast
+from typing import Any, Optional, Sequence, TypedDict, TypeVar, cast
 
 import langsmith as ls
+import numpy as np
 import PIL
 from langgraph.checkpoint.memory import InMemorySaver
 from langgraph.func import entrypoint
 from langgraph.pregel import Pregel
 from langsmith.schemas import Attachment
-from openai import OpenAI
 from openai.types.chat import ChatCompletionMessage
 
-from agents.templates.llm_agents import LLM
+from agents.templates.llm_agents import LLM, get_client
 
 from ..agent import Agent
+from ..grid_encoding import GridEncoder
 from ..structs import FrameData, GameAction
 
 logger = logging.getLogger(__name__)
 
 
 class State(TypedDict, total=False):
-    frames: list[FrameData]
+    frames: Sequence[FrameData]
     latest_frame: FrameData
 
 
@@ -49,16 +51,26 @@ def build_agent(
     tools: list[dict[str, Any]] = [],
     reasoning_effort: str | None = None,
     as_image: bool = True,
+    grid_encoder: Optional[GridEncoder] = None,
 ) -> Pregel[State, entrypoint.final[ChatCompletionMessage, State]]:
     """Define the agent logic."""
     # Modify this code to add things like reasoning, planning, etc.
-    openai_client = OpenAI()
+    # fail at construction, like OpenAI() does, rather than with a 401 mid-game
+    api_key = os.environ.get("OPENAI_API_KEY")
+    if not api_key:
+        raise ValueError(
+            "The functional LangGraph agent needs OPENAI_API_KEY to be set"
+        )
+    openai_client = get_client(
+        api_key=api_key,
+        base_url=os.environ.get("OPENAI_BASE_URL", ""),
+    )
     model_kwargs = {"reasoning_effort": reasoning_effort} if reasoning_effort else {}
 
     @ls.traceable(run_type="prompt")  # type: ignore[misc]
     def prompt(latest_frame: FrameData, messages: MESSAGES) -> MESSAGES:
         """Build the user prompt for the LLM. Override this method to customize the prompt."""
-        content = format_frame(latest_frame, as_image)
+        content = format_frame(latest_frame, as_image, grid_encoder)
         if len(messages) == 0:
             inbound = {
                 "role": "user",
@@ -138,11 +150,12 @@ class LangGraphFunc(LLM, Agent):
             tools=self.build_tools(),
             reasoning_effort=self.REASONING_EFFORT,
             as_image=self.USE_IMAGE,
+            grid_encoder=self.grid_encoder,
         )
 
     @ls.traceable  # type: ignore[misc]
     def choose_action(
-        self, frames: list[FrameData], latest_frame: FrameData
+        self, frames: Sequence[FrameData], latest_frame: FrameData
     ) -> GameAction:
         msg: ChatCompletionMessage = self.agent.invoke(
             {"frames": frames, "latest_frame": latest_frame},
@@ -177,7 +190,11 @@ class LangGraphTextOnly(LangGraphFunc, Agent):
     USE_IMAGE = False
 
 
-def format_frame(latest_frame: FrameData, as_image: bool) -> list[dict[str, Any]]:
+def format_frame(
+    latest_frame: FrameData,
+    as_image: bool,
+    grid_encoder: Optional[GridEncoder] = None,
+) -> list[dict[str, Any]]:
     img = g2im(latest_frame.frame) if latest_frame.frame else None
     if as_image and img:
         frame_block = {
@@ -193,13 +210,8 @@ def format_frame(latest_frame: FrameData, as_image: bool) -> list[dict[str, Any]
                 mime_type="image/png",
                 data=img,
             )
-        lines = []
-        for i, block in enumerate(latest_frame.frame):
-            lines.append(f"Grid {i}:")
-            for row in block:
-                lines.append(f"  {row}")
-            lines.append("")
-        frame_block = {"type": "text", "text": "\n".join(lines)}
+        text = (grid_encoder or GridEncoder()).encode(latest_frame.frame)
+        frame_block = {"type": "text", "text": text}
     return [
         {
             "type": "text",
@@ -242,19 +254,18 @@ def g2im(g: list[list[list[int]]]) -> bytes:
         (255, 255, 255),
     ]
 
+    palette = np.array(C, dtype=np.uint8)
     h, w = len(g[0]), len(g[0][0])
     good = [block for block in g if len(block) == h and len(block[0]) == w]
     n = len(good)
     s = 5 * (n > 1)
     W = w * n + s * (n - 1)
 
-    im = PIL.Image.new("RGB", (W, h), "white")
-    px = im.load()
+    pixels = np.full((h, W, 3), 255, dtype=np.uint8)
     for i, block in enumerate(good):
         ox = i * (w + s)
-        for y, row in enumerate(block):
-            for x, val in enumerate(row):
-                px[ox + x, y] = C[val & 15]
+        pixels[:, ox : ox + w] = palette[np.asarray(block, dtype=np.uint8) & 15]
+    im = PIL.Image.fromarray(pixels)
 
     buf = io.BytesIO()
     im.save(buf, "PNG")
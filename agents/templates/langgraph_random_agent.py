@@ -1,6 +1,6 @@
 import random
 import time
-from typing import Any, TypedDict
+from typing import Any, Sequence, TypedDict
 
 from langgraph.graph import END, START, StateGraph
 from langgraph.pregel import Pregel
@@ -85,7 +85,7 @@ class LangGraphRandom(Agent):
 
         return workflow.compile()
 
-    def is_done(self, frames: list[FrameData], latest_frame: FrameData) -> bool:
+    def is_done(self, frames: Sequence[FrameData], latest_frame: FrameData) -> bool:
         """Decide if the agent is done playing or not."""
         return any(
             [
@@ -96,7 +96,7 @@ class LangGraphRandom(Agent):
         )
 
     def choose_action(
-        self, frames: list[FrameData], latest_frame: FrameData
+        self, frames: Sequence[FrameData], latest_frame: FrameData
     ) -> GameAction:
         """Choose action using LangGraph workflow."""
 
@@ -1,5 +1,5 @@
 import sqlite3
-from typing import Any, cast
+from typing import Any, Sequence, cast
 
 from langgraph.graph import END, START, StateGraph
 from langgraph.pregel import Pregel
@@ -77,7 +77,7 @@ class LangGraphThinking(Agent):
             )
         )
 
-    def is_done(self, frames: list[FrameData], latest_frame: FrameData) -> bool:
+    def is_done(self, frames: Sequence[FrameData], latest_frame: FrameData) -> bool:
         """Decide if the agent is done playing or not."""
         return any(
             [
@@ -88,7 +88,7 @@ class LangGraphThinking(Agent):
         )
 
     def choose_action(
-        self, frames: list[FrameData], latest_frame: FrameData
+        self, frames: Sequence[FrameData], latest_frame: FrameData
     ) -> GameAction:
         """Choose action using LangGraph workflow."""
 
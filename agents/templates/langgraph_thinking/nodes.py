@@ -169,21 +169,19 @@ def analyze_frame_delta(state: AgentState) -> AgentState:
     movements: list[str] = []
     state_changes: list[str] = []
 
-    for i in range(len(latest_frame.frame)):
-        for j in range(len(latest_frame.frame[i])):
-            for k in range(len(latest_frame.frame[i][j])):
-                if latest_frame.frame[i][j][k] != previous_frame.frame[i][j][k]:
-                    if j == 1:
-                        state_changes.append("Change in heath indicator")
-                    elif j == 2 and k < 54:
-                        if latest_frame.frame[i][j][k] == 8:
-                            state_changes.append("1 energy unit used")
-                        elif latest_frame.frame[i][j][k] == 6:
-                            state_changes.append("1 energy unit added")
-                    else:
-                        movements.append(
-                            f"<{j},{k}>: {previous_frame.frame[i][j][k]} -> {latest_frame.frame[i][j][k]}"
-                        )
+    for i, j, k in latest_frame.changed_cells(previous_frame):
+        new_value = int(latest_frame.grid[i, j, k])
+        if j == 1:
+            state_changes.append("Change in heath indicator")
+        elif j == 2 and k < 54:
+            if new_value == 8:
+                state_changes.append("1 energy unit used")
+            elif new_value == 6:
+                state_changes.append("1 energy unit added")
+        else:
+            movements.append(
+                f"<{j},{k}>: {int(previous_frame.grid[i, j, k])} -> {new_value}"
+            )
 
     # Build a string describing the changes in the frame
     deltas_str = "\n".join(state_changes)
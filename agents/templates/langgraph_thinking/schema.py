@@ -1,5 +1,5 @@
 from enum import Enum
-from typing import Annotated, Optional, TypedDict
+from typing import Annotated, Optional, Sequence, TypedDict
 
 from langchain_core.messages import BaseMessage
 
@@ -20,7 +20,7 @@ class AgentState(TypedDict):
 
     key_matches_door: bool
 
-    frames: list[FrameData]
+    frames: Sequence[FrameData]
     latest_frame: FrameData
     previous_frame: Optional[FrameData]
     llm: LLM
@@ -2,16 +2,99 @@ import json
 import logging
 import os
 import textwrap
-from typing import Any, Optional
+import threading
+from collections import deque
+from types import ModuleType
+from typing import Any, Optional, Sequence
 
+import httpx
 import openai
+from openai import DefaultHttpxClient
 from openai import OpenAI as OpenAIClient
 
 from ..agent import Agent
+from ..grid_encoding import DiffEncoder, GridEncoder, get_encoder
+from ..metrics import REGISTRY
 from ..structs import FrameData, GameAction, GameState
 
 logger = logging.getLogger('arc')
 
+_clients: dict[tuple[Optional[str], str], OpenAIClient] = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(
+    api_key: Optional[str] = None, base_url: Optional[str] = None
+) -> OpenAIClient:
+    """
+    The process-wide OpenAI client for a base URL and API key (LLM_BASE_URL and
+    LLM_API_KEY by default). Agents and Swarm threads share its keep-alive
+    connection pool, sized by LLM_POOL_MAXSIZE (default 100).
+    """
+    if api_key is None:
+        api_key = os.environ.get("LLM_API_KEY", "")
+    if base_url is None:
+        base_url = os.environ.get("LLM_BASE_URL", "")
+    key = (base_url or None, api_key)
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            logging.getLogger("openai").setLevel(logging.CRITICAL)
+            logging.getLogger("httpx").setLevel(logging.CRITICAL)
+            pool_maxsize = int(os.environ.get("LLM_POOL_MAXSIZE", 100))
+            client = _clients[key] = OpenAIClient(
+                api_key=api_key,
+                base_url=base_url or None,
+                http_client=DefaultHttpxClient(
+                    limits=httpx.Limits(
+                        max_connections=pool_maxsize,
+                        max_keepalive_connections=pool_maxsize,
+                    )
+                ),
+            )
+        return client
+
+
+# tiktoken is optional (the "tokenizer" extra), token counts are estimated without it
+tiktoken: Optional[ModuleType]
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+_encoding: Any = None
+
+
+def count_tokens(text: str) -> int:
+    """Tokens in `text` with tiktoken's o200k encoding if it can be loaded, else ~4 chars per token."""
+    global _encoding
+    if _encoding is None:
+        _encoding = False
+        if tiktoken is not None:
+            try:
+                _encoding = tiktoken.get_encoding("o200k_base")
+            except Exception as e:
+                logger.debug(f"tiktoken encoding unavailable, estimating tokens: {e}")
+    if _encoding:
+        return len(_encoding.encode(text, disallowed_special=()))
+    return (len(text) + 3) // 4
+
+
+def message_role(message: Any) -> str:
+    return str(message.get("role") if isinstance(message, dict) else getattr(message, "role", ""))
+
+
+def message_tokens(message: Any) -> int:
+    """Approximate prompt tokens of one chat message, including its tool calls."""
+    if not isinstance(message, dict):
+        message = message.model_dump(exclude_none=True)
+    content = message.get("content") or ""
+    text = content if isinstance(content, str) else json.dumps(content)
+    for key in ("tool_calls", "function_call"):
+        if message.get(key):
+            text += json.dumps(message[key])
+    return count_tokens(text) + 4  # role and message framing
+
 
 class LLM(Agent):
     """An agent that uses a base LLM model to play games."""
@@ -22,9 +105,24 @@ class LLM(Agent):
     MODEL_REQUIRES_TOOLS: bool = True
 
     MESSAGE_LIMIT: int = 100
+    # prompt tokens kept in self.messages, the oldest turns are evicted beyond it
+    CONTEXT_TOKEN_LIMIT: int = int(os.environ.get("LLM_CONTEXT_TOKENS", 24000))
+    SUMMARIZE_EVICTED: bool = True  # fold evicted turns into a summary message
+    SUMMARY_TOKEN_LIMIT: int = 1000
+    # once over the limit, evict down to this share of it, so the turns after an
+    # eviction only append and the provider keeps reusing its cached prefix
+    TRIM_TARGET: float = 0.8
+    # how frames are written into prompts, see agents/grid_encoding.py
+    GRID_ENCODING: str = os.environ.get("GRID_ENCODING", "list")
+    # after the first frame send only the changed cells, with a full frame
+    # every KEYFRAME_INTERVAL turns and whenever the last one left the context
+    DELTA_FRAMES: bool = os.environ.get("LLM_DELTA_FRAMES", "false").lower() in ["true", "1"]
+    KEYFRAME_INTERVAL: int = int(os.environ.get("LLM_KEYFRAME_INTERVAL", 10))
     MODEL: str = os.environ.get("LLM_MODEL",  "gpt-4o-mini")
     messages: list[dict[str, Any]]
     token_counter: int
+    client: OpenAIClient
+    grid_encoder: GridEncoder
 
     _latest_tool_call_id: str = "call_12345"
 
@@ -32,6 +130,24 @@ class LLM(Agent):
         super().__init__(*args, **kwargs)
         self.messages = []
         self.token_counter = 0
+        self.prompt_token_counter = 0
+        self.cached_token_counter = 0
+        self.client = get_client()
+        self.grid_encoder = get_encoder(self.GRID_ENCODING)
+        if self.DELTA_FRAMES and not self.delta_frames:
+            self.grid_encoder = DiffEncoder(self.KEYFRAME_INTERVAL, base=self.grid_encoder)
+        self._keyframe_message: Optional[dict[str, Any]] = None
+        self._frame_message: Optional[tuple[dict[str, Any], FrameData]] = None
+        self._message_tokens: list[int] = []
+        self._prompt_message: Optional[dict[str, Any]] = None
+        self._summary_message: Optional[dict[str, Any]] = None
+        self._evicted_actions: list[str] = []
+        self._evicted_notes: deque[str] = deque(maxlen=5)
+
+    @property
+    def delta_frames(self) -> bool:
+        """Whether frames are sent as changes against the previous one."""
+        return isinstance(self.grid_encoder, DiffEncoder)
 
     @property
     def name(self) -> str:
@@ -42,7 +158,7 @@ class LLM(Agent):
             name += f".{self.REASONING_EFFORT}"
         return name
 
-    def is_done(self, frames: list[FrameData], latest_frame: FrameData) -> bool:
+    def is_done(self, frames: Sequence[FrameData], latest_frame: FrameData) -> bool:
         """Decide if the agent is done playing or not."""
         return any(
             [
@@ -53,14 +169,11 @@ class LLM(Agent):
         )
 
     def choose_action(
-        self, frames: list[FrameData], latest_frame: FrameData
+        self, frames: Sequence[FrameData], latest_frame: FrameData
     ) -> GameAction:
         """Choose which action the Agent should take, fill in any arguments, and return it."""
 
-        logging.getLogger("openai").setLevel(logging.CRITICAL)
-        logging.getLogger("httpx").setLevel(logging.CRITICAL)
-
-        client = OpenAIClient(api_key=os.environ.get("LLM_API_KEY", ""), base_url=os.environ.get("LLM_BASE_URL", ""))
+        client = self.client
 
         functions = self.build_functions()
         tools = self.build_tools()
@@ -70,6 +183,7 @@ class LLM(Agent):
             # have to manually trigger the first reset to kick off agent
             user_prompt = self.build_user_prompt(latest_frame)
             message0 = {"role": "user", "content": user_prompt}
+            self._prompt_message = message0
             self.push_message(message0)
             if self.MODEL_REQUIRES_TOOLS:
                 message1 = {
@@ -110,6 +224,10 @@ class LLM(Agent):
                 "name": function_name,
                 "content": str(function_response),
             }
+        if self.delta_frames:
+            self._frame_message = (message2, latest_frame)
+            if self.grid_encoder.keyframe:
+                self._keyframe_message = message2
         self.push_message(message2)
 
         if self.DO_OBSERVATION:
@@ -121,12 +239,14 @@ class LLM(Agent):
                 }
                 if self.REASONING_EFFORT is not None:
                     create_kwargs["reasoning_effort"] = self.REASONING_EFFORT
-                response = client.chat.completions.create(**create_kwargs)
+                with self.timings.span("llm"):
+                    response = client.chat.completions.create(**create_kwargs)
             except openai.BadRequestError as e:
                 logger.info(f"Messages saved to messages.json")
                 with open("messages.json", "w") as f:
                     json.dump(self.messages, f, indent=2)
                 raise e
+            self.track_prompt_cache(response.usage)
             self.track_tokens(
                 response.usage.total_tokens, response.choices[0].message.content
             )
@@ -145,6 +265,7 @@ class LLM(Agent):
         name = GameAction.ACTION5.name  # default action if LLM doesnt call one
         arguments = None
         message5 = None
+        extra_messages: list[dict[str, Any]] = []
 
         if self.MODEL_REQUIRES_TOOLS:
             logger.info("Sending to Assistant for action...")
@@ -157,12 +278,14 @@ class LLM(Agent):
                 }
                 if self.REASONING_EFFORT is not None:
                     create_kwargs["reasoning_effort"] = self.REASONING_EFFORT
-                response = client.chat.completions.create(**create_kwargs)
+                with self.timings.span("llm"):
+                    response = client.chat.completions.create(**create_kwargs)
             except openai.BadRequestError as e:
                 logger.info(f"Messages saved to messages.json")
                 with open("messages.json", "w") as f:
                     json.dump(self.messages, f, indent=2)
                 raise e
+            self.track_prompt_cache(response.usage)
             self.track_tokens(response.usage.total_tokens)
             message5 = response.choices[0].message
             logger.debug(f"... got response {message5}")
@@ -174,18 +297,20 @@ class LLM(Agent):
             name = tool_call.function.name
             arguments = tool_call.function.arguments
 
-            # sometimes the model will call multiple tools which isnt allowed
+            # sometimes the model will call multiple tools which isnt allowed,
+            # answered right after the assistant message itself
             extra_tools = message5.tool_calls[1:]
             for tc in extra_tools:
                 logger.info(
                     "Error: assistant called more than one action, only using the first."
                 )
-                message_extra = {
-                    "role": "tool",
-                    "tool_call_id": tc.id,
-                    "content": "Error: assistant can only call one action (tool) at a time. default to only the first chosen action.",
-                }
-                self.push_message(message_extra)
+                extra_messages.append(
+                    {
+                        "role": "tool",
+                        "tool_call_id": tc.id,
+                        "content": "Error: assistant can only call one action (tool) at a time. default to only the first chosen action.",
+                    }
+                )
         else:
             logger.info("Sending to Assistant for action...")
             try:
@@ -197,12 +322,14 @@ class LLM(Agent):
                 }
                 if self.REASONING_EFFORT is not None:
                     create_kwargs["reasoning_effort"] = self.REASONING_EFFORT
-                response = client.chat.completions.create(**create_kwargs)
+                with self.timings.span("llm"):
+                    response = client.chat.completions.create(**create_kwargs)
             except openai.BadRequestError as e:
                 logger.info(f"Messages saved to messages.json")
                 with open("messages.json", "w") as f:
                     json.dump(self.messages, f, indent=2)
                 raise e
+            self.track_prompt_cache(response.usage)
             self.track_tokens(response.usage.total_tokens)
             message5 = response.choices[0].message
             function_call = message5.function_call
@@ -212,6 +339,8 @@ class LLM(Agent):
 
         if message5:
             self.push_message(message5)
+        for message_extra in extra_messages:
+            self.push_message(message_extra)
         action_id = name
         if arguments:
             try:
@@ -228,6 +357,7 @@ class LLM(Agent):
 
     def track_tokens(self, tokens: int, message: str = "") -> None:
         self.token_counter += tokens
+        REGISTRY.inc("arc_llm_tokens_total", tokens, **self.timings.labels)
         if hasattr(self, "recorder") and not self.is_playback:
             self.recorder.record(
                 {
@@ -248,30 +378,155 @@ class LLM(Agent):
         #         indent=2,
         #     )
 
+    def track_prompt_cache(self, usage: Any) -> None:
+        """Count the prompt tokens of a response and how many the provider read from its prompt cache."""
+        prompt_tokens = getattr(usage, "prompt_tokens", None)
+        if not isinstance(prompt_tokens, int):
+            return
+        details = getattr(usage, "prompt_tokens_details", None)
+        cached_tokens = getattr(details, "cached_tokens", None)
+        if not isinstance(cached_tokens, int):
+            cached_tokens = 0
+        self.prompt_token_counter += prompt_tokens
+        self.cached_token_counter += cached_tokens
+        REGISTRY.inc("arc_llm_prompt_tokens_total", prompt_tokens, **self.timings.labels)
+        REGISTRY.inc("arc_llm_cached_tokens_total", cached_tokens, **self.timings.labels)
+
+    @property
+    def cache_hit_rate(self) -> float:
+        """Share of prompt tokens read from the provider's prompt cache."""
+        if not self.prompt_token_counter:
+            return 0.0
+        return self.cached_token_counter / self.prompt_token_counter
+
     def push_message(self, message: dict[str, Any]) -> list[dict[str, Any]]:
-        """Push a message onto stack, store up to MESSAGE_LIMIT with FIFO."""
+        """
+        Push a message onto the context, then evict the oldest turns while it is
+        over CONTEXT_TOKEN_LIMIT tokens or MESSAGE_LIMIT messages. An assistant
+        tool call is evicted together with its tool responses, and the newest
+        turn is always kept. With SUMMARIZE_EVICTED, evicted turns are folded
+        into a summary message at the front of the context.
+
+        The first prompt is never evicted, and turns are evicted in batches
+        down to TRIM_TARGET of the limit. Between evictions the context only
+        grows at its end, so consecutive requests share a long byte-identical
+        prefix the provider can serve from its prompt cache.
+        """
+        if len(self._message_tokens) != len(self.messages):
+            # self.messages was replaced from outside, count it again
+            self._message_tokens = [message_tokens(m) for m in self.messages]
         self.messages.append(message)
-        if len(self.messages) > self.MESSAGE_LIMIT and 0:
-            # When trimming messages, preserve the proper sequence for tool calls
-            if self.MODEL_REQUIRES_TOOLS:
-                # Find the last assistant message with tool_calls
-                last_tool_call_index = -1
-                for i in range(len(self.messages) - 1, -1, -1):
-                    msg = self.messages[i]
-                    if isinstance(msg, dict) and msg.get("role") == "assistant" and "tool_calls" in msg:
-                        last_tool_call_index = i
-                        break
-                
-                if last_tool_call_index >= 0:
-                    # Keep messages from the last tool call onwards
-                    self.messages = self.messages[last_tool_call_index:]
-                else:
-                    # If no tool calls found, just trim from the end
-                    self.messages = self.messages[-self.MESSAGE_LIMIT:]
-            else:
-                self.messages = self.messages[-self.MESSAGE_LIMIT:]
+        self._message_tokens.append(message_tokens(message))
+        self.trim_messages()
         return self.messages
 
+    @property
+    def context_tokens(self) -> int:
+        """Approximate prompt tokens of self.messages."""
+        return sum(self._message_tokens)
+
+    def trim_messages(self) -> None:
+        token_limit = self.CONTEXT_TOKEN_LIMIT
+        if self.SUMMARIZE_EVICTED:
+            token_limit -= self.SUMMARY_TOKEN_LIMIT
+        # the first prompt stays, then the summary, then the turns
+        pinned = 1 if self.messages and self.messages[0] is self._prompt_message else 0
+        has_summary = len(self.messages) > pinned and self.messages[pinned] is self._summary_message
+        start = pinned + 1 if has_summary else pinned
+        summary_tokens = self._message_tokens[pinned] if has_summary else 0
+
+        if (
+            self.context_tokens - summary_tokens <= token_limit
+            and len(self.messages) <= self.MESSAGE_LIMIT
+        ):
+            return
+        token_limit = int(token_limit * self.TRIM_TARGET)
+        evicted: list[Any] = []
+        while (
+            self.context_tokens - summary_tokens > token_limit
+            or len(self.messages) > self.MESSAGE_LIMIT
+        ):
+            # a turn is one message plus the tool responses that follow it
+            end = start + 1
+            while end < len(self.messages) and message_role(self.messages[end]) in ("tool", "function"):
+                end += 1
+            if end >= len(self.messages):
+                break  # never evict the newest turn
+            turn = self.messages[start:end]
+            evicted.extend(turn)
+            del self.messages[start:end]
+            del self._message_tokens[start:end]
+            if any(message is self._keyframe_message for message in turn):
+                self.resend_keyframe()
+
+        if not evicted:
+            return
+        logger.debug(f"Evicted {len(evicted)} messages, {self.context_tokens} context tokens left")
+        if not self.SUMMARIZE_EVICTED:
+            return
+        summary = self.summarize_turns(evicted)
+        if not summary:
+            return
+        self._summary_message = {"role": "user", "content": summary}
+        if has_summary:
+            self.messages[pinned] = self._summary_message
+            self._message_tokens[pinned] = message_tokens(self._summary_message)
+        else:
+            self.messages.insert(pinned, self._summary_message)
+            self._message_tokens.insert(pinned, message_tokens(self._summary_message))
+
+    def resend_keyframe(self) -> None:
+        """
+        The full frame the delta frames build on was evicted: rewrite the
+        newest frame message in full, so the deltas after it apply again.
+        """
+        self._keyframe_message = None
+        self.grid_encoder.reset()
+        if self._frame_message is None:
+            return
+        message, frame = self._frame_message
+        for i, m in enumerate(self.messages):
+            if m is message:
+                message["content"] = str(self.build_func_resp_prompt(frame))
+                self._message_tokens[i] = message_tokens(message)
+                self._keyframe_message = message
+                return
+
+    def summarize_turns(self, evicted: list[Any]) -> str:
+        """
+        Summary of every turn evicted so far: the actions taken and the latest
+        observations. Override to summarize differently, e.g. with the model.
+        """
+        for message in evicted:
+            if not isinstance(message, dict):
+                message = message.model_dump(exclude_none=True)
+            if message_role(message) != "assistant":
+                continue
+            calls = [c["function"] for c in message.get("tool_calls") or []]
+            if message.get("function_call"):
+                calls.append(message["function_call"])
+            for call in calls:
+                arguments = call.get("arguments") or ""
+                args = "" if arguments in ("", "{}") else f" {arguments}"
+                self._evicted_actions.append(f"{call.get('name')}{args}")
+            if not calls and message.get("content"):
+                self._evicted_notes.append(" ".join(str(message["content"]).split())[:300])
+
+        actions = self._evicted_actions
+        recent = actions[-40:]
+        lines = [
+            "# Summary of earlier turns (removed from the conversation to save context)",
+            f"Actions taken ({len(actions)}"
+            + (f", last {len(recent)} shown" if len(recent) < len(actions) else "")
+            + f"): {', '.join(recent)}",
+        ]
+        if self._evicted_notes:
+            lines.append("Latest observations:")
+            lines.extend(f"- {note}" for note in self._evicted_notes)
+        summary = "\n".join(lines)
+        # keep within SUMMARY_TOKEN_LIMIT, at ~4 characters per token
+        return summary[: self.SUMMARY_TOKEN_LIMIT * 4]
+
     def build_functions(self) -> list[dict[str, Any]]:
         """Build JSON function description of game actions for LLM."""
         empty_params: dict[str, Any] = {
@@ -390,17 +645,26 @@ Call exactly one action.
         )
 
     def pretty_print_3d(self, array_3d: list[list[list[Any]]]) -> str:
-        lines = []
-        for i, block in enumerate(array_3d):
-            lines.append(f"Grid {i}:")
-            for row in block:
-                lines.append(f"  {row}")
-            lines.append("")
-        return "\n".join(lines)
+        """The frame as prompt text, in this agent's GRID_ENCODING."""
+        return self.grid_encoder.encode(array_3d)
+
+    def summary(self) -> dict[str, Any]:
+        return {
+            **super().summary(),
+            "prompt_tokens": self.prompt_token_counter,
+            "cached_tokens": self.cached_token_counter,
+        }
 
     def cleanup(self, *args: Any, **kwargs: Any) -> None:
         if self._cleanup:
+            if self.prompt_token_counter:
+                logger.info(
+                    f"{self.game_id} - {self.cached_token_counter}/{self.prompt_token_counter} "
+                    f"prompt tokens read from the prompt cache ({self.cache_hit_rate:.1%})"
+                )
             if hasattr(self, "recorder") and not self.is_playback:
+                # record the whole last frame, not its changes since the one before
+                self.grid_encoder.reset()
                 meta = {
                     "llm_user_prompt": self.build_user_prompt(self.frames[-1]),
                     "llm_tools": self.build_tools()
@@ -429,7 +693,7 @@ class ReasoningLLM(LLM, Agent):
         self._total_reasoning_tokens = 0
 
     def choose_action(
-        self, frames: list[FrameData], latest_frame: FrameData
+        self, frames: Sequence[FrameData], latest_frame: FrameData
     ) -> GameAction:
         """Override choose_action to capture and store reasoning metadata."""
 
@@ -524,7 +788,7 @@ class GuidedLLM(LLM, Agent):
         self._total_reasoning_tokens = 0
 
     def choose_action(
-        self, frames: list[FrameData], latest_frame: FrameData
+        self, frames: Sequence[FrameData], latest_frame: FrameData
     ) -> GameAction:
         """Override choose_action to capture and store reasoning metadata."""
 
@@ -1,11 +1,37 @@
 import random
 import time
-from typing import Any
+from typing import Any, Sequence
 
-from ..agent import Agent
+from ..agent import Agent, AsyncAgent
 from ..structs import FrameData, GameAction, GameState
 
 
+def random_action(latest_frame: FrameData) -> GameAction:
+    """Pick RESET when the game needs (re)starting, otherwise a random action."""
+    if latest_frame.state in [GameState.NOT_PLAYED, GameState.GAME_OVER]:
+        # if game is not started (at init or after GAME_OVER) we need to reset
+        # add a small delay before resetting after GAME_OVER to avoid timeout
+        action = GameAction.RESET
+    else:
+        # else choose a random action that isnt reset
+        action = random.choice([a for a in GameAction if a is not GameAction.RESET])
+
+    if action.is_simple():
+        action.reasoning = f"RNG told me to pick {action.value}"
+    elif action.is_complex():
+        action.set_data(
+            {
+                "x": random.randint(0, 63),
+                "y": random.randint(0, 63),
+            }
+        )
+        action.reasoning = {
+            "desired_action": f"{action.value}",
+            "my_reason": "RNG said so!",
+        }
+    return action
+
+
 class Random(Agent):
     """An agent that always selects actions at random."""
 
@@ -20,7 +46,7 @@ class Random(Agent):
     def name(self) -> str:
         return f"{super().name}.{self.MAX_ACTIONS}"
 
-    def is_done(self, frames: list[FrameData], latest_frame: FrameData) -> bool:
+    def is_done(self, frames: Sequence[FrameData], latest_frame: FrameData) -> bool:
         """Decide if the agent is done playing or not."""
         return any(
             [
@@ -31,28 +57,32 @@ class Random(Agent):
         )
 
     def choose_action(
-        self, frames: list[FrameData], latest_frame: FrameData
+        self, frames: Sequence[FrameData], latest_frame: FrameData
     ) -> GameAction:
         """Choose which action the Agent should take, fill in any arguments, and return it."""
-        if latest_frame.state in [GameState.NOT_PLAYED, GameState.GAME_OVER]:
-            # if game is not started (at init or after GAME_OVER) we need to reset
-            # add a small delay before resetting after GAME_OVER to avoid timeout
-            action = GameAction.RESET
-        else:
-            # else choose a random action that isnt reset
-            action = random.choice([a for a in GameAction if a is not GameAction.RESET])
-
-        if action.is_simple():
-            action.reasoning = f"RNG told me to pick {action.value}"
-        elif action.is_complex():
-            action.set_data(
-                {
-                    "x": random.randint(0, 63),
-                    "y": random.randint(0, 63),
-                }
-            )
-            action.reasoning = {
-                "desired_action": f"{action.value}",
-                "my_reason": "RNG said so!",
-            }
-        return action
+        return random_action(latest_frame)
+
+
+class AsyncRandom(AsyncAgent):
+    """Same as Random, but runs on the shared Swarm event loop instead of a thread."""
+
+    MAX_ACTIONS = 80
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        seed = int(time.time() * 1000000) + hash(self.game_id) % 1000000
+        random.seed(seed)
+
+    @property
+    def name(self) -> str:
+        return f"{super().name}.{self.MAX_ACTIONS}"
+
+    def is_done(self, frames: Sequence[FrameData], latest_frame: FrameData) -> bool:
+        """Decide if the agent is done playing or not."""
+        return latest_frame.state is GameState.WIN
+
+    async def choose_action(  # type: ignore[override]
+        self, frames: Sequence[FrameData], latest_frame: FrameData
+    ) -> GameAction:
+        """Choose which action the Agent should take, fill in any arguments, and return it."""
+        return random_action(latest_frame)
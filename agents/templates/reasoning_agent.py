@@ -4,12 +4,13 @@ import json
 import logging
 import os
 import textwrap
-from typing import Any, Dict, List, Literal, Optional
+from typing import Any, Dict, List, Literal, Optional, Sequence
 
-from openai import OpenAI
+import numpy as np
 from PIL import Image, ImageDraw, ImageFont
 from pydantic import BaseModel, Field
 
+from ..grid_encoding import DiffEncoder
 from ..structs import FrameData, GameAction, FrameColor
 from .llm_agents import ReasoningLLM
 
@@ -75,13 +76,17 @@ class ReasoningAgent(ReasoningLLM):
         self.grid_history: List[List[List[int]]] = []
         self.max_screen_history = 10  # Limit screen history to prevent memory leak
         self.max_grid_history = 10  # Limit grid history to prevent memory leak
-        self.client = OpenAI(api_key=os.environ.get("LLM_API_KEY", ""), base_url=os.environ.get("LLM_BASE_URL", ""))
+        if isinstance(self.grid_encoder, DiffEncoder) and not include_images:
+            # every prompt stands alone, without the screen a delta has nothing to apply
+            # to, so the whole grid is sent along with the list of changed cells
+            self.grid_encoder.keyframe_interval = 1
 
     def clear_history(self) -> None:
         """Clear all history when transitioning between levels."""
         self.history = []
         self.screen_history = []
         self.grid_history = []
+        self.grid_encoder.reset()
 
     def generate_annotated_grid_image(
         self, grid: List[List[int]], cell_size: int = 40, zone_size: int = 16
@@ -344,6 +349,14 @@ class ReasoningAgent(ReasoningLLM):
 
     def build_user_prompt(self, latest_frame: FrameData) -> str:
         """Build the user prompt for hypothesis-driven exploration."""
+        return self.build_system_prompt()
+
+    def build_system_prompt(self) -> str:
+        """
+        The rules of the game. Sent first and byte-identical on every turn so
+        the provider can serve it from its prompt cache; anything that changes
+        between turns belongs in the user message after it.
+        """
         level_1_solution = '''Level 1 Solution:
 
 Top‑right map: Shows the available colors that can be used for changing the outer cells.
@@ -398,8 +411,6 @@ Your goal:
 
 Define an hypothesis and an action to validate it.
 
-You are currently at level {latest_frame.score + 1}.
-
 IMPORTANT: New levels will be automatically started. No need to click anything to start.
 
 HINT: Focus on the maps in the game to win the game.
@@ -413,13 +424,15 @@ HINT: Focus on the maps in the game to win the game.
         try:
             tools = self.build_tools()
 
-            response = self.client.chat.completions.create(
-                model=self.MODEL,
-                messages=messages,
-                tools=tools,
-                tool_choice="required",
-            )
+            with self.timings.span("llm"):
+                response = self.client.chat.completions.create(
+                    model=self.MODEL,
+                    messages=messages,
+                    tools=tools,
+                    tool_choice="required",
+                )
 
+            self.track_prompt_cache(response.usage)
             self.track_tokens(
                 response.usage.total_tokens, response.choices[0].message.content
             )
@@ -447,7 +460,7 @@ HINT: Focus on the maps in the game to win the game.
         current_grid = latest_frame.frame[-1] if latest_frame.frame else []
         map_image = self.generate_annotated_grid_image(current_grid)
 
-        # Build messages
+        # the system prompt is the stable prefix, the level and grids follow it
         system_prompt = self.build_user_prompt(latest_frame)
 
         # Get latest action from history
@@ -474,24 +487,25 @@ HINT: Focus on the maps in the game to win the game.
                 ]
             )
         
-        if previous_grid:
-            previous_grid_text = self.pretty_print_3d([previous_grid])
-            user_message_content.extend(
-                [
-                    {"type": "text", "text": "Previous grid data:"},
-                    {"type": "text", "text": previous_grid_text},
-                ]
-            )
+        # with delta frames the changes are the grid text itself, unless the
+        # screen is left out and every grid is sent whole
+        if previous_grid and not (self.delta_frames and include_images):
+            if not self.delta_frames:
+                previous_grid_text = self.pretty_print_3d([previous_grid])
+                user_message_content.extend(
+                    [
+                        {"type": "text", "text": "Previous grid data:"},
+                        {"type": "text", "text": previous_grid_text},
+                    ]
+                )
             # Compute and show grid changes
-            current_grid = latest_frame.frame[-1] if latest_frame.frame else []
             changes = []
-            if previous_grid and current_grid and len(previous_grid) == len(current_grid) and len(previous_grid[0]) == len(current_grid[0]):
-                for y in range(len(previous_grid)):
-                    for x in range(len(previous_grid[0])):
-                        old = previous_grid[y][x]
-                        new = current_grid[y][x]
-                        if old != new:
-                            changes.append(f"({x},{y}): {old} -> {new}")
+            if not latest_frame.is_empty():
+                old_grid = np.asarray(previous_grid, dtype=np.uint8)
+                new_grid = latest_frame.grid[-1]
+                if old_grid.shape == new_grid.shape:
+                    for y, x in np.argwhere(old_grid != new_grid):
+                        changes.append(f"({x},{y}): {old_grid[y, x]} -> {new_grid[y, x]}")
             if changes:
                 changes_text = "Grid changes (x, y: old -> new):\n" + "\n".join(changes)
             else:
@@ -499,7 +513,10 @@ HINT: Focus on the maps in the game to win the game.
             user_message_content.append({"type": "text", "text": changes_text})
 
         raw_grid_text = self.pretty_print_3d(latest_frame.frame)
-        user_message_text = f"Your previous action was: {json.dumps(latest_action.model_dump() if latest_action else None, indent=2)}\n\nRaw Grid:\n{raw_grid_text}\n\nWhat should you do next?"
+        grid_title = "Raw Grid"
+        if not self.grid_encoder.keyframe:
+            grid_title = "Grid changes since your previous action (the screen shows the whole grid)"
+        user_message_text = f"You are currently at level {latest_frame.score + 1}.\n\nYour previous action was: {json.dumps(latest_action.model_dump() if latest_action else None, indent=2)}\n\n{grid_title}:\n{raw_grid_text}\n\nWhat should you do next?"
 
         if include_images:
             user_message_text += "\n\nAttached is the visual screen."
@@ -542,7 +559,7 @@ HINT: Focus on the maps in the game to win the game.
         return result
 
     def choose_action(
-        self, frames: List[FrameData], latest_frame: FrameData
+        self, frames: Sequence[FrameData], latest_frame: FrameData
     ) -> GameAction:
         """Choose action using parent class tool calling with reasoning enhancement."""
         if latest_frame.full_reset:
@@ -2,7 +2,7 @@ import logging
 import os
 import textwrap
 import time
-from typing import Any
+from typing import Any, Sequence
 
 from PIL import Image
 from smolagents import (
@@ -61,7 +61,7 @@ class SmolCodingAgent(LLM, Agent):
 
         self.cleanup()
 
-    def is_done(self, frames: list[FrameData], latest_frame: FrameData) -> bool:
+    def is_done(self, frames: Sequence[FrameData], latest_frame: FrameData) -> bool:
         """Decide if the agent is done playing or not."""
         return latest_frame.state is GameState.WIN
 
@@ -278,7 +278,7 @@ class SmolVisionAgent(LLM, Agent):
         agent.run(prompt, max_steps=self.MAX_ACTIONS, images=[initial_image])
         self.cleanup()
 
-    def is_done(self, frames: list[FrameData], latest_frame: FrameData) -> bool:
+    def is_done(self, frames: Sequence[FrameData], latest_frame: FrameData) -> bool:
         """Decide if the agent is done playing or not."""
         return latest_frame.state is GameState.WIN
 
@@ -1,6 +1,7 @@
 """AgentOps integration module for tracing agent execution."""
 
 import functools
+import inspect
 import logging
 from typing import TYPE_CHECKING, Any, Callable, Optional
 
@@ -111,7 +112,40 @@ def _handle_trace_error(trace: Any, agent_instance: "Agent", error: Exception) -
 
 
 def trace_agent_session(func: Callable[..., Any]) -> Callable[..., Any]:
-    """Decorator that wraps an agent's main execution loop to trace it."""
+    """Decorator that wraps an agent's main execution loop to trace it.
+
+    Works for both the blocking `Agent.main` and coroutine loops such as
+    `AsyncAgent.main_async`.
+    """
+
+    if inspect.iscoroutinefunction(func):
+
+        @functools.wraps(func)
+        async def async_wrapper(
+            agent_instance: "Agent", *args: Any, **kwargs: Any
+        ) -> Any:
+            if not is_available() or agentops_client is None:
+                return await func(agent_instance, *args, **kwargs)
+
+            trace = None
+            try:
+                with agentops_client.start_trace(
+                    trace_name=agent_instance.name, tags=agent_instance.tags or []
+                ) as trace:
+                    agent_instance.trace = trace
+                    result = await func(agent_instance, *args, **kwargs)
+                    _set_trace_status(trace, agent_instance)
+                    return result
+            except Exception as e:
+                if trace is not None:
+                    _handle_trace_error(trace, agent_instance, e)
+                logger.error(
+                    f"Agent {agent_instance.name} failed with exception: {e}",
+                    exc_info=True,
+                )
+                raise
+
+        return async_wrapper
 
     @functools.wraps(func)
     def wrapper(agent_instance: "Agent", *args: Any, **kwargs: Any) -> Any:
@@ -0,0 +1,250 @@
+"""Replay recordings against a game server and check it returns the recorded frames.
+
+    python -m agents.verify [recording ...] [--url http://localhost:8001] [--processes 8]
+
+With no recordings given, every recording in RECORDINGS_DIR is verified.
+
+A result only means something against a server that runs the real games, i.e.
+the ARC-AGI-3 API. The local stand-in in agents.local_server can't stand in
+for it: a RecordedGame sends back the recording's own frames whatever the
+actions, and a ScriptedGame is a different game, so replaying there either
+always passes or always fails.
+"""
+
+import argparse
+import logging
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Optional, Sequence
+
+import numpy as np
+import requests
+from pydantic import BaseModel, Field
+
+from .agent import Playback
+from .recorder import Recorder
+from .structs import FrameData, GameAction
+
+logger = logging.getLogger("arc")
+
+COMPARED_FIELDS = ("frame", "state", "score")
+
+
+class Mismatch(BaseModel):
+    index: int
+    action: str
+    fields: list[str]
+
+
+class VerificationResult(BaseModel):
+    filename: str
+    game_id: str = ""
+    recorded: int = 0
+    replayed: int = 0
+    mismatches: list[Mismatch] = Field(default_factory=list)
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return (
+            self.error is None
+            and not self.mismatches
+            and self.replayed == self.recorded
+        )
+
+
+class Verifier(Playback):
+    """
+    Replays a recording's actions and compares every returned frame with the one
+    recorded for the same action. Never writes to the recording.
+    """
+
+    TURBO = True
+    FRAME_WINDOW = 64
+    STOP_ON_MISMATCH = True
+
+    def __init__(self, path: str, ROOT_URL: str, card_id: str = "") -> None:
+        self.path = path
+        game_id = next(
+            (
+                e["data"]["game_id"]
+                for e in Recorder.from_path(path).stream(fields=("game_id",))
+                if e["data"].get("game_id")
+            ),
+            Recorder.get_prefix_one(os.path.basename(path)),
+        )
+        super().__init__(
+            card_id=card_id,
+            game_id=game_id,
+            game_idx=0,
+            agent_name=os.path.basename(path),
+            ROOT_URL=ROOT_URL,
+            record=False,
+        )
+        if not self.recorded_actions:
+            raise ValueError(f"no actions to replay in {path}")
+        self.result = VerificationResult(
+            filename=path, game_id=game_id, recorded=len(self.recorded_actions)
+        )
+
+    def open_recording(self) -> Recorder:
+        return Recorder.from_path(self.path)
+
+    def filter_actions(self) -> list[dict[str, Any]]:
+        # the compared fields are kept next to each action
+        fields = ("action_input", *COMPARED_FIELDS)
+        return [
+            e
+            for e in self.recorder.stream(fields=fields)
+            if "action_input" in e["data"]
+        ]
+
+    def is_done(self, frames: Sequence[FrameData], latest_frame: FrameData) -> bool:
+        if self.STOP_ON_MISMATCH and self.result.mismatches:
+            return True
+        return super().is_done(frames, latest_frame)
+
+    def take_action(self, action: GameAction) -> Optional[FrameData]:
+        frame = super().take_action(action)
+        expected = self.recorded_actions[self.action_counter]["data"]
+        if frame is None:
+            fields = ["invalid frame"]
+        else:
+            fields = compare_frame(frame, expected)
+        if fields:
+            self.result.mismatches.append(
+                Mismatch(index=self.action_counter, action=action.name, fields=fields)
+            )
+        self.result.replayed += 1
+        return frame
+
+    def log_action(self, action: GameAction, frame: FrameData) -> None:
+        pass
+
+    def cleanup(self, *args: Any, **kwargs: Any) -> None:
+        if self._cleanup:
+            self._cleanup = False
+            self._session.close()
+            self.frames.close()
+
+
+def compare_frame(frame: FrameData, expected: dict[str, Any]) -> list[str]:
+    """Names of the compared fields where `frame` differs from the recorded frame data."""
+    fields = []
+    if "frame" in expected:
+        recorded = np.asarray(expected["frame"])
+        if recorded.shape != frame.grid.shape or not np.array_equal(
+            recorded, frame.grid
+        ):
+            fields.append("frame")
+    if "state" in expected and expected["state"] != frame.state.value:
+        fields.append("state")
+    if "score" in expected and expected["score"] != frame.score:
+        fields.append("score")
+    return fields
+
+
+def verify_recording(path: str, ROOT_URL: str, card_id: str) -> VerificationResult:
+    """Replay one recording on an open scorecard and report where it diverged."""
+    try:
+        verifier = Verifier(path, ROOT_URL, card_id=card_id)
+        verifier.main()
+        return verifier.result
+    except Exception as e:
+        logger.error(f"Failed to verify {path}: {e}")
+        return VerificationResult(filename=path, error=str(e))
+
+
+def verify_recordings(
+    paths: Sequence[str], ROOT_URL: str, processes: Optional[int] = None
+) -> list[VerificationResult]:
+    """Verify recordings in parallel on a process pool, results in the order of `paths`.
+
+    All recordings are replayed on one scorecard, opened before the first and
+    closed after the last. Raises if the scorecard can't be opened.
+    """
+    if not paths:
+        return []
+    processes = max(min(processes or os.cpu_count() or 1, len(paths)), 1)
+    with requests.Session() as session:
+        session.headers.update(
+            {"X-API-Key": os.getenv("ARC_API_KEY", ""), "Accept": "application/json"}
+        )
+        r = session.post(f"{ROOT_URL}/api/scorecard/open", json={"tags": ["verify"]})
+        if not r.ok:
+            raise RuntimeError(
+                f"API error during open scorecard: {r.status_code} - {r.text}"
+            )
+        card_id = str(r.json()["card_id"])
+        try:
+            # spawn, like the Swarm: workers don't inherit this process's session
+            with ProcessPoolExecutor(
+                max_workers=processes, mp_context=multiprocessing.get_context("spawn")
+            ) as pool:
+                return list(
+                    pool.map(
+                        verify_recording,
+                        paths,
+                        [ROOT_URL] * len(paths),
+                        [card_id] * len(paths),
+                    )
+                )
+        finally:
+            r = session.post(
+                f"{ROOT_URL}/api/scorecard/close", json={"card_id": card_id}
+            )
+            if not r.ok:
+                logger.warning(
+                    f"API error during close scorecard: {r.status_code} - {r.text}"
+                )
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "recordings",
+        nargs="*",
+        help="Recording files (default: all in RECORDINGS_DIR).",
+    )
+    scheme = os.environ.get("SCHEME", "http")
+    host = os.environ.get("HOST", "localhost")
+    port = os.environ.get("PORT", 8001)
+    parser.add_argument(
+        "--url",
+        default=f"{scheme}://{host}:{port}",
+        help="Game server to replay against.",
+    )
+    parser.add_argument("-p", "--processes", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    recordings_dir = os.environ.get("RECORDINGS_DIR", "")
+    paths = args.recordings or [
+        os.path.join(recordings_dir, name) for name in sorted(Recorder.list())
+    ]
+    try:
+        results = verify_recordings(paths, args.url, args.processes)
+    except Exception as e:
+        print(f"verification failed: {e}")
+        return 1
+    for result in results:
+        if result.ok:
+            status = "ok"
+        elif result.error:
+            status = f"error: {result.error}"
+        else:
+            first = result.mismatches[0] if result.mismatches else None
+            status = (
+                f"mismatch at action {first.index} ({first.action}): {', '.join(first.fields)}"
+                if first
+                else f"replayed {result.replayed}/{result.recorded} actions"
+            )
+        print(f"{result.filename}: {status}")
+    failed = sum(not r.ok for r in results)
+    print(f"{len(results) - failed}/{len(results)} recordings verified")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
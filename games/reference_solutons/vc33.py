@@ -8,6 +8,7 @@ from arc_tools.logger import logger
 
 
 
+from agents.recorder import Recorder
 from agents.structs import FrameColor
 
 from glob import glob
@@ -20,16 +21,14 @@ frame_number = None
 def load_grid_data(frame_number):
     # fp=r'C:\Users\smart\Desktop\GD\ARC-AGI-3-Engine\backend\game_data\ft09-16726c5b26ff\level_1\final.json'
     """Load grid data from jsonl"""
-    with open(fp, 'r') as f:
-        if fp.endswith('.json'):
+    if fp.endswith('.json'):
+        with open(fp, 'r') as f:
             data = json.load(f)
             return data['grid']
-        else:
-            lines = f.readlines()
-            if frame_number is None:
-                frame_number = len(lines) 
-            data = json.loads(lines[frame_number-1])
-            return data['data']['frame'][-1]
+    else:
+        recording = Recorder.from_path(fp)
+        data = recording.event(-1 if frame_number is None else frame_number-1)
+        return data['data']['frame'][-1]
 
 grid_data = load_grid_data(frame_number)
 grid = Grid(grid_data)
@@ -18,6 +18,9 @@ from typing import Optional
 import requests
 
 from agents import AVAILABLE_AGENTS, Swarm
+from agents.metrics import serve as serve_metrics
+from agents.recorder import Recorder
+from agents.recorder import flush_all as flush_recordings
 from agents.tracing import initialize as init_agentops
 
 logger = logging.getLogger('arc')
@@ -50,6 +53,7 @@ def cleanup(
     frame: Optional[FrameType],
 ) -> None:
     logger.info("Received SIGINT, exiting...")
+    flush_recordings()
     card_id = swarm.card_id
     if card_id:
         scorecard = swarm.close_scorecard(card_id)
@@ -112,13 +116,61 @@ def main() -> None:
         help="Comma-separated list of tags for the scorecard (e.g., 'experiment,v1.0')",
         default=None,
     )
+    parser.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        help="Maximum number of games played at the same time (defaults to all of them, or SWARM_MAX_WORKERS).",
+        default=None,
+    )
+    parser.add_argument(
+        "-p",
+        "--processes",
+        type=int,
+        help="Spread the games over this many worker processes (for CPU-heavy agents).",
+        default=None,
+    )
+    parser.add_argument(
+        "--attempts",
+        type=int,
+        help="How many times each game is played.",
+        default=1,
+    )
+
+    parser.add_argument(
+        "--turbo",
+        action="store_true",
+        help="Replay recordings without pacing, as fast as the server answers, and report actions/sec.",
+    )
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        help="Serve live Prometheus metrics on this port at /metrics (or set METRICS_PORT).",
+        default=None,
+    )
+    parser.add_argument(
+        "--list-recordings",
+        action="store_true",
+        help="Print the recordings in RECORDINGS_DIR with their game, score and action count, then exit.",
+    )
 
     args = parser.parse_args()
 
+    if args.list_recordings:
+        for info in Recorder.catalog():
+            print(
+                f"{info.filename}  game={info.game_id} agent={info.agent} "
+                f"score={info.score} state={info.state} actions={info.actions}"
+            )
+        return
+
     if not args.agent:
         logger.error("An Agent must be specified")
         return
 
+    if args.turbo:
+        os.environ["PLAYBACK_TURBO"] = "1"  # read by Playback, also in worker processes
+
     print(f"{ROOT_URL}/api/games")
 
     # Get the list of games from the API
@@ -143,9 +195,7 @@ def main() -> None:
         logger.error(f"Failed to connect to API server: {e}")
 
     # For playback agents, we can derive the game from the recording filename
-    if not full_games and args.agent and args.agent.endswith(".recording.jsonl"):
-        from agents.recorder import Recorder
-
+    if not full_games and args.agent and Recorder.is_recording(args.agent):
         game_prefix = Recorder.get_prefix_one(args.agent)
         full_games = [game_prefix]
         logger.info(
@@ -183,12 +233,16 @@ def main() -> None:
 
     # Initialize AgentOps client
     init_agentops(api_key=os.getenv("AGENTOPS_API_KEY"), log_level=log_level)
+    serve_metrics(args.metrics_port)
 
     swarm = Swarm(
         args.agent,
         ROOT_URL,
         games,
         tags=tags,  # Pass tags as keyword argument
+        max_workers=args.workers,
+        attempts=args.attempts,
+        processes=args.processes,
     )
     agent_thread = threading.Thread(target=partial(run_agent, swarm))
     agent_thread.daemon = True  # die when the main thread dies
@@ -0,0 +1,67 @@
+"""Per-frame decode cost of a server response: full validation vs the trusted fast path.
+
+python scripts/bench_frame_decode.py [--frames 2000] [--layers 1] [--size 64]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from typing import Any, Callable
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from agents.serialization import dumps, loads  # noqa: E402
+from agents.structs import FrameData  # noqa: E402
+
+
+def make_payload(layers: int, size: int) -> bytes:
+    return dumps(
+        {
+            "game_id": "bench-game",
+            "guid": "bench-guid",
+            "frame": [
+                [[random.randrange(16) for _ in range(size)] for _ in range(size)]
+                for _ in range(layers)
+            ],
+            "state": "NOT_FINISHED",
+            "score": 1,
+            "available_actions": [1, 2, 3, 4, 5, 6],
+            "action_input": {"id": 6, "data": {"x": 3, "y": 7}},
+        }
+    )
+
+
+def bench(
+    name: str, decode: Callable[[Any], Any], payload: bytes, frames: int
+) -> float:
+    start = time.perf_counter()
+    for _ in range(frames):
+        decode(loads(payload))
+    per_frame = (time.perf_counter() - start) / frames
+    print(f"{name:<16} {per_frame * 1e6:10.1f} us/frame")
+    return per_frame
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--frames", type=int, default=2000)
+    parser.add_argument("--layers", type=int, default=1)
+    parser.add_argument("--size", type=int, default=64)
+    args = parser.parse_args()
+
+    payload = make_payload(args.layers, args.size)
+    assert FrameData.from_server(loads(payload)) == FrameData.model_validate(
+        loads(payload)
+    )
+
+    print(f"{args.frames} frames, {args.layers}x{args.size}x{args.size} grid")
+    bench("json only", lambda data: data, payload, args.frames)
+    slow = bench("model_validate", FrameData.model_validate, payload, args.frames)
+    fast = bench("from_server", FrameData.from_server, payload, args.frames)
+    print(f"speedup          {slow / fast:10.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""Prompt tokens per frame for every grid encoding in agents/grid_encoding.py.
+
+Encodes the frames of recordings in order, as an agent would see them, and
+reports tokens and characters per frame for each encoding:
+
+    python scripts/bench_grid_encoding.py [recording ...] [--frames 200] [--json out.json]
+
+Without recordings (given or in RECORDINGS_DIR) it plays a scripted game from
+the local stand-in server with random actions. Tokens are counted with
+tiktoken's o200k encoding when it is available, otherwise estimated at four
+characters per token.
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from typing import Any, Iterator
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from agents.grid_encoding import GRID_ENCODERS, get_encoder  # noqa: E402
+from agents.local_server import ScriptedGame  # noqa: E402
+from agents.recorder import Recorder  # noqa: E402
+from agents.structs import GameAction  # noqa: E402
+from agents.templates import llm_agents  # noqa: E402
+
+Frame = list[list[list[int]]]
+
+
+def recorded_frames(paths: list[str]) -> Iterator[Frame]:
+    for path in paths:
+        for event in Recorder.from_path(path).stream(fields=["frame"]):
+            if event["data"]["frame"]:
+                yield event["data"]["frame"]
+
+
+def scripted_frames(count: int, seed: int = 0) -> Iterator[Frame]:
+    rng = random.Random(seed)
+    game = ScriptedGame("bench", win_after=count + 1)
+    yield game.reset()["frame"]
+    actions = [a for a in GameAction if a is not GameAction.RESET]
+    for _ in range(count - 1):
+        action = rng.choice(actions)
+        data = {"x": rng.randrange(64), "y": rng.randrange(64)}
+        yield game.step(action, data)["frame"]
+
+
+def measure(name: str, frames: list[Frame]) -> dict[str, Any]:
+    encoder = get_encoder(name)
+    tokens, chars = [], []
+    start = time.perf_counter()
+    texts = [encoder.encode(frame) for frame in frames]
+    elapsed = time.perf_counter() - start
+    for text in texts:
+        tokens.append(llm_agents.count_tokens(text))
+        chars.append(len(text))
+    return {
+        "encoding": name,
+        "frames": len(frames),
+        "tokens_mean": round(statistics.mean(tokens), 1),
+        "tokens_median": statistics.median(tokens),
+        "tokens_max": max(tokens),
+        "tokens_total": sum(tokens),
+        "chars_mean": round(statistics.mean(chars), 1),
+        "encode_us": round(elapsed / len(frames) * 1e6, 1),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("recordings", nargs="*")
+    parser.add_argument(
+        "--frames", type=int, default=200, help="Frames to encode at most."
+    )
+    parser.add_argument("--encodings", default=",".join(GRID_ENCODERS))
+    parser.add_argument(
+        "--json", default=None, help="Also write the results to this file."
+    )
+    args = parser.parse_args()
+
+    paths = args.recordings
+    if not paths and os.environ.get("RECORDINGS_DIR"):
+        paths = [
+            os.path.join(os.environ["RECORDINGS_DIR"], name)
+            for name in sorted(Recorder.list())
+        ]
+    frames: list[Frame] = []
+    for frame in recorded_frames(paths):
+        frames.append(frame)
+        if len(frames) >= args.frames:
+            break
+    source = f"{len(paths)} recordings"
+    if not frames:
+        frames = list(scripted_frames(args.frames))
+        source = "a scripted game"
+
+    llm_agents.count_tokens("")  # load the tokenizer before timing
+    counter = (
+        "tiktoken o200k_base" if llm_agents._encoding else "estimate (4 chars/token)"
+    )
+    print(f"{len(frames)} frames from {source}, tokens counted with {counter}\n")
+
+    results = [measure(name, frames) for name in args.encodings.split(",")]
+    baseline = results[0]["tokens_mean"] or 1
+    print(
+        f"{'encoding':<10} {'tokens/frame':>12} {'median':>8} {'max':>7} {'chars/frame':>12}"
+        f" {'vs ' + results[0]['encoding']:>9} {'encode us':>10}"
+    )
+    for r in results:
+        print(
+            f"{r['encoding']:<10} {r['tokens_mean']:>12.1f} {r['tokens_median']:>8} {r['tokens_max']:>7}"
+            f" {r['chars_mean']:>12.1f} {r['tokens_mean'] / baseline:>9.1%} {r['encode_us']:>10.1f}"
+        )
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(
+                {"source": source, "counter": counter, "results": results}, f, indent=2
+            )
+
+
+if __name__ == "__main__":
+    main()
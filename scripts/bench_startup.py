@@ -0,0 +1,95 @@
+"""Startup cost: `import agents` and `python main.py` time-to-first-action.
+
+Runs main.py against a throwaway local stand-in for the game API and reports
+how long it takes from process start until the agent's first action arrives.
+
+    python scripts/bench_startup.py [--agent random] [--runs 5]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import Optional
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+
+from agents.local_server import LocalServer  # noqa: E402
+
+
+def time_import(runs: int) -> list[float]:
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(
+            [sys.executable, "-c", "import agents"],
+            cwd=ROOT,
+            check=True,
+            capture_output=True,
+        )
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def time_first_action(
+    agent: str, server: LocalServer, runs: int
+) -> list[Optional[float]]:
+    env = {
+        **os.environ,
+        "SCHEME": "http",
+        "HOST": "127.0.0.1",
+        "PORT": str(server.url.rsplit(":", 1)[1]),
+        "RECORDINGS_DIR": "",
+    }
+    times: list[Optional[float]] = []
+    for _ in range(runs):
+        actions = server.actions
+        start = time.perf_counter()
+        proc = subprocess.Popen(
+            [sys.executable, "main.py", "-a", agent],
+            cwd=ROOT,
+            env=env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        try:
+            got = False
+            while not got and proc.poll() is None:
+                got = server.wait_for_actions(actions + 1, timeout=0.01)
+            times.append(time.perf_counter() - start if got else None)
+        finally:
+            proc.kill()
+            proc.wait()
+    return times
+
+
+def report(name: str, times: list[Optional[float]]) -> None:
+    done = [t for t in times if t is not None]
+    if not done:
+        print(f"{name:<20} no result")
+        return
+    print(
+        f"{name:<20} median {statistics.median(done) * 1000:8.1f} ms"
+        f"  min {min(done) * 1000:8.1f} ms  ({len(done)}/{len(times)} runs)"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--agent", default="random")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    with LocalServer.scripted(1, win_after=1) as server:
+        report("import agents", list(time_import(args.runs)))
+        report(
+            f"first action ({args.agent})",
+            time_first_action(args.agent, server, args.runs),
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+"""End-to-end Swarm throughput against the local stand-in server.
+
+Plays Random and Playback swarms over 1, 10, 100 and 1000 scripted games and
+reports actions/sec, p50/p99 action latency, peak RSS and recording bytes per
+action. Every scenario runs in a fresh process so peak RSS is its own.
+
+    python scripts/bench_swarm.py [--agents random,playback] [--games 1,10,100,1000]
+        [--output bench_swarm.json] [--baseline old.json] [--tolerance 0.2]
+
+With --baseline, exits 1 when a scenario's actions/sec dropped or its p99
+latency rose by more than the tolerance.
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Optional
+
+import numpy as np
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+
+from agents.agent import Agent  # noqa: E402
+from agents.local_server import LocalServer  # noqa: E402
+from agents.recorder import Recorder, flush_all  # noqa: E402
+from agents.swarm import Swarm  # noqa: E402
+
+WIN_AFTER = 50
+
+
+def recording_bytes(directory: str) -> int:
+    return sum(
+        entry.stat().st_size
+        for entry in os.scandir(directory)
+        if entry.is_file() and Recorder.is_recording(entry.name)
+    )
+
+
+def peak_rss_bytes() -> int:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return int(peak if sys.platform == "darwin" else peak * 1024)
+
+
+def record_source_game(server: LocalServer) -> str:
+    """Play one Random game so Playback swarms have a recording to replay."""
+    swarm = Swarm("random", server.url, ["local-0000"], tags=["bench"])
+    swarm.main()
+    flush_all()
+    # finished agents are released, their summaries keep the recording name
+    recording: str = swarm.results[0]["recording"]
+    return os.path.basename(recording)
+
+
+def run_scenario(agent: str, games: int, max_workers: Optional[int]) -> dict[str, Any]:
+    """Play one swarm in this process and measure it."""
+    latencies: list[float] = []
+    do_action_request = Agent.do_action_request
+
+    def timed(self: Agent, action: Any) -> dict[str, Any]:
+        start = time.perf_counter()
+        try:
+            return do_action_request(self, action)
+        finally:
+            latencies.append(time.perf_counter() - start)
+
+    with tempfile.TemporaryDirectory(prefix="bench-swarm-") as recordings_dir:
+        os.environ["RECORDINGS_DIR"] = recordings_dir
+        with LocalServer.scripted(games, win_after=WIN_AFTER) as server:
+            name = agent
+            if agent == "playback":
+                os.environ["PLAYBACK_TURBO"] = "1"
+                name = record_source_game(server)
+            before = recording_bytes(recordings_dir)
+            actions_before = server.actions
+
+            Agent.do_action_request = timed  # type: ignore[method-assign]
+            try:
+                swarm = Swarm(
+                    name,
+                    server.url,
+                    list(server.games),
+                    tags=["bench"],
+                    max_workers=max_workers,
+                )
+                start = time.perf_counter()
+                swarm.main()
+                flush_all()
+                elapsed = time.perf_counter() - start
+            finally:
+                Agent.do_action_request = do_action_request  # type: ignore[method-assign]
+
+            actions = server.actions - actions_before
+            written = recording_bytes(recordings_dir) - before
+
+    ms = np.asarray(latencies) * 1000 if latencies else np.zeros(1)
+    return {
+        "agent": agent,
+        "games": games,
+        "workers": swarm.worker_count,
+        "actions": actions,
+        "won": sum(r["state"] == "WIN" for r in swarm.results),
+        "seconds": round(elapsed, 3),
+        "actions_per_second": round(actions / elapsed, 1) if elapsed > 0 else 0.0,
+        "latency_p50_ms": round(float(np.percentile(ms, 50)), 3),
+        "latency_p99_ms": round(float(np.percentile(ms, 99)), 3),
+        "peak_rss_mb": round(peak_rss_bytes() / 2**20, 1),
+        "recording_bytes_per_action": round(written / actions, 1) if actions else 0.0,
+        "errors": server.errors,
+    }
+
+
+def run_in_subprocess(
+    agent: str, games: int, max_workers: Optional[int]
+) -> dict[str, Any]:
+    cmd = [sys.executable, __file__, "--scenario", agent, "--games", str(games)]
+    if max_workers:
+        cmd += ["--max-workers", str(max_workers)]
+    proc = subprocess.run(cmd, cwd=ROOT, capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(f"{agent} x {games} failed:\n{proc.stderr[-2000:]}")
+    result: dict[str, Any] = json.loads(proc.stdout.strip().splitlines()[-1])
+    return result
+
+
+def compare(
+    results: list[dict[str, Any]], baseline: list[dict[str, Any]], tolerance: float
+) -> list[str]:
+    """Scenarios that regressed by more than `tolerance` against the baseline."""
+    previous = {(r["agent"], r["games"]): r for r in baseline}
+    regressions = []
+    for r in results:
+        old = previous.get((r["agent"], r["games"]))
+        if old is None:
+            continue
+        key = f"{r['agent']} x {r['games']}"
+        if r["actions_per_second"] < old["actions_per_second"] * (1 - tolerance):
+            regressions.append(
+                f"{key}: {r['actions_per_second']} actions/sec, was {old['actions_per_second']}"
+            )
+        if r["latency_p99_ms"] > old["latency_p99_ms"] * (1 + tolerance):
+            regressions.append(
+                f"{key}: p99 {r['latency_p99_ms']} ms, was {old['latency_p99_ms']}"
+            )
+    return regressions
+
+
+def print_header() -> None:
+    print(
+        f"{'agent':<10} {'games':>6} {'actions':>8} {'actions/s':>10} {'p50 ms':>8}"
+        f" {'p99 ms':>8} {'rss MB':>8} {'rec B/action':>13}"
+    )
+
+
+def print_row(r: dict[str, Any]) -> None:
+    print(
+        f"{r['agent']:<10} {r['games']:>6} {r['actions']:>8} {r['actions_per_second']:>10.1f}"
+        f" {r['latency_p50_ms']:>8.2f} {r['latency_p99_ms']:>8.2f}"
+        f" {r['peak_rss_mb']:>8.1f} {r['recording_bytes_per_action']:>13.1f}",
+        flush=True,
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--agents", default="random,playback")
+    parser.add_argument("--games", default="1,10,100,1000")
+    parser.add_argument("--max-workers", type=int, default=None)
+    parser.add_argument("--output", default="bench_swarm.json")
+    parser.add_argument(
+        "--baseline", default=None, help="Earlier results to compare against."
+    )
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    parser.add_argument("--scenario", default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.scenario:
+        logging.basicConfig(level=logging.ERROR)
+        logging.getLogger("arc").setLevel(logging.ERROR)
+        result = run_scenario(args.scenario, int(args.games), args.max_workers)
+        print(json.dumps(result))
+        return 0
+
+    results = []
+    print_header()
+    for agent in args.agents.split(","):
+        for games in (int(g) for g in args.games.split(",")):
+            results.append(run_in_subprocess(agent, games, args.max_workers))
+            print_row(results[-1])
+
+    with open(args.output, "w") as f:
+        json.dump(
+            {
+                "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "results": results,
+            },
+            f,
+            indent=2,
+        )
+    print(f"results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f)["results"], args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
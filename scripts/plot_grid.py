@@ -4,6 +4,7 @@ import numpy as np
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from agents.recorder import Recorder
 from agents.structs import FrameColor
 
 fp = r'recordings\ft09-a14010482fbd.reasoningagent.gemini-2.5-pro.with-observe.high.20250726083833..recording.jsonl'
@@ -11,13 +12,13 @@ frame_number = 5
 def load_grid_data():
     # fp=r'C:\Users\smart\Desktop\GD\ARC-AGI-3-Engine\backend\game_data\ft09-16726c5b26ff\level_1\final.json'
     """Load grid data from jsonl"""
-    with open(fp, 'r') as f:
-        if fp.endswith('.json'):
+    if fp.endswith('.json'):
+        with open(fp, 'r') as f:
             data = json.load(f)
             return data['grid']
-        else:
-            data = json.loads(f.readlines()[(frame_number-1)*2])
-            return data['data']['frame'][-1]
+    else:
+        data = Recorder.from_path(fp).event((frame_number-1)*2)
+        return data['data']['frame'][-1]
 
 def create_color_map():
     """Create color mapping for grid values"""
@@ -1,5 +1,16 @@
+import asyncio
+import json
+from unittest.mock import Mock, patch
+
+import httpx
+import numpy as np
 import pytest
+from openai.types.chat import ChatCompletionMessage, ChatCompletionMessageToolCall
+from openai.types.chat.chat_completion_message_tool_call import Function
+from openai.types.completion_usage import CompletionUsage, PromptTokensDetails
 
+from agents.agent import Playback
+from agents.recorder import Recorder
 from agents.structs import (
     ActionInput,
     Card,
@@ -8,8 +19,12 @@ from agents.structs import (
     GameState,
     Scorecard,
 )
+from agents.templates import llm_agents
+from agents.templates.langgraph_functional_agent import build_agent
 from agents.templates.langgraph_random_agent import LangGraphRandom
-from agents.templates.random_agent import Random
+from agents.templates.llm_agents import LLM
+from agents.templates.random_agent import AsyncRandom, Random
+from agents.templates.reasoning_agent import ReasoningAgent
 
 
 @pytest.mark.unit
@@ -225,6 +240,152 @@ class TestRandomAgent:
         assert agent.is_done([sample_frame], sample_frame) is False
 
 
+@pytest.mark.unit
+class TestAgentActionRequest:
+    def test_take_action_parses_response_once(self):
+        agent = Random(
+            card_id="test-card",
+            game_id="test-game",
+            game_idx=0,
+            agent_name="test-agent",
+            ROOT_URL="https://example.com",
+            record=False,
+        )
+        response = Mock()
+        response.content = json.dumps(
+            {
+                "game_id": "test-game",
+                "frame": [[[1, 2], [3, 4]]],
+                "state": "NOT_FINISHED",
+                "score": 3,
+                "guid": "test-guid",
+            }
+        ).encode()
+
+        action = GameAction.ACTION6
+        action.set_data({"x": 1, "y": 2})
+        action.reasoning = {"why": "test"}
+        try:
+            with patch.object(
+                agent._session, "post", return_value=response
+            ) as mock_post:
+                frame = agent.take_action(action)
+        finally:
+            action.reasoning = None
+
+        assert frame is not None
+        assert frame.score == 3
+        assert frame.guid == "test-guid"
+        response.json.assert_not_called()
+
+        call_args = mock_post.call_args
+        assert call_args[0][0] == "https://example.com/api/cmd/ACTION6"
+        assert call_args[1]["headers"]["Content-Type"] == "application/json"
+        body = json.loads(call_args[1]["data"])
+        assert body == {
+            "game_id": "test-game",
+            "x": 1,
+            "y": 2,
+            "reasoning": {"why": "test"},
+        }
+
+
+@pytest.mark.unit
+class TestPlayback:
+    def make_playback(self, actions, env):
+        recorder = Recorder(prefix=f"test-game.random{actions}")
+        for i in range(actions):
+            recorder.record(
+                {
+                    "game_id": "test-game",
+                    "score": 0,
+                    "frame": [[[i % 16]]],
+                    "action_input": {"id": 1, "data": {}},
+                }
+            )
+        recorder.record({"tokens": 1})
+        recorder.close()
+        with patch.dict("os.environ", env):
+            return Playback(
+                card_id="test-card",
+                game_id="test-game",
+                game_idx=0,
+                agent_name=recorder.filename.rsplit("/", 1)[-1],
+                ROOT_URL="https://example.com",
+                record=False,
+            )
+
+    def play(self, agent):
+        frame = FrameData(game_id="test-game", state=GameState.NOT_FINISHED)
+        with (
+            patch.object(agent, "take_action", return_value=frame),
+            patch("agents.agent.time.sleep") as sleep,
+            patch.object(agent, "get_scorecard", return_value=Scorecard()),
+        ):
+            agent.main()
+        return sleep
+
+    def test_turbo_playback_never_sleeps(self, temp_recordings_dir):
+        agent = self.make_playback(20, {"PLAYBACK_TURBO": "1"})
+        assert agent.TURBO and agent.TRUST_SERVER_FRAMES
+        assert agent.frames.window == 64 and not agent.frames.spill
+        assert len(agent.recorded_actions) == 20
+
+        sleep = self.play(agent)
+
+        sleep.assert_not_called()
+        assert agent.action_counter == 20
+        assert agent.summary()["actions_per_second"] > 0
+
+    def test_playback_is_paced(self, temp_recordings_dir):
+        agent = self.make_playback(3, {"PLAYBACK_TURBO": "0"})
+        assert not agent.TURBO
+
+        sleep = self.play(agent)
+
+        # the first action goes out at once, the others wait for their slot
+        assert sleep.call_count == 2
+        assert all(c.args[0] > 0 for c in sleep.call_args_list)
+
+
+@pytest.mark.unit
+class TestAsyncRandomAgent:
+    def test_main_async_plays_until_win(self):
+        requests_seen = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            requests_seen.append(request)
+            state = "WIN" if len(requests_seen) == 3 else "NOT_FINISHED"
+            return httpx.Response(
+                200,
+                json={
+                    "game_id": "test-game",
+                    "frame": [[[0, 1], [1, 0]]],
+                    "state": state,
+                    "score": len(requests_seen),
+                    "guid": "test-guid",
+                },
+            )
+
+        agent = AsyncRandom(
+            card_id="test-card",
+            game_id="test-game",
+            game_idx=0,
+            agent_name="test-agent",
+            ROOT_URL="https://example.com",
+            record=False,
+            transport=httpx.MockTransport(handler),
+        )
+        asyncio.run(agent.main_async())
+
+        assert len(requests_seen) == 3
+        assert requests_seen[0].url.path == "/api/cmd/RESET"
+        assert json.loads(requests_seen[0].content)["card_id"] == "test-card"
+        assert json.loads(requests_seen[1].content)["guid"] == "test-guid"
+        assert agent.state == GameState.WIN
+        assert agent.action_counter == 3
+
+
 @pytest.mark.unit
 class TestLangGraphRandomAgent:
     def test_agent_init(self):
@@ -281,6 +442,318 @@ class TestLangGraphRandomAgent:
         assert agent.is_done([sample_frame], sample_frame) is False
 
 
+@pytest.mark.unit
+class TestLLMClient:
+    def test_functional_agent_needs_openai_key(self, monkeypatch):
+        monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+        with pytest.raises(ValueError, match="needs OPENAI_API_KEY"):
+            build_agent()
+
+    def test_client_is_shared_per_endpoint(self, monkeypatch):
+        monkeypatch.setattr(llm_agents, "_clients", {})
+        monkeypatch.setenv("LLM_API_KEY", "key-a")
+        monkeypatch.setenv("LLM_BASE_URL", "http://llm.local/v1")
+
+        agents = [
+            LLM(
+                card_id="test-card",
+                game_id=f"test-game-{i}",
+                game_idx=i,
+                agent_name="llm",
+                ROOT_URL="https://example.com",
+                record=False,
+            )
+            for i in range(2)
+        ]
+
+        assert agents[0].client is agents[1].client
+        assert str(agents[0].client.base_url) == "http://llm.local/v1/"
+        assert llm_agents.get_client() is agents[0].client
+        assert llm_agents.get_client(api_key="key-b") is not agents[0].client
+        assert len(llm_agents._clients) == 2
+
+    def test_pool_size_from_env(self, monkeypatch):
+        monkeypatch.setattr(llm_agents, "_clients", {})
+        monkeypatch.setenv("LLM_POOL_MAXSIZE", "7")
+        with patch.object(
+            llm_agents, "DefaultHttpxClient", wraps=llm_agents.DefaultHttpxClient
+        ) as http_client:
+            llm_agents.get_client(api_key="key", base_url="http://llm.local/v1")
+
+        limits = http_client.call_args.kwargs["limits"]
+        assert limits.max_connections == 7
+        assert limits.max_keepalive_connections == 7
+
+
+class FakeChatClient:
+    """
+    Answers observations with text and action requests with one ACTION1 tool
+    call. Like a provider's prompt cache, reports the messages a request shares
+    with the previous one as cached, in 128 token steps from 1024 tokens.
+    """
+
+    def __init__(self):
+        self.prompt_tokens = []
+        self.previous = []
+        self.chat = Mock()
+        self.chat.completions.create = self.create
+
+    def create(self, messages, tools=None, **kwargs):
+        tokens = [llm_agents.message_tokens(m) for m in messages]
+        shared = 0
+        for i, (message, previous) in enumerate(zip(messages, self.previous)):
+            if message != previous:
+                break
+            shared += tokens[i]
+        cached = shared // 128 * 128 if shared >= 1024 else 0
+        self.previous = list(messages)
+        self.prompt_tokens.append(sum(tokens))
+        n = len(self.prompt_tokens)
+        if tools:
+            message = ChatCompletionMessage(
+                role="assistant",
+                tool_calls=[
+                    ChatCompletionMessageToolCall(
+                        id=f"call_{n}",
+                        type="function",
+                        function=Function(name="ACTION1", arguments="{}"),
+                    )
+                ],
+            )
+        else:
+            message = ChatCompletionMessage(
+                role="assistant", content=f"Observation {n}."
+            )
+        usage = CompletionUsage(
+            prompt_tokens=sum(tokens),
+            completion_tokens=10,
+            total_tokens=10,
+            prompt_tokens_details=PromptTokensDetails(cached_tokens=cached),
+        )
+        return Mock(usage=usage, choices=[Mock(message=message)])
+
+
+@pytest.mark.unit
+class TestLLMContext:
+    def make_agent(self, **attrs):
+        agent = LLM(
+            card_id="test-card",
+            game_id="test-game",
+            game_idx=0,
+            agent_name="llm",
+            ROOT_URL="https://example.com",
+            record=False,
+        )
+        for key, value in attrs.items():
+            setattr(agent, key, value)
+        agent.client = FakeChatClient()
+        return agent
+
+    def test_prompt_tokens_stay_flat(self):
+        agent = self.make_agent(CONTEXT_TOKEN_LIMIT=20000)
+        frame = FrameData(
+            game_id="test-game",
+            frame=[np.random.randint(0, 16, (64, 64)).tolist()],
+            state=GameState.NOT_FINISHED,
+        )
+        for _ in range(400):
+            action = agent.choose_action([frame], frame)
+            frame.action_input.id = action
+
+        tokens = agent.client.prompt_tokens
+        assert len(tokens) == 2 * 399
+        assert max(tokens) <= 20000
+        assert max(tokens[-100:]) <= max(tokens[:100]) * 1.2
+        assert agent.context_tokens <= 20000
+
+        # every tool response directly follows the assistant message that called it
+        called: set[str] = set()
+        for message in agent.messages:
+            role = llm_agents.message_role(message)
+            if role == "assistant":
+                calls = (
+                    message.tool_calls
+                    if not isinstance(message, dict)
+                    else message.get("tool_calls", [])
+                )
+                called = {
+                    c.id if not isinstance(c, dict) else c["id"] for c in calls or []
+                }
+            elif role == "tool":
+                assert message["tool_call_id"] in called
+            else:
+                called = set()
+        assert agent.messages[0]["content"] == agent.build_user_prompt(frame)
+        summary = agent.messages[1]["content"]
+        assert summary.startswith("# Summary of earlier turns")
+        assert "ACTION1" in summary
+        assert "Observation" in summary
+
+    def test_message_limit_and_no_summary(self):
+        agent = self.make_agent(MESSAGE_LIMIT=4, SUMMARIZE_EVICTED=False)
+        for i in range(6):
+            agent.push_message({"role": "user", "content": f"turn {i}"})
+            agent.push_message(
+                {
+                    "role": "assistant",
+                    "tool_calls": [
+                        {
+                            "id": f"c{i}",
+                            "type": "function",
+                            "function": {"name": "ACTION1", "arguments": "{}"},
+                        }
+                    ],
+                }
+            )
+            agent.push_message(
+                {"role": "tool", "tool_call_id": f"c{i}", "content": "ok"}
+            )
+
+        assert [llm_agents.message_role(m) for m in agent.messages] == [
+            "user",
+            "assistant",
+            "tool",
+        ]
+        assert agent.messages[0]["content"] == "turn 5"
+
+    def test_newest_turn_is_never_evicted(self):
+        agent = self.make_agent(CONTEXT_TOKEN_LIMIT=1100)
+        agent.push_message({"role": "user", "content": "x" * 40000})
+        assert len(agent.messages) == 1
+
+    def test_prompt_cache_hits(self):
+        frame = FrameData(
+            game_id="test-game",
+            frame=[np.random.randint(0, 16, (64, 64)).tolist()],
+            state=GameState.NOT_FINISHED,
+        )
+        uncached = {}
+        for target in (0.8, 1.0):
+            agent = self.make_agent(CONTEXT_TOKEN_LIMIT=20000, TRIM_TARGET=target)
+            for _ in range(200):
+                frame.action_input.id = agent.choose_action([frame], frame)
+            assert agent.prompt_token_counter == sum(agent.client.prompt_tokens)
+            assert agent.summary()["cached_tokens"] == agent.cached_token_counter
+            uncached[target] = agent.prompt_token_counter - agent.cached_token_counter
+            if target == 0.8:
+                assert agent.cache_hit_rate > 0.6
+
+        # evicting a turn at a time rewrites the context after the first prompt every turn
+        assert uncached[0.8] < 0.6 * uncached[1.0]
+
+    def test_reasoning_agent_system_prompt_is_stable(self):
+        agent = ReasoningAgent(
+            card_id="test-card",
+            game_id="test-game",
+            game_idx=0,
+            agent_name="reasoning",
+            ROOT_URL="https://example.com",
+            record=False,
+        )
+        level_1 = FrameData(game_id="test-game", score=0)
+        level_4 = FrameData(game_id="test-game", score=3)
+        assert agent.build_user_prompt(level_1) == agent.build_user_prompt(level_4)
+
+    def test_reasoning_agent_text_only_delta_frames(self):
+        with (
+            patch.object(LLM, "DELTA_FRAMES", True),
+            patch("agents.templates.reasoning_agent.include_images", False),
+        ):
+            agent = ReasoningAgent(
+                card_id="test-card",
+                game_id="test-game",
+                game_idx=0,
+                agent_name="reasoning",
+                ROOT_URL="https://example.com",
+                record=False,
+            )
+            agent.call_llm_with_structured_output = Mock()
+            texts = []
+            for frame in self.moving_square(2):
+                agent.define_next_action(frame)
+                (messages,), _ = agent.call_llm_with_structured_output.call_args
+                texts.append([part["text"] for part in messages[1]["content"]])
+
+        # without the screen every grid is sent whole, with the changed cells after the first
+        assert agent.grid_encoder.keyframe
+        assert len(texts[0]) == 1
+        assert texts[1][0].startswith(
+            "Grid changes (x, y: old -> new):\n(0,30): 4 -> 8"
+        )
+        assert "Raw Grid:" in texts[1][1]
+
+    def test_track_prompt_cache(self):
+        agent = self.make_agent()
+        agent.track_prompt_cache(
+            CompletionUsage(
+                prompt_tokens=2000,
+                completion_tokens=5,
+                total_tokens=2005,
+                prompt_tokens_details=PromptTokensDetails(cached_tokens=1536),
+            )
+        )
+        agent.track_prompt_cache(
+            CompletionUsage(prompt_tokens=1000, completion_tokens=5, total_tokens=1005)
+        )
+        agent.track_prompt_cache(Mock())  # usage without counts is ignored
+        assert agent.prompt_token_counter == 3000
+        assert agent.cached_token_counter == 1536
+        assert agent.cache_hit_rate == pytest.approx(0.512)
+
+    def moving_square(self, turns):
+        """Frames of a 4x4 player walking right across a walled 64x64 level."""
+        level = np.full((64, 64), 8)
+        level[::8] = 10
+        frame = FrameData(game_id="test-game", state=GameState.NOT_FINISHED)
+        for turn in range(turns):
+            grid = level.copy()
+            grid[30:34, turn % 60 : turn % 60 + 4] = 4
+            frame.frame = [grid.tolist()]
+            yield frame
+
+    def frame_messages(self, agent):
+        return [
+            m["content"] for m in agent.messages if llm_agents.message_role(m) == "tool"
+        ]
+
+    def test_delta_frames_shrink_prompts(self):
+        sizes = {}
+        for delta in (False, True):
+            with patch.object(LLM, "DELTA_FRAMES", delta):
+                agent = self.make_agent(CONTEXT_TOKEN_LIMIT=200000)
+            for frame in self.moving_square(25):
+                frame.action_input.id = agent.choose_action([frame], frame)
+            frames = self.frame_messages(agent)
+            sizes[delta] = [llm_agents.count_tokens(text) for text in frames]
+
+        assert "Grid 0:\n  [10, 10, " in frames[0]
+        assert "changed region" in frames[1]
+        assert (
+            "changed region" not in frames[10]
+        )  # keyframe every KEYFRAME_INTERVAL turns
+        assert sum(sizes[True]) * 5 < sum(sizes[False])
+        assert sorted(sizes[True])[12] * 10 < sorted(sizes[False])[12]
+
+    def test_evicted_keyframe_is_sent_again(self):
+        with (
+            patch.object(LLM, "DELTA_FRAMES", True),
+            patch.object(LLM, "KEYFRAME_INTERVAL", 1000),
+        ):
+            agent = self.make_agent(CONTEXT_TOKEN_LIMIT=12000)
+        for frame in self.moving_square(40):
+            frame.action_input.id = agent.choose_action([frame], frame)
+            frames = self.frame_messages(agent)
+            if not frames:
+                continue
+            # the deltas in context always build on a full frame in context
+            keyframes = [
+                i for i, text in enumerate(frames) if "changed region" not in text
+            ]
+            assert keyframes
+            assert all("changed region" in text for text in frames[keyframes[-1] + 1 :])
+        assert agent.messages[1]["content"].startswith("# Summary of earlier turns")
+
+
 @pytest.mark.unit
 class TestFrameData:
     def test_frame_init(self):
@@ -357,3 +830,91 @@ class TestFrameData:
         assert len(frame.frame) == 2
         assert len(frame.frame[0]) == 3
         assert len(frame.frame[0][0]) == 3
+
+    def test_frame_grid(self):
+        frame = FrameData(frame=[[[1, 2], [3, 4]], [[1, 2], [3, 5]]], score=2)
+
+        grid = frame.grid
+        assert grid.shape == (2, 2, 2)
+        assert grid.dtype.name == "uint8"
+        assert grid.tolist() == frame.frame
+        assert frame.grid is grid
+        assert not grid.flags.writeable
+
+        assert frame == FrameData(frame=[[[1, 2], [3, 4]], [[1, 2], [3, 5]]], score=2)
+        assert FrameData().grid.shape == (0, 0, 0)
+
+        frame.frame = [[[9]]]
+        assert frame.grid.tolist() == [[[9]]]
+        copy = frame.model_copy(update={"frame": [[[1]]]})
+        assert copy.grid.tolist() == [[[1]]]
+        assert frame.grid.tolist() == [[[9]]]
+
+    def test_frame_from_grid(self):
+        array = np.array([[[0, 15], [7, 8]]])
+        frame = FrameData.from_grid(array, game_id="grid-test", score=3)
+
+        assert frame.frame == [[[0, 15], [7, 8]]]
+        assert frame.game_id == "grid-test"
+        assert frame.score == 3
+        assert frame.grid.tolist() == frame.frame
+
+        with pytest.raises(ValueError):
+            FrameData.from_grid(np.array([[[16]]]))
+        with pytest.raises(ValueError):
+            FrameData.from_grid(np.array([[1, 2]]))
+
+    def test_changed_cells(self):
+        previous = FrameData(frame=[[[1, 2], [3, 4]]])
+        latest = FrameData(frame=[[[1, 9], [3, 0]]])
+
+        assert latest.changed_cells(previous).tolist() == [[0, 0, 1], [0, 1, 1]]
+        assert latest.changed_cells(latest).tolist() == []
+        assert latest.changed_cells(FrameData()).shape == (0, 3)
+
+    def test_from_server_matches_model_validate(self):
+        data = {
+            "game_id": "test-game",
+            "frame": [[[1, 2], [3, 4]]],
+            "state": "NOT_FINISHED",
+            "score": 5,
+            "guid": "test-guid",
+            "available_actions": [1, 2, 5, 6, 7],
+            "action_input": {"id": 6, "data": {"x": 1, "y": 2}},
+        }
+
+        frame = FrameData.from_server(data)
+
+        assert frame == FrameData.model_validate(data)
+        assert frame.available_actions == ["move_up", "move_down", "mouse_click"]
+        assert frame.action_input.id is GameAction.ACTION6
+        assert frame.grid.shape == (1, 2, 2)
+
+    @pytest.mark.parametrize(
+        "data",
+        [
+            {"score": 255},
+            {"state": "BOGUS"},
+            {"frame": "not a grid"},
+            {"action_input": {"id": 99}},
+        ],
+    )
+    def test_from_server_rejects_malformed_data(self, data):
+        with pytest.raises((TypeError, ValueError)):
+            FrameData.from_server(data)
+
+    def test_agent_trusted_frames_fall_back_to_validation(self):
+        with patch.dict("os.environ", {"TRUST_SERVER_FRAMES": "1"}):
+            agent = Random(
+                card_id="test-card",
+                game_id="test-game",
+                game_idx=0,
+                agent_name="test-agent",
+                ROOT_URL="https://example.com",
+                record=False,
+            )
+        assert agent.TRUST_SERVER_FRAMES
+
+        frame = agent.parse_frame({"game_id": "test-game", "score": 2})
+        assert frame is not None and frame.score == 2
+        assert agent.parse_frame({"score": 300}) is None
@@ -0,0 +1,167 @@
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pytest
+
+from agents.grid_encoding import (
+    GRID_ENCODERS,
+    DiffEncoder,
+    GridEncoder,
+    RowEncoder,
+    RunLengthEncoder,
+    changed_regions,
+    get_encoder,
+)
+from agents.structs import FrameData
+from agents.templates.llm_agents import LLM
+
+
+def old_pretty_print_3d(array_3d):
+    lines = []
+    for i, block in enumerate(array_3d):
+        lines.append(f"Grid {i}:")
+        for row in block:
+            lines.append(f"  {row}")
+        lines.append("")
+    return "\n".join(lines)
+
+
+@pytest.mark.unit
+class TestGridEncoders:
+    frame = [[[0, 0, 0, 0], [0, 0, 0, 0], [0, 10, 10, 15], [0, 0, 0, 0]]]
+
+    def test_list_matches_old_format(self):
+        frame = [np.random.randint(0, 16, (8, 8)).tolist() for _ in range(2)]
+        assert GridEncoder().encode(frame) == old_pretty_print_3d(frame)
+
+    def test_hex(self):
+        lines = RowEncoder().encode(self.frame).splitlines()
+        assert lines[0].startswith("Grid 0 (4x4, one hex digit per cell")
+        assert lines[1:] == ["0000", "0000", "0aaf", "0000"]
+
+    def test_rle(self):
+        lines = RunLengthEncoder().encode(self.frame).splitlines()
+        assert lines[1:] == ["0*4", "0*4", "0 a*2 f", "0*4"]
+
+    def test_dedup_collapses_repeated_rows(self):
+        lines = RowEncoder(dedup=True).encode(self.frame).splitlines()
+        assert lines[1:] == ["0-1: 0000", "2: 0aaf", "3: 0000"]
+        assert get_encoder("rle-dedup").encode(self.frame).splitlines()[1] == "0-1: 0*4"
+
+    def test_diff_keyframes_and_changes(self):
+        encoder = DiffEncoder(keyframe_interval=3)
+        changed = [[row[:] for row in self.frame[0]]]
+        changed[0][1][2] = 5
+
+        keyframe = encoder.encode(self.frame)
+        assert encoder.keyframe
+        assert keyframe == RowEncoder(dedup=True).encode(self.frame)
+        assert encoder.encode(self.frame).strip() == "Grid 0: unchanged."
+        lines = encoder.encode(changed).splitlines()
+        assert not encoder.keyframe
+        assert lines[0] == "Grid 0: 1 changed region(s), all other cells unchanged."
+        assert lines[1].startswith("Region x 2-2, y 1-1 (one hex digit per cell")
+        assert lines[2:] == ["1: 5"]
+        # every keyframe_interval frames the whole grid is written again
+        assert encoder.encode(changed) == RowEncoder(dedup=True).encode(changed)
+
+    def test_diff_writes_keyframe_when_most_cells_change(self):
+        encoder = DiffEncoder()
+        encoder.encode(self.frame)
+        inverted = [[[15 - v for v in row] for row in self.frame[0]]]
+        assert encoder.encode(inverted) == RowEncoder(dedup=True).encode(inverted)
+        assert encoder.keyframe
+
+    def test_diff_with_list_base(self):
+        encoder = DiffEncoder(base=GridEncoder())
+        assert encoder.encode(self.frame) == GridEncoder().encode(self.frame)
+        changed = [[row[:] for row in self.frame[0]]]
+        changed[0][3][0] = 7
+        lines = encoder.encode(changed).splitlines()
+        assert lines[1] == "Region x 0-0, y 3-3 (rows as lists, y: row):"
+        assert lines[2] == "3: [7]"
+
+    def test_changed_regions(self):
+        previous = np.zeros((64, 64), dtype=np.uint8)
+        current = previous.copy()
+        current[10:14, 10:14] = 4  # a moved player, old and new position
+        previous[10:14, 6:10] = 4
+        current[50, [50, 53]] = 3  # two cells two apart share a box
+        current[0, 63] = 1
+        assert changed_regions(previous, current) == [
+            (0, 63, 0, 63),
+            (10, 6, 13, 13),
+            (50, 50, 50, 53),
+        ]
+        assert changed_regions(previous, previous) == []
+
+    def test_diff_writes_keyframe_on_resize(self):
+        encoder = DiffEncoder()
+        encoder.encode(self.frame)
+        small = [[[1, 2], [3, 4]]]
+        assert encoder.encode(small) == RowEncoder(dedup=True).encode(small)
+        encoder.reset()
+        assert encoder.encode(small) == RowEncoder(dedup=True).encode(small)
+
+    def test_encodings_are_smaller_than_list(self):
+        frame = [np.zeros((64, 64), dtype=int).tolist()]
+        frame[0][10][10:20] = [3] * 10
+        size = len(GridEncoder().encode(frame))
+        for name in GRID_ENCODERS:
+            if name != "list":
+                assert len(get_encoder(name).encode(frame)) < size / 2
+
+    def test_unknown_encoding(self):
+        with pytest.raises(ValueError, match="unknown grid encoding 'base64'"):
+            get_encoder("base64")
+
+
+@pytest.mark.unit
+class TestLLMGridEncoding:
+    def make_agent(self):
+        return LLM(
+            card_id="test-card",
+            game_id="test-game",
+            game_idx=0,
+            agent_name="llm",
+            ROOT_URL="https://example.com",
+            record=False,
+        )
+
+    def test_default_is_list(self):
+        frame = [[[1, 2], [3, 4]]]
+        assert self.make_agent().pretty_print_3d(frame) == old_pretty_print_3d(frame)
+
+    def test_grid_encoding_setting(self):
+        with patch.object(LLM, "GRID_ENCODING", "diff"):
+            agent = self.make_agent()
+        assert isinstance(agent.grid_encoder, DiffEncoder)
+        assert agent.pretty_print_3d([[[1, 2], [3, 4]]]).splitlines()[1:] == [
+            "0: 12",
+            "1: 34",
+        ]
+
+    def test_delta_frames_wrap_grid_encoding(self):
+        with (
+            patch.object(LLM, "DELTA_FRAMES", True),
+            patch.object(LLM, "KEYFRAME_INTERVAL", 3),
+        ):
+            agent = self.make_agent()
+        assert agent.delta_frames
+        assert agent.grid_encoder.keyframe_interval == 3
+        assert type(agent.grid_encoder.base) is GridEncoder
+        assert not self.make_agent().delta_frames
+
+    def test_cleanup_records_the_whole_last_frame(self):
+        with (
+            patch.object(LLM, "GRID_ENCODING", "hex"),
+            patch.object(LLM, "DELTA_FRAMES", True),
+        ):
+            agent = self.make_agent()
+        frame = FrameData(game_id="test-game", frame=[[[1, 2], [3, 4]]])
+        agent.frames.append(frame)
+        agent.pretty_print_3d(frame.frame)
+        agent.recorder = MagicMock()
+        agent.cleanup(MagicMock())
+        meta = agent.recorder.record.call_args_list[0].args[0]
+        assert "\n12\n34\n" in meta["llm_tool_resp_prompt"]
@@ -0,0 +1,134 @@
+from collections.abc import Sequence
+from unittest.mock import patch
+
+import pytest
+
+from agents.history import FrameHistory
+from agents.structs import ActionInput, FrameData, GameAction, GameState
+from agents.templates.random_agent import Random
+
+
+def make_frames(count):
+    return [
+        FrameData(
+            game_id="test-game",
+            frame=[[[i % 16, 1], [2, 3]]],
+            state=GameState.NOT_FINISHED,
+            score=i,
+        )
+        for i in range(count)
+    ]
+
+
+@pytest.mark.unit
+class TestFrameHistory:
+    def test_unbounded_history_keeps_everything_in_memory(self):
+        frames = make_frames(5)
+        history = FrameHistory(frames)
+
+        assert len(history) == 5
+        assert history.spilled == 0
+        assert list(history) == frames
+        assert history[-1] is frames[-1]
+
+    def test_window_spills_older_frames(self):
+        frames = make_frames(10)
+        history = FrameHistory(window=3)
+        for frame in frames:
+            history.append(frame)
+
+        assert len(history) == 10
+        assert history.spilled == 7
+        assert history[-1] is frames[-1]
+        assert history[0] == frames[0]
+        assert history[6] == frames[6]
+        assert history[-10] == frames[0]
+        assert [f.score for f in history] == list(range(10))
+        assert [f.score for f in reversed(history)] == list(range(9, -1, -1))
+        assert [f.score for f in history[2:8:2]] == [2, 4, 6]
+        assert isinstance(history, Sequence)
+        assert not isinstance(history, list)
+        assert history.index(frames[1]) == 1
+        assert frames[2] in history
+        assert history
+
+        with pytest.raises(IndexError):
+            history[10]
+
+        history.close()
+        assert history[-1] is frames[-1]
+        with pytest.raises(ValueError, match="closed"):
+            history[0]
+
+    def test_spilled_frames_round_trip(self):
+        frames = [
+            FrameData(
+                game_id="test-game",
+                frame=[[[i, 1], [2, 3]]],
+                state=GameState.NOT_FINISHED,
+                score=i,
+                action_input=ActionInput(
+                    id=GameAction.ACTION6, data={"x": i, "y": 5}, reasoning={"step": i}
+                ),
+                guid="guid-1",
+                full_reset=i == 0,
+                available_actions=[1, 2, 6],
+            )
+            for i in range(3)
+        ]
+        history = FrameHistory(frames, window=1)
+
+        assert history.spilled == 2
+        assert list(history) == frames
+        assert history[0].available_actions == ["move_up", "move_down", "mouse_click"]
+        assert history[0].full_reset
+        assert history[1].action_input.id is GameAction.ACTION6
+
+    def test_window_without_spill_drops_older_frames(self):
+        frames = make_frames(10)
+        history = FrameHistory(frames, window=3, spill=False)
+
+        assert len(history) == 3
+        assert history.spilled == 0
+        assert list(history) == frames[-3:]
+        assert history._store is None
+
+    def test_history_is_append_only(self):
+        history = FrameHistory(make_frames(2), window=1)
+        assert not hasattr(history, "insert")
+        with pytest.raises(TypeError):
+            history[0] = FrameData()
+        with pytest.raises(TypeError):
+            del history[0]
+
+    def test_clear(self):
+        history = FrameHistory(make_frames(4), window=2)
+        history.clear()
+        assert len(history) == 0
+        assert not history
+        history.append(FrameData(score=1))
+        assert history[0].score == 1
+
+    def test_invalid_window(self):
+        with pytest.raises(ValueError):
+            FrameHistory(window=0)
+
+    def test_agent_frame_window_from_env(self):
+        with patch.dict("os.environ", {"FRAME_HISTORY_WINDOW": "2"}):
+            agent = Random(
+                card_id="test-card",
+                game_id="test-game",
+                game_idx=0,
+                agent_name="test-agent",
+                ROOT_URL="https://example.com",
+                record=False,
+            )
+        for frame in make_frames(5):
+            agent.append_frame(frame)
+
+        assert isinstance(agent.frames, FrameHistory)
+        assert agent.frames.window == 2
+        assert len(agent.frames) == 6
+        assert agent.frames.spilled == 4
+        assert agent.score == 4
+        assert agent.frames[0].score == 0
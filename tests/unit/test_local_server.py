@@ -0,0 +1,142 @@
+import pytest
+import requests
+
+from agents.local_server import LocalServer, RecordedGame, ScriptedGame
+from agents.recorder import Recorder
+from agents.structs import GameAction, GameState
+from agents.templates.random_agent import Random
+
+
+@pytest.mark.unit
+class TestScriptedGame:
+    def test_wins_after_configured_actions(self):
+        game = ScriptedGame("test-game", size=8, win_after=3, score_every=1)
+        assert game.reset()["state"] == "NOT_FINISHED"
+        for _ in range(2):
+            frame = game.step(GameAction.ACTION1, {})
+        assert frame["state"] == "NOT_FINISHED"
+        frame = game.step(GameAction.ACTION2, {})
+        assert frame["state"] == "WIN"
+        assert frame["score"] == 3
+
+    def test_action6_paints_clicked_cell(self):
+        game = ScriptedGame("test-game", size=8)
+        game.reset()
+        frame = game.step(GameAction.ACTION6, {"x": 2, "y": 5})
+        assert frame["frame"][0][5][2] == 1
+        assert frame["action_input"] == {"id": 6, "data": {"x": 2, "y": 5}}
+
+
+@pytest.mark.unit
+class TestLocalServer:
+    def test_games_and_scorecard(self):
+        with LocalServer.scripted(2, win_after=2) as server:
+            games = requests.get(f"{server.url}/api/games").json()
+            assert [g["game_id"] for g in games] == ["local-0000", "local-0001"]
+
+            card_id = requests.post(
+                f"{server.url}/api/scorecard/open", json={"tags": ["test"]}
+            ).json()["card_id"]
+            frame = requests.post(
+                f"{server.url}/api/cmd/RESET",
+                json={"game_id": "local-0000", "card_id": card_id},
+            ).json()
+            guid = frame["guid"]
+            for _ in range(2):
+                frame = requests.post(
+                    f"{server.url}/api/cmd/ACTION1",
+                    json={"game_id": "local-0000", "guid": guid},
+                ).json()
+            assert frame["state"] == "WIN"
+
+            card = requests.get(
+                f"{server.url}/api/scorecard/{card_id}/local-0000"
+            ).json()
+            assert card["cards"]["local-0000"]["actions"] == [2]
+            assert card["cards"]["local-0000"]["states"] == [GameState.WIN.value]
+
+            closed = requests.post(
+                f"{server.url}/api/scorecard/close", json={"card_id": card_id}
+            )
+            assert closed.status_code == 200
+            assert closed.json()["won"] == 1
+            assert server.actions == 3
+
+    def test_reset_with_guid_restarts_the_play(self):
+        with LocalServer.scripted(1) as server:
+            card_id = requests.post(f"{server.url}/api/scorecard/open", json={}).json()[
+                "card_id"
+            ]
+            body = {"game_id": "local-0000", "card_id": card_id}
+            guid = requests.post(f"{server.url}/api/cmd/RESET", json=body).json()[
+                "guid"
+            ]
+            requests.post(f"{server.url}/api/cmd/ACTION1", json={"guid": guid})
+            again = requests.post(
+                f"{server.url}/api/cmd/RESET", json={**body, "guid": guid}
+            ).json()
+            assert again["guid"] == guid
+
+            card = requests.get(
+                f"{server.url}/api/scorecard/{card_id}/local-0000"
+            ).json()
+            play = card["cards"]["local-0000"]
+            assert play["total_plays"] == 1
+            assert play["resets"] == [1]
+            assert play["actions"] == [1]
+
+    def test_errors(self):
+        with LocalServer.scripted(1) as server:
+            r = requests.post(f"{server.url}/api/cmd/ACTION1", json={"guid": "nope"})
+            assert r.status_code == 400
+            r = requests.post(f"{server.url}/api/cmd/RESET", json={"game_id": "nope"})
+            assert r.status_code == 404
+            r = requests.post(f"{server.url}/api/cmd/JUMP", json={})
+            assert r.status_code == 400
+
+        with LocalServer.scripted(1, error_rate=1.0, seed=0) as server:
+            r = requests.get(f"{server.url}/api/games")
+            assert r.status_code == 500
+            assert server.errors == server.requests == 1
+
+    def test_agent_plays_to_win(self):
+        with LocalServer.scripted(1, win_after=5) as server:
+            agent = Random(
+                card_id="",
+                game_id="local-0000",
+                game_idx=0,
+                agent_name="random",
+                ROOT_URL=server.url,
+                record=False,
+            )
+            agent.main()
+
+            assert agent.state is GameState.WIN
+            assert server.wait_for_actions(agent.action_counter, timeout=1)
+
+    def test_recorded_game(self, temp_recordings_dir):
+        recorder = Recorder(prefix="recorded-game.local")
+        for i in range(3):
+            recorder.record(
+                {
+                    "game_id": "recorded-game",
+                    "frame": [[[i, 0], [0, i]]],
+                    "state": "NOT_FINISHED",
+                    "score": i,
+                    "action_input": {"id": 1, "data": {}},
+                }
+            )
+        recorder.close()
+
+        factory = RecordedGame.load(recorder.filename)
+        with LocalServer({"recorded-game": factory}) as server:
+            guid = requests.post(
+                f"{server.url}/api/cmd/RESET", json={"game_id": "recorded-game"}
+            ).json()["guid"]
+            scores = [
+                requests.post(
+                    f"{server.url}/api/cmd/ACTION3", json={"guid": guid}
+                ).json()["score"]
+                for _ in range(3)
+            ]
+        assert scores == [1, 2, 2]
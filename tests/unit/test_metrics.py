@@ -0,0 +1,166 @@
+import pytest
+import requests
+
+from agents.local_server import LocalServer
+from agents.metrics import REGISTRY, Histogram, MetricsRegistry, Timings, serve
+from agents.recorder import Recorder
+from agents.templates.random_agent import Random
+
+
+@pytest.mark.unit
+class TestHistogram:
+    def test_observe_and_quantiles(self):
+        histogram = Histogram()
+        for ms in range(1, 101):
+            histogram.observe(ms / 1000)
+
+        assert histogram.count == 100
+        assert histogram.min == 0.001
+        assert histogram.max == 0.1
+        assert histogram.mean == pytest.approx(0.0505)
+        assert histogram.quantile(0.5) == 0.05  # the 20-50 ms bucket
+        assert histogram.quantile(0.99) == 0.1  # capped at the largest observation
+        assert Histogram().quantile(0.5) == 0.0
+
+    def test_overflow_bucket(self):
+        histogram = Histogram()
+        histogram.observe(500.0)
+        assert histogram.counts[-1] == 1
+        assert histogram.quantile(0.5) == 500.0
+        assert histogram.to_dict()["buckets"] == {"inf": 1}
+
+    def test_merge_and_round_trip(self):
+        a, b = Histogram(), Histogram()
+        a.observe(0.001)
+        b.observe(0.003)
+        b.observe(0.5)
+        a.merge(Histogram.from_dict(b.to_dict()))
+
+        assert a.count == 3
+        assert a.total == pytest.approx(0.504)
+        assert a.min == 0.001
+        assert a.max == 0.5
+        assert Histogram.from_dict(a.to_dict()).counts == a.counts
+
+
+@pytest.mark.unit
+class TestTimings:
+    def test_span_records_on_error(self):
+        timings = Timings()
+        with timings.span("request"):
+            pass
+        with pytest.raises(RuntimeError):
+            with timings.span("request"):
+                raise RuntimeError("boom")
+        assert timings.histograms["request"].count == 2
+
+    def test_merge_dicts_and_report(self):
+        timings = Timings()
+        timings.observe("action", 0.010)
+        timings.observe("request", 0.008)
+        merged = Timings.from_dict(timings.to_dict())
+        merged.merge(timings)
+
+        assert merged.histograms["action"].count == 2
+        report = merged.report().splitlines()
+        assert report[0].startswith("request")
+        assert "80.0%" in report[0]
+        assert report[1].startswith("action")
+        assert not Timings()
+
+    def test_agent_records_phase_timings(self, temp_recordings_dir):
+        with LocalServer.scripted(1, win_after=5) as server:
+            agent = Random(
+                card_id="",
+                game_id="local-0000",
+                game_idx=0,
+                agent_name="random",
+                ROOT_URL=server.url,
+                record=True,
+            )
+            agent.main()
+
+        phases = agent.timings.histograms
+        actions = agent.action_counter
+        for phase in (
+            "choose_action",
+            "request",
+            "parse",
+            "validate",
+            "append_frame",
+            "action",
+        ):
+            assert phases[phase].count == actions
+        assert phases["action"].total >= phases["request"].total
+        assert agent.summary()["timings"]["action"]["count"] == actions
+
+        last = Recorder.from_path(agent.recorder.filename).event(-1)
+        assert last["data"]["timings"]["request"]["count"] == actions
+
+
+@pytest.fixture
+def metrics_server():
+    server = serve(0)
+    assert server.server_address[0] == "127.0.0.1"
+    yield f"http://127.0.0.1:{server.server_address[1]}/metrics"
+    server.shutdown()
+    server.server_close()
+    REGISTRY.enabled = False
+    REGISTRY.clear()
+
+
+@pytest.mark.unit
+class TestMetricsRegistry:
+    def test_disabled_registry_ignores_updates(self):
+        registry = MetricsRegistry()
+        registry.inc("arc_actions_total", game="g")
+        registry.observe("arc_action_seconds", 0.1, game="g")
+        assert registry.render() == "\n"
+
+    def test_render(self):
+        registry = MetricsRegistry()
+        registry.enabled = True
+        registry.inc("arc_actions_total", game="g", agent="random")
+        registry.inc("arc_actions_total", 2, game="g", agent="random")
+        registry.inc("arc_llm_tokens_total", 10, game='say "hi"', agent="llm")
+        registry.observe("arc_action_seconds", 0.003, game="g", agent="random")
+
+        text = registry.render()
+        assert "# TYPE arc_actions_total counter" in text
+        assert 'arc_actions_total{agent="random",game="g"} 3' in text
+        assert 'arc_llm_tokens_total{agent="llm",game="say \\"hi\\""} 10' in text
+        assert "# TYPE arc_action_seconds histogram" in text
+        assert 'arc_action_seconds_bucket{agent="random",game="g",le="0.002"} 0' in text
+        assert 'arc_action_seconds_bucket{agent="random",game="g",le="0.005"} 1' in text
+        assert 'arc_action_seconds_bucket{agent="random",game="g",le="+Inf"} 1' in text
+        assert 'arc_action_seconds_count{agent="random",game="g"} 1' in text
+        assert registry.value("arc_actions_total", game="g", agent="random") == 3
+
+    def test_serve_without_port(self, monkeypatch):
+        monkeypatch.delenv("METRICS_PORT", raising=False)
+        assert serve() is None
+        assert not REGISTRY.enabled
+
+    def test_live_agent_metrics(self, metrics_server):
+        with LocalServer.scripted(1, win_after=3) as server:
+            agent = Random(
+                card_id="",
+                game_id="local-0000",
+                game_idx=0,
+                agent_name="random",
+                ROOT_URL=server.url,
+                record=False,
+            )
+            agent.main()
+            agent.count_response(500, {"error": "boom"})
+
+        labels = 'agent="random",game="local-0000"'
+        text = requests.get(metrics_server).text
+        assert f"arc_actions_total{{{labels}}} {agent.action_counter}" in text
+        assert f"arc_active_agents{{{labels}}} 0" in text
+        assert f"arc_action_seconds_count{{{labels}}} {agent.action_counter}" in text
+        assert f"arc_request_seconds_count{{{labels}}} {agent.action_counter}" in text
+        assert f'arc_http_errors_total{{{labels},status="500"}} 1' in text
+        assert (
+            requests.get(metrics_server.replace("/metrics", "/nope")).status_code == 404
+        )
@@ -1,3 +1,4 @@
+import gzip
 import json
 import os
 import threading
@@ -7,7 +8,7 @@ from unittest.mock import patch
 
 import pytest
 
-from agents.recorder import RECORDING_SUFFIX, Recorder
+from agents.recorder import RECORDING_SUFFIX, Recorder, RecordingInfo
 
 
 @pytest.mark.unit
@@ -210,6 +211,7 @@ class TestRecorderClassMethods:
                 "81329339-1951-487c-8bed-e9d4780320f2",
             ),
             ("a.b.c.recording.jsonl", "a.b", "a", "c"),
+            ("a.b.c.recording.jsonl.gz", "a.b", "a", "c"),
             ("simple", "simple", "simple", "simple"),
         ],
     )
@@ -301,3 +303,294 @@ class TestRecorderErrorHandling:
 
         events = recorder.get()
         assert len(events) == 5
+
+
+@pytest.mark.unit
+class TestRecorderBuffering:
+    def test_batch_size_triggers_write(self, temp_recordings_dir):
+        recorder = Recorder(prefix="test-batch", flush_interval=60, batch_size=3)
+
+        recorder.record({"event": 1})
+        recorder.record({"event": 2})
+        assert os.path.getsize(recorder.filename) == 0
+
+        recorder.record({"event": 3})
+        with open(recorder.filename) as f:
+            assert len(f.readlines()) == 3
+        recorder.close()
+
+    def test_background_flush(self, temp_recordings_dir):
+        recorder = Recorder(prefix="test-interval", flush_interval=0.01, batch_size=100)
+        recorder.record({"event": 1})
+
+        deadline = time.time() + 2
+        while os.path.getsize(recorder.filename) == 0 and time.time() < deadline:
+            time.sleep(0.01)
+
+        with open(recorder.filename) as f:
+            assert json.loads(f.readline())["data"] == {"event": 1}
+        recorder.close()
+
+    def test_get_and_close_flush_pending_events(self, temp_recordings_dir):
+        recorder = Recorder(
+            prefix="test-close", flush_interval=60, batch_size=100, fsync="close"
+        )
+        for i in range(5):
+            recorder.record({"event": i})
+
+        assert [e["data"]["event"] for e in recorder.get()] == list(range(5))
+
+        recorder.record({"event": 5})
+        recorder.close()
+        with open(recorder.filename) as f:
+            assert len(f.readlines()) == 6
+
+    def test_invalid_fsync_policy(self, temp_recordings_dir):
+        with pytest.raises(ValueError):
+            Recorder(prefix="test-fsync", fsync="sometimes")
+
+
+@pytest.mark.unit
+class TestCompressedRecording:
+    def make_frames(self, count):
+        grid = [[[0] * 8 for _ in range(8)]]
+        frames = []
+        for i in range(count):
+            grid[0][i % 8][(i * 3) % 8] = i % 16
+            frames.append({"score": i, "frame": [[row[:] for row in grid[0]]]})
+        return frames
+
+    def test_compressed_round_trip(self, temp_recordings_dir):
+        recorder = Recorder(prefix="test-gz", compress=True, keyframe_interval=4)
+        assert recorder.filename.endswith(".recording.jsonl.gz")
+
+        frames = self.make_frames(10)
+        for frame in frames:
+            recorder.record(frame)
+        recorder.record({"scorecard": True})
+
+        # readable while the gzip stream is still open
+        assert [e["data"] for e in recorder.get()] == frames + [{"scorecard": True}]
+        recorder.close()
+        assert [e["data"] for e in recorder.get()] == frames + [{"scorecard": True}]
+
+        reader = Recorder(
+            prefix="test-gz", filename=os.path.basename(recorder.filename)
+        )
+        assert reader.compressed
+        assert [e["data"] for e in reader.get()] == frames + [{"scorecard": True}]
+
+    def test_frames_stored_as_deltas_with_keyframes(self, temp_recordings_dir):
+        recorder = Recorder(prefix="test-delta", compress=True, keyframe_interval=3)
+        for frame in self.make_frames(8):
+            recorder.record(frame)
+        recorder.close()
+
+        with gzip.open(recorder.filename, "rb") as f:
+            raw = [json.loads(line) for line in f]
+
+        keyframes = [i for i, e in enumerate(raw) if "frame" in e["data"]]
+        assert keyframes == [0, 3, 6]
+        assert raw[1]["delta"] == [[0, 1, 3, 1]]
+        assert "frame" not in raw[1]["data"]
+
+    @pytest.mark.parametrize("interval", [1, 2, 5])
+    def test_keyframe_every_interval_frames(self, temp_recordings_dir, interval):
+        recorder = Recorder(
+            prefix=f"test-interval-{interval}",
+            compress=True,
+            keyframe_interval=interval,
+        )
+        for frame in self.make_frames(12):
+            recorder.record(frame)
+        recorder.close()
+
+        with gzip.open(recorder.filename, "rb") as f:
+            raw = [json.loads(line) for line in f]
+
+        keyframes = [i for i, e in enumerate(raw) if "frame" in e["data"]]
+        assert keyframes == list(range(0, 12, interval))
+
+    def test_list_includes_compressed_recordings(self, temp_recordings_dir):
+        recorder = Recorder(prefix="game.agent.1", compress=True)
+        recorder.record({"frame": [[[1]]]})
+        recorder.close()
+
+        with patch.dict("os.environ", {"RECORDINGS_DIR": temp_recordings_dir}):
+            assert os.path.basename(recorder.filename) in Recorder.list()
+
+
+@pytest.mark.unit
+class TestRecorderRandomAccess:
+    def record_game(self, recorder, count):
+        for i in range(count):
+            recorder.record({"score": i, "frame": [[[i % 16]]]})
+            recorder.record({"tokens": i})
+
+    @pytest.mark.parametrize("compress", [False, True])
+    def test_event_and_frame_lookup(self, temp_recordings_dir, compress):
+        recorder = Recorder(prefix="test-index", compress=compress)
+        self.record_game(recorder, 5)
+
+        assert recorder.count() == 10
+        assert recorder.event(0)["data"]["score"] == 0
+        assert recorder.event(3)["data"] == {"tokens": 1}
+        assert recorder.event(-1)["data"] == {"tokens": 4}
+        assert recorder.frame(2)["data"]["score"] == 2
+        assert recorder.frame(-1)["data"]["frame"] == [[[4]]]
+        assert [e["data"] for e in recorder.iter(start=8)] == [
+            {"score": 4, "frame": [[[4]]]},
+            {"tokens": 4},
+        ]
+
+        with pytest.raises(IndexError):
+            recorder.event(10)
+        with pytest.raises(IndexError):
+            recorder.frame(5)
+        recorder.close()
+
+    @pytest.mark.parametrize("compress", [False, True])
+    def test_empty_frames_are_not_frames(self, temp_recordings_dir, compress):
+        recorder = Recorder(prefix=f"test-empty-{compress}", compress=compress)
+        recorder.record({"score": 0, "frame": [[[1]]]})
+        recorder.record({"score": 1, "frame": []})
+        recorder.record({"reasoning": {"frame": [[[2]]]}})
+
+        assert recorder.frame(-1)["data"]["score"] == 0
+        with pytest.raises(IndexError):
+            recorder.frame(1)
+        recorder.close()
+
+    def test_index_is_extended_after_appends(self, temp_recordings_dir):
+        recorder = Recorder(prefix="test-index-append")
+        self.record_game(recorder, 3)
+        assert recorder.frame(-1)["data"]["score"] == 2
+        assert os.path.isfile(recorder.index_filename)
+        assert not Recorder.is_recording(recorder.index_filename)
+
+        self.record_game(recorder, 2)
+        assert recorder.count() == 10
+        assert recorder.frame(-1)["data"]["score"] == 1
+
+    def test_index_rebuilt_when_recording_is_rewritten(self, temp_recordings_dir):
+        recorder = Recorder(prefix="test-index-rewrite")
+        self.record_game(recorder, 4)
+        assert recorder.count() == 8
+        recorder.close()
+
+        with open(recorder.filename, "w") as f:
+            f.write('{"data": {"score": 9, "frame": [[[9]]]}}\n')
+
+        assert recorder.count() == 1
+        assert recorder.frame(0)["data"]["score"] == 9
+
+    def test_from_path(self, temp_recordings_dir):
+        recorder = Recorder(prefix="game.agent.1")
+        self.record_game(recorder, 2)
+
+        with patch.dict("os.environ", {"RECORDINGS_DIR": ""}):
+            reader = Recorder.from_path(recorder.filename)
+        assert reader.filename == recorder.filename
+        assert reader.event(2)["data"]["score"] == 1
+
+
+@pytest.mark.unit
+class TestRecorderStream:
+    def record_game(self, recorder):
+        for i in range(4):
+            recorder.record(
+                {
+                    "score": i,
+                    "frame": [[[i, 0], [0, i]]],
+                    "action_input": {"id": i % 2 + 1, "data": {}},
+                }
+            )
+            recorder.record({"tokens": 10 * i})
+        recorder.record({"won": 1, "scores": [3]})
+
+    @pytest.mark.parametrize("compress", [False, True])
+    def test_stream_projection(self, temp_recordings_dir, compress):
+        recorder = Recorder(prefix="test-stream", compress=compress)
+        self.record_game(recorder)
+
+        scores = [e["data"] for e in recorder.stream(fields=["score"])]
+        assert scores == [{"score": i} for i in range(4)]
+
+        actions = list(recorder.stream(fields=["action_input", "tokens"], start=6))
+        assert [e["data"] for e in actions] == [
+            {"action_input": {"id": 2, "data": {}}},
+            {"tokens": 30},
+        ]
+        assert all("timestamp" in e for e in actions)
+
+    def test_stream_filter(self, temp_recordings_dir):
+        recorder = Recorder(prefix="test-stream-filter")
+        self.record_game(recorder)
+
+        events = recorder.stream(filter=lambda e: e["data"].get("tokens", 0) >= 20)
+        assert [e["data"] for e in events] == [{"tokens": 20}, {"tokens": 30}]
+
+    def test_stream_is_lazy(self, temp_recordings_dir):
+        recorder = Recorder(prefix="test-stream-lazy", compress=True)
+        self.record_game(recorder)
+        recorder.close()
+
+        with patch("agents.recorder.READ_CHUNK_SIZE", 16):
+            events = recorder.stream()
+            assert next(events)["data"]["score"] == 0
+            assert len(list(events)) == 8
+
+
+@pytest.mark.unit
+class TestRecorderCatalog:
+    def test_catalog_metadata(self, temp_recordings_dir):
+        for f in os.listdir(temp_recordings_dir):
+            if Recorder.is_recording(f):
+                os.unlink(os.path.join(temp_recordings_dir, f))
+
+        recorder = Recorder(prefix="ls20.random")
+        for i in range(3):
+            recorder.record(
+                {
+                    "game_id": "ls20",
+                    "guid": "game-guid",
+                    "score": i,
+                    "state": "NOT_FINISHED" if i < 2 else "WIN",
+                    "frame": [[[i]]],
+                    "action_input": {"id": 1, "data": {}},
+                }
+            )
+        recorder.record({"tokens": 5})
+        recorder.close()
+
+        (info,) = Recorder.catalog()
+        assert info.filename == os.path.basename(recorder.filename)
+        assert info.game_id == "ls20"
+        assert info.agent == "random"
+        assert info.guid == "game-guid"
+        assert (info.actions, info.score, info.state) == (3, 2, "WIN")
+        assert os.path.isfile(
+            os.path.join(temp_recordings_dir, ".index", "catalog.json")
+        )
+
+    def test_catalog_is_incremental(self, temp_recordings_dir):
+        first = Recorder(prefix="game1.agent")
+        first.record({"score": 1, "action_input": {"id": 1}})
+        first.close()
+        Recorder.catalog()
+
+        second = Recorder(prefix="game2.agent")
+        second.record({"score": 2, "action_input": {"id": 1}})
+        second.close()
+
+        with patch(
+            "agents.recorder.RecordingInfo.scan", wraps=RecordingInfo.scan
+        ) as scan:
+            infos = {i.filename: i for i in Recorder.catalog()}
+        assert scan.call_count == 1
+        assert infos[os.path.basename(second.filename)].score == 2
+        assert infos[os.path.basename(first.filename)].score == 1
+
+        os.unlink(second.filename)
+        names = [i.filename for i in Recorder.catalog()]
+        assert os.path.basename(second.filename) not in names
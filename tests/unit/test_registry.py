@@ -0,0 +1,59 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from agents import AVAILABLE_AGENTS, Playback
+from agents.agent import Agent
+from agents.registry import AGENT_MODULES, AgentRegistry
+from agents.templates.random_agent import Random
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.mark.unit
+class TestAgentRegistry:
+    def test_import_does_not_load_templates(self):
+        code = (
+            "import sys, agents; "
+            "assert 'random' in agents.AVAILABLE_AGENTS; "
+            "assert 'agents.templates.llm_agents' not in sys.modules; "
+            "assert 'langgraph' not in sys.modules; "
+            "agents.AVAILABLE_AGENTS['random']; "
+            "assert 'agents.templates.llm_agents' not in sys.modules"
+        )
+        subprocess.run([sys.executable, "-c", code], cwd=ROOT, check=True)
+
+    def test_lookup(self):
+        assert AVAILABLE_AGENTS["random"] is Random
+        assert "random" in AVAILABLE_AGENTS
+        assert "not-an-agent" not in AVAILABLE_AGENTS
+        assert set(AGENT_MODULES) <= set(AVAILABLE_AGENTS)
+        with pytest.raises(KeyError):
+            AVAILABLE_AGENTS["not-an-agent"]
+
+    def test_lazy_package_exports(self):
+        import agents
+
+        assert agents.Random is Random
+        with pytest.raises(AttributeError):
+            agents.NotAnAgent
+
+    def test_defined_subclasses_and_recordings(self, temp_recordings_dir):
+        class MyTestAgent(Agent):
+            def is_done(self, frames, latest_frame):
+                return True
+
+            def choose_action(self, frames, latest_frame):
+                raise NotImplementedError
+
+        registry = AgentRegistry({})
+        assert registry["mytestagent"] is MyTestAgent
+
+        name = "game.agent.1.guid.recording.jsonl"
+        with open(os.path.join(temp_recordings_dir, name), "w") as f:
+            f.write("{}\n")
+        assert name in registry
+        assert registry[name] is Playback
+        assert name in list(registry)
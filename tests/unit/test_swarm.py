@@ -1,11 +1,14 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from unittest.mock import Mock, patch
 
 import pytest
 import requests
 
 from agents.structs import Card, GameState, Scorecard
-from agents.swarm import Swarm
-from agents.templates.random_agent import Random
+from agents.swarm import Swarm, play_jobs
+from agents.templates.random_agent import AsyncRandom, Random
 
 
 @pytest.mark.unit
@@ -29,6 +32,38 @@ class TestSwarmInitialization:
             assert swarm._session.headers["Accept"] == "application/json"
 
 
+@pytest.mark.unit
+class TestSwarmConnectionPool:
+    def test_agents_share_swarm_pool(self):
+        swarm = Swarm(
+            agent="random",
+            ROOT_URL="https://example.com",
+            games=["game1", "game2", "game3"],
+            max_workers=2,
+        )
+        assert swarm.pool_maxsize == 2
+        assert swarm.adapter._pool_maxsize == 2
+        assert swarm._session.get_adapter("https://example.com") is swarm.adapter
+
+        swarm.card_id = "test-card-123"
+        a1 = swarm.create_agent(0, "game1", adapter=swarm.adapter)
+        a2 = swarm.create_agent(1, "game2", adapter=swarm.adapter)
+        assert a1._session is not a2._session
+        assert a1._session.get_adapter("https://example.com") is swarm.adapter
+        assert a2._session.get_adapter("https://example.com") is swarm.adapter
+
+        with patch.object(swarm.adapter, "close") as mock_close:
+            a1.cleanup(Scorecard())
+            mock_close.assert_not_called()
+
+    def test_pool_size_from_env(self):
+        with patch.dict("os.environ", {"HTTP_POOL_MAXSIZE": "7"}):
+            swarm = Swarm(
+                agent="random", ROOT_URL="https://example.com", games=["game1"]
+            )
+        assert swarm.adapter._pool_maxsize == 7
+
+
 @pytest.mark.unit
 class TestSwarmScorecard:
     @patch("agents.swarm.requests.Session.post")
@@ -125,6 +160,140 @@ class TestSwarmAgentManagement:
                 mock_thread_instance.start.assert_called_once()
                 mock_thread_instance.join.assert_called_once()
 
+    @patch("agents.swarm.Swarm.open_scorecard")
+    @patch("agents.swarm.Swarm.close_scorecard")
+    def test_bounded_worker_pool(self, mock_close, mock_open):
+        mock_open.return_value = "test-card-123"
+        mock_close.return_value = Scorecard()
+
+        lock = threading.Lock()
+        running = 0
+        peak = 0
+        played = []
+
+        def fake_main(agent):
+            nonlocal running, peak
+            with lock:
+                running += 1
+                peak = max(peak, running)
+            time.sleep(0.01)
+            with lock:
+                running -= 1
+                played.append(agent.game_id)
+
+        swarm = Swarm(
+            agent="random",
+            ROOT_URL="https://example.com",
+            games=[f"game{i}" for i in range(5)],
+            max_workers=2,
+            attempts=2,
+        )
+        assert swarm.worker_count == 2
+
+        with patch.object(Random, "main", autospec=True, side_effect=fake_main):
+            swarm.main()
+
+        assert len(swarm.threads) == 2
+        assert peak <= 2
+        assert sorted(played) == sorted([f"game{i}" for i in range(5)] * 2)
+        assert swarm.agents == []
+        assert [r["game_idx"] for r in swarm.results] == list(range(10))
+        assert swarm.jobs.empty()
+
+    @patch("agents.swarm.Swarm.open_scorecard")
+    @patch("agents.swarm.Swarm.close_scorecard")
+    def test_failed_agents_are_kept_for_cleanup(self, mock_close, mock_open):
+        mock_open.return_value = "test-card-123"
+        mock_close.return_value = Scorecard()
+
+        def fake_main(agent):
+            if agent.game_id == "game1":
+                raise RuntimeError("boom")
+
+        swarm = Swarm(
+            agent="random", ROOT_URL="https://example.com", games=["game0", "game1"]
+        )
+        with (
+            patch.object(Random, "main", autospec=True, side_effect=fake_main),
+            patch.object(Random, "cleanup") as mock_cleanup,
+        ):
+            swarm.main()
+
+        assert [a.game_id for a in swarm.agents] == ["game1"]
+        assert [r["game_id"] for r in swarm.results] == ["game0", "game1"]
+        mock_cleanup.assert_called_once_with(mock_close.return_value)
+
+    def test_play_jobs_returns_summaries(self):
+        with patch.object(Random, "main") as mock_agent_main:
+            results = play_jobs(
+                "random",
+                "https://example.com",
+                "test-card-123",
+                [(0, "game1", 0), (2, "game3", 0)],
+                ["agent", "random"],
+                None,
+                requests.cookies.RequestsCookieJar(),
+            )
+
+        assert mock_agent_main.call_count == 2
+        assert [r["game_id"] for r in results] == ["game1", "game3"]
+        assert [r["game_idx"] for r in results] == [0, 2]
+        assert all(r["recording"] for r in results)
+
+    @patch("agents.swarm.Swarm.open_scorecard")
+    @patch("agents.swarm.Swarm.close_scorecard")
+    @patch(
+        "agents.swarm.ProcessPoolExecutor",
+        lambda max_workers, **kwargs: ThreadPoolExecutor(max_workers),
+    )
+    def test_process_backend_collects_results(self, mock_close, mock_open):
+        mock_open.return_value = "test-card-123"
+        mock_close.return_value = Scorecard()
+
+        swarm = Swarm(
+            agent="random",
+            ROOT_URL="https://example.com",
+            games=["game1", "game2", "game3"],
+            processes=2,
+        )
+
+        with patch.object(Random, "main"):
+            swarm.main()
+
+        assert [r["game_id"] for r in swarm.results] == ["game1", "game2", "game3"]
+        assert swarm.agents == []
+
+    @patch("agents.swarm.Swarm.open_scorecard")
+    @patch("agents.swarm.Swarm.close_scorecard")
+    @patch("agents.swarm.Thread")
+    def test_async_agents_share_event_loop(self, mock_thread, mock_close, mock_open):
+        mock_open.return_value = "test-card-123"
+        mock_close.return_value = Scorecard()
+
+        swarm = Swarm(
+            agent="asyncrandom",
+            ROOT_URL="https://example.com",
+            games=["game1", "game2", "game3"],
+        )
+        assert swarm.agent_class == AsyncRandom
+        assert swarm.is_async
+
+        played = []
+
+        async def fake_main_async(agent):
+            played.append(agent)
+
+        with patch.object(
+            AsyncRandom, "main_async", autospec=True, side_effect=fake_main_async
+        ):
+            swarm.main()
+
+        assert mock_thread.call_count == 0
+        assert len(played) == 3
+        assert len({id(a.transport) for a in played}) == 1
+        assert len({id(a._session.cookies) for a in played}) == 3
+        assert swarm.agents == []
+
 
 @pytest.mark.unit
 class TestSwarmCleanup:
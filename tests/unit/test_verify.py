@@ -0,0 +1,134 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from agents.recorder import Recorder
+from agents.verify import Verifier, verify_recording, verify_recordings
+
+
+def record_game(prefix, count):
+    recorder = Recorder(prefix=prefix)
+    frames = []
+    for i in range(count):
+        frame = {
+            "game_id": "test-game",
+            "guid": "test-guid",
+            "frame": [[[i % 16, 0], [0, 1]]],
+            "state": "WIN" if i == count - 1 else "NOT_FINISHED",
+            "score": i,
+            "action_input": {"id": 0 if i == 0 else 1, "data": {}},
+        }
+        recorder.record(frame)
+        frames.append(frame)
+    recorder.record({"test-game": {"scores": [count - 1]}})
+    recorder.close()
+    return recorder.filename, frames
+
+
+def fake_server(frames, diverge_at=None):
+    responses = iter(frames)
+
+    def do_action_request(self, action):
+        frame = dict(next(responses))
+        if frame["score"] == diverge_at:
+            frame["frame"] = [[[15, 15], [15, 15]]]
+        return frame
+
+    return do_action_request
+
+
+@pytest.mark.unit
+class TestVerifier:
+    def test_matching_replay(self, temp_recordings_dir):
+        path, frames = record_game("test-game.verify-ok", 5)
+        size = os.path.getsize(path)
+
+        with patch.object(Verifier, "do_action_request", fake_server(frames)):
+            verifier = Verifier(path, "https://example.com")
+            verifier.main()
+
+        assert verifier.game_id == "test-game"
+        assert verifier.result.ok
+        assert verifier.result.replayed == verifier.result.recorded == 5
+        assert os.path.getsize(path) == size  # the recording is left untouched
+
+    def test_divergence_is_reported(self, temp_recordings_dir):
+        path, frames = record_game("test-game.verify-bad", 6)
+
+        with patch.object(
+            Verifier, "do_action_request", fake_server(frames, diverge_at=3)
+        ):
+            verifier = Verifier(path, "https://example.com")
+            verifier.main()
+
+        result = verifier.result
+        assert not result.ok
+        assert [(m.index, m.action, m.fields) for m in result.mismatches] == [
+            (3, "ACTION1", ["frame"])
+        ]
+        assert result.replayed == 4
+
+    def test_verify_recordings_in_parallel(self, temp_recordings_dir):
+        games = [record_game(f"test-game.verify-{i}", 3) for i in range(3)]
+        by_path = {path: frames for path, frames in games}
+
+        def do_action_request(self, action):
+            if not hasattr(self, "_responses"):
+                self._responses = iter(by_path[self.path])
+            return next(self._responses)
+
+        session = MagicMock()
+        post = session.__enter__.return_value.post
+        post.return_value.json.return_value = {"card_id": "verify-card"}
+        pool = MagicMock(
+            side_effect=lambda max_workers, mp_context: ThreadPoolExecutor(max_workers)
+        )
+
+        with (
+            patch.object(Verifier, "do_action_request", do_action_request),
+            patch("agents.verify.requests.Session", return_value=session),
+            patch("agents.verify.ProcessPoolExecutor", pool),
+        ):
+            results = verify_recordings(list(by_path), "https://example.com", 8)
+
+        assert [r.filename for r in results] == list(by_path)
+        assert all(r.ok for r in results)
+        # one scorecard for the whole batch, at most one process per recording
+        assert [c.args[0].rsplit("/", 1)[-1] for c in post.call_args_list] == [
+            "open",
+            "close",
+        ]
+        assert post.call_args_list[1].kwargs["json"] == {"card_id": "verify-card"}
+        assert pool.call_args.kwargs["max_workers"] == 3
+        assert pool.call_args.kwargs["mp_context"].get_start_method() == "spawn"
+
+    def test_failed_scorecard_open_stops_verification(self, temp_recordings_dir):
+        path, _ = record_game("test-game.verify-nocard", 2)
+        session = MagicMock()
+        response = session.__enter__.return_value.post.return_value
+        response.ok = False
+        response.status_code = 401
+
+        with (
+            patch("agents.verify.requests.Session", return_value=session),
+            patch("agents.verify.ProcessPoolExecutor") as pool,
+            pytest.raises(RuntimeError, match="401"),
+        ):
+            verify_recordings([path], "https://example.com")
+        pool.assert_not_called()
+
+    def test_recording_without_actions_is_an_error(self, temp_recordings_dir):
+        with pytest.raises(ValueError, match="no actions"):
+            Verifier("missing.recording.jsonl", "https://example.com")
+
+    def test_server_errors_are_reported(self, temp_recordings_dir):
+        path, _ = record_game("test-game.verify-error", 2)
+        with patch.object(
+            Verifier, "do_action_request", side_effect=ConnectionError("refused")
+        ):
+            result = verify_recording(path, "https://example.com", "test-card")
+
+        assert not result.ok
+        assert "refused" in result.error